@@ -1,3 +1,4 @@
 # Módulo principal de core
 from core.agente import Agente
-from core.laberinto import Laberinto 
\ No newline at end of file
+from core.laberinto import Laberinto
+from core.medicion import Medidor 
\ No newline at end of file
@@ -1,11 +1,83 @@
 from core.algoritmos import elegir_algoritmo, agente_atrapado, sugerir_algoritmo
-from core.algoritmos.visualizacion import VisualizadorArbol
+from core.algoritmos import PlanificadorIncremental, PlanificadorJerarquico, TablasSalto, ALGORITMOS_DISPONIBLES
+from core.algoritmos import CampoDistancias, EstadisticasBusqueda
+from core.algoritmos.busqueda import ArbolPadres, NO_GENERADO
+from core.medicion import Medidor
+from array import array
+
+class RegistroVisitados:
+    """Conjunto ordenado de celdas del laberinto.
+
+    Un mapa de bytes indexado por id de celda responde a `celda in registro` en
+    O(1) y un registro de ids en orden de inserción permite reproducir el
+    recorrido. Se vincula a un laberinto para conocer el ancho de sus ids.
+    """
+
+    def __init__(self):
+        self.laberinto = None
+        self.marcas = bytearray()
+        self.orden = array('i')
+
+    def vincular(self, laberinto):
+        """Prepara el mapa para un laberinto; si cambian sus dimensiones se reindexa."""
+        if laberinto is self.laberinto:
+            return
+        anterior = self.laberinto
+        self.laberinto = laberinto
+        if anterior is not None and anterior.ancho == laberinto.ancho and len(anterior.celdas) == len(laberinto.celdas):
+            return
+        celdas = [anterior.posicion_celda(id_celda) for id_celda in self.orden] if anterior else []
+        self.marcas = bytearray(len(laberinto.celdas))
+        self.orden = array('i')
+        for celda in celdas:
+            self.agregar(celda)
+
+    def agregar_id(self, id_celda):
+        """Agrega una celda por su id. Devuelve True si no estaba."""
+        if self.marcas[id_celda]:
+            return False
+        self.marcas[id_celda] = 1
+        self.orden.append(id_celda)
+        return True
+
+    def agregar(self, celda):
+        return self.agregar_id(self.laberinto.id_celda(celda))
+
+    def agregar_ids(self, ids):
+        for id_celda in ids:
+            if not self.marcas[id_celda]:
+                self.marcas[id_celda] = 1
+                self.orden.append(id_celda)
+
+    def __contains__(self, celda):
+        if self.laberinto is None:
+            return False
+        fila, col = celda
+        if not (0 <= fila < self.laberinto.filas and 0 <= col < self.laberinto.columnas):
+            return False
+        return self.marcas[self.laberinto.id_celda(celda)] == 1
+
+    def __len__(self):
+        return len(self.orden)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self.laberinto.posicion_celda(id_celda) for id_celda in self.orden[indice]]
+        return self.laberinto.posicion_celda(self.orden[indice])
+
+    def __iter__(self):
+        posicion_celda = self.laberinto.posicion_celda if self.laberinto else None
+        for id_celda in self.orden:
+            yield posicion_celda(id_celda)
 
 class Agente:
-    def __init__(self, posicion_inicial=(1, 1)):
+    def __init__(self, posicion_inicial=(1, 1), visualizar_arbol=True, arbol_en_segundo_plano=False,
+                 cache_busquedas=None):
         self.posicion = posicion_inicial
         self.camino_optimo = []
-        self.visitados = []
+        self.en_camino_optimo = frozenset()  # Índice del camino óptimo para consultas O(1)
+        self.visitados = RegistroVisitados()  # Celdas por las que pasó el agente
+        self.explorados = RegistroVisitados()  # Celdas generadas por las búsquedas
         self.algoritmo_actual = None  # Iniciar sin algoritmo
         self.algoritmo_manual = False  # Nueva bandera
         self.estado = "Esperando"
@@ -15,13 +87,47 @@ class Agente:
         self.indice_camino = 0
         self.historial_posiciones = [posicion_inicial]
         self.nodo_final = None
-        self.visualizador = VisualizadorArbol()
+        # Tiempos por fase (búsqueda, visitados, árbol); desactivado no cuesta casi nada
+        self.medidor = Medidor()
+        # Con qué laberinto, versión y meta es válido ultimo_camino
+        self.laberinto_camino = None
+        self.version_camino = 0
+        self.meta_camino = None
+        self.indices_camino = {}  # Posición -> índice en ultimo_camino
+        self.arbol_busqueda = None  # Último árbol (ArbolPadres), reutilizable si la meta se mueve
+        self.arbol_bfs = False  # Si arbol_busqueda viene de BFS (sus ramas son caminos mínimos)
+        # El visualizador (pygame/matplotlib) solo se carga si se va a mostrar el árbol
+        self.visualizador = None
+        if visualizar_arbol:
+            from core.algoritmos.visualizacion import VisualizadorArbol
+            self.visualizador = VisualizadorArbol(en_segundo_plano=arbol_en_segundo_plano,
+                                                  medidor=self.medidor)
+        # Conserva el estado de D* Lite entre replanificaciones
+        self.planificador = PlanificadorIncremental()
+        # Conserva las tablas de JPS+, que se actualizan solo donde cambia el laberinto
+        self.tablas_salto = TablasSalto()
+        # Conserva el grafo abstracto de HPA* y la ruta abstracta pendiente
+        self.planificador_jerarquico = PlanificadorJerarquico()
+        # Distancias a la meta desde todas las celdas, reparadas cuando cambian paredes
+        self.campo_distancias = CampoDistancias()
+        # Guarda los árboles de búsqueda como arreglos de padres (sin un Nodo por estado)
+        self.busqueda_compacta = True
+        # Caché opcional de resultados de búsqueda (CacheBusquedas). Desactivada por defecto:
+        # con una caché compartida las métricas dependen de los episodios anteriores
+        self.cache_busquedas = cache_busquedas
+        # Métricas acumuladas del episodio
+        self.replanificaciones = 0
+        self.nodos_generados_total = 0
+        self.ultima_busqueda = None  # EstadisticasBusqueda de la última búsqueda
+        self.estadisticas_busqueda = EstadisticasBusqueda()  # Suma de las búsquedas del episodio
     
     def reiniciar(self, posicion_inicial):
         """Reinicia el estado del agente."""
         self.posicion = posicion_inicial
         self.camino_optimo = []
-        self.visitados = []
+        self.en_camino_optimo = frozenset()
+        self.visitados = RegistroVisitados()
+        self.explorados = RegistroVisitados()
         self.estado = "Esperando"
         self.pasos_sin_avance = 0
         self.ciclos_atrapado = 0
@@ -29,22 +135,51 @@ class Agente:
         self.indice_camino = 0
         self.historial_posiciones = [posicion_inicial]
         self.nodo_final = None
-        self.visualizador.limpiar()
+        self.laberinto_camino = None
+        self.indices_camino = {}
+        self.arbol_busqueda = None
+        self.planificador = PlanificadorIncremental()
+        self.tablas_salto = TablasSalto()
+        self.planificador_jerarquico = PlanificadorJerarquico()
+        self.campo_distancias = CampoDistancias()
+        self.replanificaciones = 0
+        self.nodos_generados_total = 0
+        self.ultima_busqueda = None
+        self.estadisticas_busqueda = EstadisticasBusqueda()
+        if self.visualizador is not None:
+            self.visualizador.limpiar()
         # No reiniciar self.algoritmo_actual ni self.algoritmo_manual
     
     def actuar(self, laberinto):
         """Actúa según el estado actual y el algoritmo seleccionado."""
+        if not self.medidor.activo:
+            return self._actuar(laberinto)
+        inicio = self.medidor.inicio()
+        resultado = self._actuar(laberinto)
+        self.medidor.fin("actuar", inicio)
+        return resultado
+
+    def _actuar(self, laberinto):
         if self.estado not in ["Buscando", "Siguiendo camino"]:
             return False  # No hay acción que tomar
         
         # Añadir posición actual a visitados si no está ya
-        if self.posicion not in self.visitados:
-            self.visitados.append(self.posicion)
+        self.visitados.vincular(laberinto)
+        self.explorados.vincular(laberinto)
+        self.visitados.agregar(self.posicion)
         
         # Verificar si llegó a la meta
         if self.posicion == laberinto.meta:
             self.estado = "Meta encontrada"
             return True
+
+        # Con el campo de distancias no hay caminos que planificar: se consulta cada paso
+        if self.algoritmo_actual == "Campo de distancias":
+            return self.actuar_con_campo(laberinto)
+
+        # Conservar el camino si los cambios del laberinto no lo afectan
+        if self.ultimo_camino is not None:
+            self.revisar_camino(laberinto)
         
         # Verificar si necesita recalcular el camino
         if (self.ultimo_camino is None or 
@@ -69,52 +204,44 @@ class Agente:
                         self.algoritmo_actual = algoritmo_sugerido
             
             # Calcular nuevo camino con el algoritmo actual
-            camino, nodos_generados, nodo_final = elegir_algoritmo(
-                laberinto, self.posicion, laberinto.meta, self.algoritmo_actual
-            )
-            
-            # Guardar el nodo final para visualización del árbol
-            self.nodo_final = nodo_final
-            
-            # Actualizar el árbol de búsqueda para visualización
-            #if nodo_final:
-            #    self.visualizador.construir_arbol_desde_nodo(nodo_final)
-            #else:
-            self.visualizador.construir_arbol_desde_nodos(
-                self.algoritmo_actual, nodos_generados, camino
-            )
-            
-            # Actualizar visitados con los nodos explorados por el algoritmo
-            for nodo in nodos_generados:
-                if nodo not in self.visitados:
-                    self.visitados.append(nodo)
+            camino, nodos_generados = self.planificar(laberinto, self.posicion)
             
             # Si no se encontró camino, intentar con otro algoritmo, pero solo si no es una selección manual
-            if camino is None and not self.algoritmo_manual:
+            # y si la meta sigue conectada con el agente (si no lo está, ninguno puede encontrarlo)
+            if (camino is None and not self.algoritmo_manual and
+                    laberinto.hay_camino(self.posicion, laberinto.meta)):
                 algoritmos = ["BFS", "DFS", "A*", "IDS"]
-                algoritmos.remove(self.algoritmo_actual)
+                if self.algoritmo_actual in algoritmos:
+                    algoritmos.remove(self.algoritmo_actual)
                 for algo in algoritmos:
+                    inicio = self.medidor.inicio()
+                    estadisticas = EstadisticasBusqueda()
                     camino, nodos_visitados, nodo_final = elegir_algoritmo(
-                        laberinto, self.posicion, laberinto.meta, algo
+                        laberinto, self.posicion, laberinto.meta, algo,
+                        self.planificador, self.busqueda_compacta, self.tablas_salto,
+                        self.planificador_jerarquico, self.cache_busquedas,
+                        estadisticas=estadisticas
                     )
+                    self.medidor.fin("busqueda", inicio)
+                    self.medidor.contar("busquedas")
+                    self.registrar_busqueda(estadisticas)
+                    self.nodos_generados_total += len(nodos_visitados)
                     if camino:
                         self.algoritmo_actual = algo
                         self.nodo_final = nodo_final
                         # Actualizar visualización
-                        self.explorados = [nodo.estado for nodo in nodos_visitados]
+                        self.registrar_explorados(nodos_visitados)
 
-                        self.visualizador.construir_arbol_desde_nodos(
-                            self.algoritmo_actual, nodos_generados, camino
-                        )
+                        if self.visualizador is not None:
+                            inicio = self.medidor.inicio()
+                            self.visualizador.construir_arbol_desde_nodos(
+                                self.algoritmo_actual, nodos_generados, camino
+                            )
+                            self.medidor.fin("arbol", inicio)
             
             # Actualizar el camino y resetear el contador
             if camino:
-                self.ultimo_camino = camino
-                self.indice_camino = 1  # Empezar desde el siguiente (0 es la posición actual)
-                self.pasos_sin_avance = 0
-                self.estado = "Siguiendo camino"
-                # Guardar el camino calculado como el óptimo actual
-                self.camino_optimo = camino
+                self.fijar_camino(laberinto, camino)
             else:
                 # No se encontró camino con ningún algoritmo
                 self.estado = "Sin solución"
@@ -125,9 +252,7 @@ class Agente:
             siguiente_pos = self.ultimo_camino[self.indice_camino]
             
             # Verificar si la celda siguiente es válida (puede haber cambiado el laberinto)
-            fila, col = siguiente_pos
-            if (0 <= fila < laberinto.filas and 0 <= col < laberinto.columnas and 
-                laberinto.grid[fila][col] == 0):
+            if laberinto.es_libre(siguiente_pos):
                 # Mover al siguiente paso
                 self.posicion = siguiente_pos
                 self.historial_posiciones.append(siguiente_pos)
@@ -140,9 +265,178 @@ class Agente:
         
         return True
     
+    def actuar_con_campo(self, laberinto):
+        """Avanza un paso leyendo el campo de distancias; solo se trabaja si cambió el laberinto."""
+        campo = self.campo_distancias
+        if not campo.al_dia(laberinto):
+            # Misma ruta que los demás algoritmos: campo_distancias sincroniza el campo y
+            # planificar registra la búsqueda, sus estadísticas y el árbol
+            camino, _ = self.planificar(laberinto, self.posicion)
+            self.camino_optimo = camino or []
+            self.en_camino_optimo = frozenset(self.camino_optimo)
+
+        siguiente_pos = campo.siguiente(self.posicion)
+        if siguiente_pos is None:
+            self.estado = "Sin solución"
+            return False
+        self.estado = "Siguiendo camino"
+        self.posicion = siguiente_pos
+        self.historial_posiciones.append(siguiente_pos)
+        self.pasos_sin_avance = 0
+        return True
+
+    def planificar(self, laberinto, origen):
+        """Busca un camino de origen a la meta con el algoritmo actual y registra la búsqueda."""
+        medidor = self.medidor
+        inicio = medidor.inicio()
+        estadisticas = EstadisticasBusqueda()
+        camino, nodos_generados, nodo_final = elegir_algoritmo(
+            laberinto, origen, laberinto.meta, self.algoritmo_actual,
+            self.planificador, self.busqueda_compacta, self.tablas_salto,
+            self.planificador_jerarquico, self.cache_busquedas, self.campo_distancias,
+            estadisticas
+        )
+        medidor.fin("busqueda", inicio)
+        medidor.contar("busquedas")
+        self.registrar_busqueda(estadisticas)
+
+        self.replanificaciones += 1
+        self.nodos_generados_total += len(nodos_generados)
+
+        # Guardar el nodo final para visualización del árbol
+        self.nodo_final = nodo_final
+        # Solo los árboles de padres se pueden recorrer de nuevo hacia otra meta
+        self.arbol_busqueda = nodos_generados if isinstance(nodos_generados, ArbolPadres) else None
+        self.arbol_bfs = self.algoritmo_actual == "BFS"
+
+        # Actualizar el árbol de búsqueda para visualización
+        if self.visualizador is not None:
+            inicio = medidor.inicio()
+            self.visualizador.construir_arbol_desde_nodos(
+                self.algoritmo_actual, nodos_generados, camino
+            )
+            medidor.fin("arbol", inicio)
+
+        # Actualizar explorados con los nodos generados por el algoritmo
+        inicio = medidor.inicio()
+        self.registrar_explorados(nodos_generados)
+        medidor.fin("visitados", inicio)
+        return camino, nodos_generados
+
+    def registrar_busqueda(self, estadisticas):
+        """Guarda las estadísticas de una búsqueda y las suma a las del episodio."""
+        self.ultima_busqueda = estadisticas
+        self.estadisticas_busqueda.acumular(estadisticas)
+
+    def fijar_camino(self, laberinto, camino):
+        """Adopta un camino (camino[0] es la posición actual) y recuerda para qué laberinto vale."""
+        self.ultimo_camino = camino
+        self.indice_camino = 1  # Empezar desde el siguiente (0 es la posición actual)
+        self.pasos_sin_avance = 0
+        self.estado = "Siguiendo camino"
+        # Guardar el camino calculado como el óptimo actual
+        self.camino_optimo = camino
+        self.en_camino_optimo = frozenset(camino)
+        self.indices_camino = {posicion: indice for indice, posicion in enumerate(camino)}
+        self.laberinto_camino = laberinto
+        self.version_camino = laberinto.version
+        laberinto.registrar_lector(self)
+        self.meta_camino = laberinto.meta
+
+    def revisar_camino(self, laberinto):
+        """Conserva ultimo_camino mientras los cambios del laberinto no lo invaliden.
+
+        Si una pared nueva corta el tramo pendiente, solo se vuelve a buscar desde
+        la celda anterior al corte. Si la meta se movió, se intenta llegar a ella
+        por el camino actual o por el último árbol de búsqueda. Si nada de eso
+        funciona, el camino se descarta y actuar replanifica como siempre.
+        """
+        cambios = None
+        if laberinto is self.laberinto_camino:
+            cambios = laberinto.cambios_desde(self.version_camino)
+        if cambios is None:
+            # Laberinto nuevo: ni el camino ni el árbol sirven
+            self.ultimo_camino = None
+            self.arbol_busqueda = None
+            return
+
+        # Primer índice del tramo pendiente que ahora es pared
+        corte = None
+        for posicion in cambios:
+            indice = self.indices_camino.get(posicion)
+            if (indice is not None and indice >= self.indice_camino and
+                    not laberinto.es_libre(posicion) and (corte is None or indice < corte)):
+                corte = indice
+
+        if laberinto.meta != self.meta_camino:
+            indice_meta = self.indices_camino.get(laberinto.meta, -1)
+            if self.indice_camino <= indice_meta and (corte is None or indice_meta < corte):
+                # La nueva meta está en el tramo pendiente: basta con acortarlo
+                self.fijar_camino(laberinto, self.ultimo_camino[self.indice_camino - 1:indice_meta + 1])
+            elif not self.reutilizar_arbol(laberinto):
+                self.ultimo_camino = None
+        elif corte is not None:
+            # Solo se busca de nuevo desde la celda anterior al corte
+            camino, _ = self.planificar(laberinto, self.ultimo_camino[corte - 1])
+            if camino:
+                self.fijar_camino(laberinto, self.ultimo_camino[self.indice_camino - 1:corte - 1] + camino)
+            else:
+                self.ultimo_camino = None
+        else:
+            self.version_camino = laberinto.version
+            laberinto.registrar_lector(self)
+
+        if self.ultimo_camino is not None and self.estado == "Buscando":
+            self.estado = "Siguiendo camino"
+
+    def reutilizar_arbol(self, laberinto):
+        """Intenta llegar a la nueva meta por el último árbol de búsqueda, sin buscar de nuevo.
+
+        Sube por el árbol desde la posición actual hasta el ancestro común con la meta
+        y baja hasta ella. Devuelve False si alguna de las dos no está en el árbol, si
+        el recorrido da un rodeo o si atraviesa una pared nueva. Solo las ramas de un
+        árbol de BFS se aceptan sin más; las de DFS o A* pueden ser más largas que el
+        camino mínimo y se limitan a la distancia Manhattan.
+        """
+        arbol = self.arbol_busqueda
+        # El árbol puede venir de la caché, hecho sobre otro laberinto con el mismo contenido
+        if arbol is None:
+            return False
+        if (arbol.laberinto.filas, arbol.laberinto.columnas) != (laberinto.filas, laberinto.columnas):
+            return False
+        id_actual, id_meta = laberinto.id_celda(self.posicion), laberinto.id_celda(laberinto.meta)
+        if arbol.padres[id_actual] == NO_GENERADO or arbol.padres[id_meta] == NO_GENERADO:
+            return False
+        hasta_actual, hasta_meta = arbol.camino(id_actual), arbol.camino(id_meta)
+        comunes = 0
+        for celda_actual, celda_meta in zip(hasta_actual, hasta_meta):
+            if celda_actual != celda_meta:
+                break
+            comunes += 1
+        camino = hasta_actual[comunes - 1:][::-1] + hasta_meta[comunes:]
+        # Bajar por una rama de BFS desde la posición actual da un camino mínimo; en otros
+        # árboles, o al dar la vuelta por un ancestro, solo se acepta si no es más largo
+        # que la distancia Manhattan (que entonces es la mínima)
+        distancia = abs(self.posicion[0] - laberinto.meta[0]) + abs(self.posicion[1] - laberinto.meta[1])
+        if (comunes < len(hasta_actual) or not self.arbol_bfs) and len(camino) - 1 > distancia:
+            return False
+        if not all(laberinto.es_libre(posicion) for posicion in camino):
+            return False
+        self.fijar_camino(laberinto, camino)
+        return True
+
+    def registrar_explorados(self, nodos_generados):
+        """Agrega al registro de explorados las celdas de una búsqueda."""
+        if isinstance(nodos_generados, ArbolPadres):
+            # Los ids ya están en el arreglo de padres: no hace falta construir nodos
+            self.explorados.agregar_ids(nodos_generados.generados)
+        else:
+            for nodo in nodos_generados:
+                self.explorados.agregar(nodo.estado)
+
     def cambiar_algoritmo(self, nuevo_algoritmo):
         """Cambia el algoritmo de búsqueda manualmente."""
-        if nuevo_algoritmo in ["BFS", "DFS", "A*", "IDS"]:
+        if nuevo_algoritmo in ALGORITMOS_DISPONIBLES:
             self.algoritmo_actual = nuevo_algoritmo
             self.algoritmo_manual = True  # Marcar como selección manual
             # Forzar recálculo de la ruta
@@ -151,6 +445,16 @@ class Agente:
             return True
         return False
     
+    def medir_tiempos(self, activo=True):
+        """Activa o desactiva la medición de tiempos por fase (también la del visualizador)."""
+        self.medidor.activo = activo
+
+    def tiempos(self):
+        """Percentiles móviles (p50, p95, max en segundos) de cada fase medida."""
+        return self.medidor.resumen()
+
     def obtener_superficie_arbol(self):
         """Devuelve la superficie con la visualización del árbol de búsqueda."""
+        if self.visualizador is None:
+            return None
         return self.visualizador.obtener_superficie()
\ No newline at end of file
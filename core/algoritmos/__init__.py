@@ -1,6 +1,14 @@
 # Paquete de algoritmos de búsqueda
-from core.algoritmos.busqueda import bfs, dfs, a_estrella, ids, elegir_algoritmo, agente_atrapado, sugerir_algoritmo
-from core.algoritmos.visualizacion import VisualizadorArbol
+from core.algoritmos.busqueda import bfs, dfs, a_estrella, ids, bfs_compacto, dfs_compacto, a_estrella_compacto, bfs_bidireccional, a_estrella_bidireccional, jps, TablasSalto, hpa_estrella, PlanificadorJerarquico, campo_distancias, CampoDistancias, ArbolPadres, Nodo, d_estrella_lite, PlanificadorIncremental, ALGORITMOS_DISPONIBLES, EstadisticasBusqueda, CacheBusquedas, CACHE_BUSQUEDAS, elegir_algoritmo, agente_atrapado, sugerir_algoritmo
+
+
+def __getattr__(nombre):
+    # VisualizadorArbol depende de pygame, matplotlib y networkx; se importa solo
+    # cuando se pide, para que la simulación sin interfaz no cargue esas librerías.
+    if nombre == "VisualizadorArbol":
+        from core.algoritmos.visualizacion import VisualizadorArbol
+        return VisualizadorArbol
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
 
 # def elegir_algoritmo(laberinto, inicio, meta, algoritmo):
 #     if algoritmo == "BFS":
@@ -1,7 +1,107 @@
 import heapq
-from collections import deque
+import time
+from array import array
+from collections import OrderedDict, deque
+
+import numpy as np
+
+INFINITO = float('inf')
+
+# Nombres de algoritmo que acepta elegir_algoritmo
+ALGORITMOS_DISPONIBLES = ["BFS", "DFS", "A*", "IDS", "D* Lite", "BFS bidireccional", "A* bidireccional", "JPS", "HPA*",
+                          "Campo de distancias"]
+
+# Nodos de la última iteración de IDS que se conservan para visualizar el árbol
+MAX_NODOS_RETENIDOS_IDS = 20000
+
+# Algoritmos cuyo resultado depende del estado guardado en su planificador: no se memorizan
+ALGORITMOS_CON_ESTADO = ("D* Lite", "HPA*", "Campo de distancias")
+# Memoria máxima aproximada (bytes) de la caché de búsquedas compartida
+MEMORIA_CACHE_BUSQUEDAS = 64 * 1024 * 1024
+
+# Tamaños aproximados (bytes) para estimar la memoria de una búsqueda
+BYTES_NODO = 200                  # Nodo con su tupla de estado
+BYTES_ENTRADA = 8                 # Referencia en una lista o deque
+BYTES_ENTRADA_MONTICULO = 80      # Tupla (prioridad, contador, estado) en un montículo
+BYTES_ENTRADA_DICCIONARIO = 100   # Estado con su valor en un dict o set
+
+class EstadisticasBusqueda:
+    """Esfuerzo de una búsqueda, con el mismo significado en todos los algoritmos.
+
+    - expansiones: estados cuyos sucesores se generaron
+    - generaciones: veces que un estado recibió un costo nuevo o mejor (incluye el inicial)
+    - inserciones / extracciones: operaciones sobre la frontera (cola, pila o montículo)
+    - reaperturas: generaciones de un estado que ya tenía costo
+    - pico_frontera: mayor tamaño de la frontera
+    - memoria_pico: estimación en bytes de lo que retiene la búsqueda en su punto máximo
+    - tiempo: segundos de reloj
+
+    Los algoritmos con estado (D* Lite, HPA*, campo de distancias) cuentan solo el
+    trabajo de cada llamada. Un resultado de la caché tiene desde_cache=True y no
+    cuenta esfuerzo de búsqueda.
+    """
+    __slots__ = ("algoritmo", "expansiones", "generaciones", "inserciones", "extracciones",
+                 "reaperturas", "pico_frontera", "memoria_pico", "tiempo", "encontrado",
+                 "longitud_camino", "desde_cache")
+
+    def __init__(self, algoritmo=None):
+        self.algoritmo = algoritmo
+        self.expansiones = 0
+        self.generaciones = 0
+        self.inserciones = 0
+        self.extracciones = 0
+        self.reaperturas = 0
+        self.pico_frontera = 0
+        self.memoria_pico = 0
+        self.tiempo = 0.0
+        self.encontrado = False
+        self.longitud_camino = 0  # Pasos del camino devuelto
+        self.desde_cache = False
+
+    def acumular(self, otra):
+        """Suma otra búsqueda a esta; los picos se combinan con el máximo."""
+        self.expansiones += otra.expansiones
+        self.generaciones += otra.generaciones
+        self.inserciones += otra.inserciones
+        self.extracciones += otra.extracciones
+        self.reaperturas += otra.reaperturas
+        self.pico_frontera = max(self.pico_frontera, otra.pico_frontera)
+        self.memoria_pico = max(self.memoria_pico, otra.memoria_pico)
+        self.tiempo += otra.tiempo
+        return self
+
+    def como_diccionario(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    def __repr__(self):
+        return (f"EstadisticasBusqueda({self.algoritmo!r}, expansiones={self.expansiones}, "
+                f"generaciones={self.generaciones}, pico_frontera={self.pico_frontera}, "
+                f"tiempo={self.tiempo:.6f})")
+
+def completar_estadisticas(estadisticas, resultado, reloj, *, expansiones, generaciones, inserciones,
+                           extracciones, pico_frontera, memoria_pico, reaperturas=0):
+    """Vuelca los contadores de una búsqueda en estadisticas, si se pidieron, y devuelve el resultado.
+
+    reloj es el time.perf_counter() del comienzo de la búsqueda.
+    """
+    if estadisticas is not None:
+        camino = resultado[0]
+        estadisticas.expansiones = expansiones
+        estadisticas.generaciones = generaciones
+        estadisticas.inserciones = inserciones
+        estadisticas.extracciones = extracciones
+        estadisticas.reaperturas = reaperturas
+        estadisticas.pico_frontera = pico_frontera
+        estadisticas.memoria_pico = memoria_pico
+        estadisticas.tiempo = time.perf_counter() - reloj
+        estadisticas.encontrado = camino is not None
+        estadisticas.longitud_camino = len(camino) - 1 if camino else 0
+        estadisticas.desde_cache = False
+    return resultado
 
 class Nodo:
+    __slots__ = ("estado", "padre", "accion", "costo")
+
     def __init__(self, estado, padre=None, accion=None, costo=0):
         self.estado = estado  # Tupla (fila, columna)
         self.padre = padre    # Nodo padre
@@ -18,23 +118,119 @@ def reconstruir_camino(nodo):  # Reconstruye el camino desde el nodo inicial has
         nodo = nodo.padre
     return list(reversed(camino))  # Devuelve el camino en el orden correcto.
 
+# Posibles movimientos: izquierda, abajo, derecha, arriba (orden invertido para DFS LIFO).
+# Coinciden en orden con Laberinto.desplazamientos.
+MOVIMIENTOS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+NOMBRES_MOVIMIENTOS = ["izquierda", "abajo", "derecha", "arriba"]
+
+# Marcas del arreglo de padres
+SIN_PADRE = -1     # Raíz del árbol de búsqueda
+NO_GENERADO = -2   # Celda todavía no generada
+
+class GeometriaRejilla:
+    """Solo la forma de un laberinto (sin sus celdas), para árboles guardados en la caché."""
+    __slots__ = ("filas", "columnas", "ancho", "desplazamientos")
+
+    def __init__(self, laberinto):
+        self.filas = laberinto.filas
+        self.columnas = laberinto.columnas
+        self.ancho = laberinto.ancho
+        self.desplazamientos = laberinto.desplazamientos
+
+    def id_celda(self, posicion):
+        return (posicion[0] + 1) * self.ancho + posicion[1] + 1
+
+    def posicion_celda(self, id_celda):
+        fila, col = divmod(id_celda, self.ancho)
+        return (fila - 1, col - 1)
+
+
+class ArbolPadres:
+    """Árbol de búsqueda guardado como un arreglo de padres indexado por id de celda.
+
+    Se comporta como la lista de nodos generados de las búsquedas clásicas, pero
+    los objetos Nodo solo se construyen cuando alguien los recorre (por ejemplo,
+    el visualizador del árbol).
+    """
+    __slots__ = ("laberinto", "padres", "generados", "_nodos")
+
+    def __init__(self, laberinto):
+        self.laberinto = laberinto
+        self.padres = array('i', [NO_GENERADO]) * len(laberinto.celdas)
+        self.generados = array('i')  # Ids en orden de generación
+        self._nodos = {}
+
+    def camino(self, id_final):
+        """Reconstruye el camino (lista de posiciones) hasta id_final."""
+        padres = self.padres
+        camino = []
+        actual = id_final
+        while actual != SIN_PADRE:
+            camino.append(self.laberinto.posicion_celda(actual))
+            actual = padres[actual]
+        return list(reversed(camino))
+
+    def nodo(self, id_celda):
+        """Devuelve el Nodo de una celda generada, creando sus ancestros si hace falta."""
+        pendientes = []
+        actual = id_celda
+        while actual != SIN_PADRE and actual not in self._nodos:
+            pendientes.append(actual)
+            actual = self.padres[actual]
+        padre = self._nodos.get(actual)
+        desplazamientos = self.laberinto.desplazamientos
+        for actual in reversed(pendientes):
+            accion = None
+            if padre is not None:
+                paso = actual - self.laberinto.id_celda(padre.estado)
+                accion = NOMBRES_MOVIMIENTOS[desplazamientos.index(paso)]
+            padre = Nodo(self.laberinto.posicion_celda(actual), padre, accion,
+                         padre.costo + 1 if padre is not None else 0)
+            self._nodos[actual] = padre
+        return padre
+
+    def compartido(self, geometria=None):
+        """Otro árbol sobre los mismos arreglos, sin nodos construidos.
+
+        Usa la geometría dada o una GeometriaRejilla, de modo que no retiene el
+        laberinto (ni sus celdas) con el que se hizo la búsqueda.
+        """
+        arbol = ArbolPadres.__new__(ArbolPadres)
+        arbol.laberinto = geometria if geometria is not None else GeometriaRejilla(self.laberinto)
+        arbol.padres = self.padres
+        arbol.generados = self.generados
+        arbol._nodos = {}
+        return arbol
+
+    def estados(self):
+        """Posiciones generadas, en orden, sin construir nodos."""
+        posicion_celda = self.laberinto.posicion_celda
+        return [posicion_celda(id_celda) for id_celda in self.generados]
+
+    def __len__(self):
+        return len(self.generados)
+
+    def __getitem__(self, indice):
+        return self.nodo(self.generados[indice])
+
+    def __iter__(self):
+        for id_celda in self.generados:
+            yield self.nodo(id_celda)
+
+def reconstruir_camino_padres(arbol, id_final):  # Reconstruye el camino a partir del arreglo de padres.
+    return arbol.camino(id_final)
+
 def acciones_validas(estado, laberinto):  # Obtiene las acciones válidas desde un estado en el laberinto.
     fila, col = estado
     acciones = []
-    
-    # Posibles movimientos: izquierda, abajo, derecha, arriba (orden invertido para DFS LIFO)
-    movimientos = [(0, -1), (1, 0), (0, 1), (-1, 0)]
-    nombres = ["izquierda", "abajo", "derecha", "arriba"]
 
-    
-    for i, (df, dc) in enumerate(movimientos):
-        nueva_fila, nueva_col = fila + df, col + dc
-        
-        # Verificar que esté dentro del laberinto
-        if (0 <= nueva_fila < laberinto.filas and 
-            0 <= nueva_col < laberinto.columnas and 
-            laberinto.grid[nueva_fila][nueva_col] == 0):
-            acciones.append((nombres[i], (nueva_fila, nueva_col)))
+    # El borde de paredes del almacenamiento plano hace innecesario comprobar límites
+    celdas = laberinto.celdas
+    id_estado = laberinto.id_celda(estado)
+    for i, desplazamiento in enumerate(laberinto.desplazamientos):
+        if not celdas[id_estado + desplazamiento]:
+            df, dc = MOVIMIENTOS[i]
+            acciones.append((NOMBRES_MOVIMIENTOS[i], (fila + df, col + dc)))
     
     return acciones
 
@@ -42,18 +238,25 @@ def distancia_manhattan(estado1, estado2):
     """Calcula la distancia Manhattan entre dos estados."""
     return abs(estado1[0] - estado2[0]) + abs(estado1[1] - estado2[1])
 
-def bfs(laberinto, estado_inicial, meta):  # Realiza una búsqueda en amplitud (BFS) para encontrar un camino.
+def bfs(laberinto, estado_inicial, meta, estadisticas=None):  # Realiza una búsqueda en amplitud (BFS) para encontrar un camino.
+    reloj = time.perf_counter()
     nodo_inicial = Nodo(estado_inicial)
     nodos_generados = [nodo_inicial]
     if estado_inicial == meta:
-        return reconstruir_camino(nodo_inicial), [estado_inicial], nodo_inicial
+        return completar_estadisticas(estadisticas,
+                                      (reconstruir_camino(nodo_inicial), [estado_inicial], nodo_inicial),
+                                      reloj, expansiones=0, generaciones=1, inserciones=0, extracciones=0,
+                                      pico_frontera=0, memoria_pico=BYTES_NODO)
     
     frontera = deque([nodo_inicial])
     explorados = set()
     estados_frontera = {estado_inicial}  # Conjunto de estados en la frontera
     todos_visitados = []  # Para visualización
+    pico_frontera = 0
     
     while frontera:
+        if len(frontera) > pico_frontera:
+            pico_frontera = len(frontera)
         nodo = frontera.popleft()
         estados_frontera.remove(nodo.estado)  # Eliminar de frontera
         
@@ -66,25 +269,42 @@ def bfs(laberinto, estado_inicial, meta):  # Realiza una búsqueda en amplitud (
                 nodos_generados.append(hijo)
                 
                 if estado == meta:
-                    return reconstruir_camino(hijo), nodos_generados, hijo
+                    generaciones = len(nodos_generados)
+                    return completar_estadisticas(
+                        estadisticas, (reconstruir_camino(hijo), nodos_generados, hijo), reloj,
+                        expansiones=len(todos_visitados), generaciones=generaciones,
+                        inserciones=generaciones - 1, extracciones=len(todos_visitados),
+                        pico_frontera=pico_frontera,
+                        memoria_pico=generaciones * (BYTES_NODO + BYTES_ENTRADA_DICCIONARIO))
                 
                 frontera.append(hijo)
                 estados_frontera.add(estado)
     
-    return None, todos_visitados, None  # No se encontró camino
+    generaciones = len(nodos_generados)
+    return completar_estadisticas(  # No se encontró camino
+        estadisticas, (None, todos_visitados, None), reloj, expansiones=len(todos_visitados),
+        generaciones=generaciones, inserciones=generaciones, extracciones=len(todos_visitados),
+        pico_frontera=pico_frontera, memoria_pico=generaciones * (BYTES_NODO + BYTES_ENTRADA_DICCIONARIO))
 
-def dfs(laberinto, estado_inicial, meta):  # Realiza una búsqueda en profundidad (DFS) para encontrar un camino.
+def dfs(laberinto, estado_inicial, meta, estadisticas=None):  # Realiza una búsqueda en profundidad (DFS) para encontrar un camino.
+    reloj = time.perf_counter()
     nodo_inicial = Nodo(estado_inicial)
     nodos_generados = [nodo_inicial]
     if estado_inicial == meta:
-        return reconstruir_camino(nodo_inicial), [estado_inicial], nodo_inicial
+        return completar_estadisticas(estadisticas,
+                                      (reconstruir_camino(nodo_inicial), [estado_inicial], nodo_inicial),
+                                      reloj, expansiones=0, generaciones=1, inserciones=0, extracciones=0,
+                                      pico_frontera=0, memoria_pico=BYTES_NODO)
     
     frontera = [nodo_inicial]  # Lista como pila
     estados_frontera = {estado_inicial}  # Conjunto de estados en la frontera
     explorados = set()
     todos_visitados = []  # Para visualización
+    pico_frontera = 0
     
     while frontera:
+        if len(frontera) > pico_frontera:
+            pico_frontera = len(frontera)
         nodo = frontera.pop()  # Extraer del final (LIFO)
         estados_frontera.remove(nodo.estado)  # Eliminar de frontera
         
@@ -93,7 +313,13 @@ def dfs(laberinto, estado_inicial, meta):  # Realiza una búsqueda en profundida
             todos_visitados.append(nodo.estado)
             
             if nodo.estado == meta:
-                return reconstruir_camino(nodo), nodos_generados, nodo
+                # La meta se extrae pero no se expande
+                generaciones = len(nodos_generados)
+                return completar_estadisticas(
+                    estadisticas, (reconstruir_camino(nodo), nodos_generados, nodo), reloj,
+                    expansiones=len(todos_visitados) - 1, generaciones=generaciones, inserciones=generaciones,
+                    extracciones=len(todos_visitados), pico_frontera=pico_frontera,
+                    memoria_pico=generaciones * (BYTES_NODO + BYTES_ENTRADA_DICCIONARIO))
             
             # Añadir los sucesores
             for accion, estado in acciones_validas(nodo.estado, laberinto):
@@ -103,13 +329,21 @@ def dfs(laberinto, estado_inicial, meta):  # Realiza una búsqueda en profundida
                     nodos_generados.append(hijo)
                     estados_frontera.add(estado)
     
-    return None, todos_visitados, None  # No se encontró camino
+    generaciones = len(nodos_generados)
+    return completar_estadisticas(  # No se encontró camino
+        estadisticas, (None, todos_visitados, None), reloj, expansiones=len(todos_visitados),
+        generaciones=generaciones, inserciones=generaciones, extracciones=len(todos_visitados),
+        pico_frontera=pico_frontera, memoria_pico=generaciones * (BYTES_NODO + BYTES_ENTRADA_DICCIONARIO))
 
-def a_estrella(laberinto, estado_inicial, meta):  # Realiza el algoritmo A* para encontrar un camino óptimo.
+def a_estrella(laberinto, estado_inicial, meta, estadisticas=None):  # Realiza el algoritmo A* para encontrar un camino óptimo.
+    reloj = time.perf_counter()
     nodo_inicial = Nodo(estado_inicial)
     nodos_generados = [nodo_inicial]
     if estado_inicial == meta:
-        return reconstruir_camino(nodo_inicial), [estado_inicial], nodo_inicial
+        return completar_estadisticas(estadisticas,
+                                      (reconstruir_camino(nodo_inicial), [estado_inicial], nodo_inicial),
+                                      reloj, expansiones=0, generaciones=1, inserciones=0, extracciones=0,
+                                      pico_frontera=0, memoria_pico=BYTES_NODO)
     
     # Cola de prioridad: (f-value, contador, nodo)
     contador = 0  # Para desempates
@@ -125,13 +359,24 @@ def a_estrella(laberinto, estado_inicial, meta):  # Realiza el algoritmo A* para
     
     # Mapa de costos g para los estados
     g_costo = {estado_inicial: 0}
+    extracciones = 0
+    pico_frontera = 0
     
     while frontera:
+        if len(frontera) > pico_frontera:
+            pico_frontera = len(frontera)
         _, _, nodo = heapq.heappop(frontera)
+        extracciones += 1
         estados_frontera.remove(nodo.estado)
         
         if nodo.estado == meta:
-            return reconstruir_camino(nodo), nodos_generados, nodo
+            generaciones = len(nodos_generados)
+            return completar_estadisticas(
+                estadisticas, (reconstruir_camino(nodo), nodos_generados, nodo), reloj,
+                expansiones=len(todos_visitados), generaciones=generaciones, inserciones=contador,
+                extracciones=extracciones, pico_frontera=pico_frontera,
+                memoria_pico=generaciones * (BYTES_NODO + BYTES_ENTRADA_DICCIONARIO) + pico_frontera * BYTES_ENTRADA_MONTICULO,
+                reaperturas=generaciones - len(g_costo))
         
         if nodo.estado not in explorados:
             explorados.add(nodo.estado)
@@ -153,64 +398,1649 @@ def a_estrella(laberinto, estado_inicial, meta):  # Realiza el algoritmo A* para
                     # Si ya está en la frontera pero con un costo mayor, actualizarlo
                     # (esto requeriría una implementación más compleja con diccionarios adicionales)
     
-    return None, nodos_generados, None  # No se encontró camino
-
-def ids(laberinto, estado_inicial, meta, limite_max=7):
-    """Búsqueda por profundización iterativa (IDS) usando nodos completos."""
-    class NodoIDS:
-        def __init__(self, estado, padre=None, accion=None, profundidad=0):
-            self.estado = estado
-            self.padre = padre
-            self.accion = accion
-            self.profundidad = profundidad
-
-    def reconstruir_camino_desde_nodo(nodo):
-        camino = []
-        while nodo:
-            camino.append(nodo.estado)
-            nodo = nodo.padre
-        return list(reversed(camino))
+    generaciones = len(nodos_generados)
+    return completar_estadisticas(  # No se encontró camino
+        estadisticas, (None, nodos_generados, None), reloj, expansiones=len(todos_visitados),
+        generaciones=generaciones, inserciones=contador, extracciones=extracciones,
+        pico_frontera=pico_frontera,
+        memoria_pico=generaciones * (BYTES_NODO + BYTES_ENTRADA_DICCIONARIO) + pico_frontera * BYTES_ENTRADA_MONTICULO,
+        reaperturas=generaciones - len(g_costo))
+
+def bfs_compacto(laberinto, estado_inicial, meta, estadisticas=None):  # BFS que registra padres en un arreglo en lugar de crear nodos.
+    reloj = time.perf_counter()
+    arbol = ArbolPadres(laberinto)
+    celdas = laberinto.celdas
+    desplazamientos = laberinto.desplazamientos
+    padres = arbol.padres
+    generados = arbol.generados
+
+    inicio = laberinto.id_celda(estado_inicial)
+    id_meta = laberinto.id_celda(meta)
+    padres[inicio] = SIN_PADRE
+    generados.append(inicio)
+    memoria = padres.itemsize * len(padres)
+    if inicio == id_meta:
+        return completar_estadisticas(estadisticas, ([estado_inicial], arbol, arbol.nodo(inicio)), reloj,
+                                      expansiones=0, generaciones=1, inserciones=0, extracciones=0,
+                                      pico_frontera=0, memoria_pico=memoria)
+
+    frontera = deque([inicio])
+    expansiones = 0
+    pico_frontera = 0
+    while frontera:
+        if len(frontera) > pico_frontera:
+            pico_frontera = len(frontera)
+        actual = frontera.popleft()
+        expansiones += 1
+        for desplazamiento in desplazamientos:
+            vecino = actual + desplazamiento
+            # Una celda generada ya está en la frontera o explorada
+            if not celdas[vecino] and padres[vecino] == NO_GENERADO:
+                padres[vecino] = actual
+                generados.append(vecino)
+                if vecino == id_meta:
+                    return completar_estadisticas(
+                        estadisticas, (arbol.camino(vecino), arbol, arbol.nodo(vecino)), reloj,
+                        expansiones=expansiones, generaciones=len(generados), inserciones=len(generados) - 1,
+                        extracciones=expansiones, pico_frontera=pico_frontera,
+                        memoria_pico=memoria + generados.itemsize * len(generados) + BYTES_ENTRADA * pico_frontera)
+                frontera.append(vecino)
+
+    return completar_estadisticas(  # No se encontró camino
+        estadisticas, (None, arbol, None), reloj, expansiones=expansiones, generaciones=len(generados),
+        inserciones=len(generados), extracciones=expansiones, pico_frontera=pico_frontera,
+        memoria_pico=memoria + generados.itemsize * len(generados) + BYTES_ENTRADA * pico_frontera)
+
+def dfs_compacto(laberinto, estado_inicial, meta, estadisticas=None):  # DFS que registra padres en un arreglo en lugar de crear nodos.
+    reloj = time.perf_counter()
+    arbol = ArbolPadres(laberinto)
+    celdas = laberinto.celdas
+    desplazamientos = laberinto.desplazamientos
+    padres = arbol.padres
+    generados = arbol.generados
+
+    inicio = laberinto.id_celda(estado_inicial)
+    id_meta = laberinto.id_celda(meta)
+    padres[inicio] = SIN_PADRE
+    generados.append(inicio)
+    memoria = padres.itemsize * len(padres)
 
+    frontera = [inicio]  # Lista como pila
+    expansiones = 0
+    pico_frontera = 0
+    while frontera:
+        if len(frontera) > pico_frontera:
+            pico_frontera = len(frontera)
+        actual = frontera.pop()  # Extraer del final (LIFO)
+        if actual == id_meta:
+            return completar_estadisticas(
+                estadisticas, (arbol.camino(actual), arbol, arbol.nodo(actual)), reloj,
+                expansiones=expansiones, generaciones=len(generados), inserciones=len(generados),
+                extracciones=expansiones + 1, pico_frontera=pico_frontera,
+                memoria_pico=memoria + generados.itemsize * len(generados) + BYTES_ENTRADA * pico_frontera)
+        expansiones += 1
+
+        for desplazamiento in desplazamientos:
+            vecino = actual + desplazamiento
+            if not celdas[vecino] and padres[vecino] == NO_GENERADO:
+                padres[vecino] = actual
+                generados.append(vecino)
+                frontera.append(vecino)
+
+    return completar_estadisticas(  # No se encontró camino
+        estadisticas, (None, arbol, None), reloj, expansiones=expansiones, generaciones=len(generados),
+        inserciones=len(generados), extracciones=expansiones, pico_frontera=pico_frontera,
+        memoria_pico=memoria + generados.itemsize * len(generados) + BYTES_ENTRADA * pico_frontera)
+
+def a_estrella_compacto(laberinto, estado_inicial, meta, estadisticas=None):  # A* con costos y padres en arreglos indexados por id de celda.
+    reloj = time.perf_counter()
+    arbol = ArbolPadres(laberinto)
+    celdas = laberinto.celdas
+    desplazamientos = laberinto.desplazamientos
+    ancho = laberinto.ancho
+    padres = arbol.padres
+    generados = arbol.generados
+
+    inicio = laberinto.id_celda(estado_inicial)
+    id_meta = laberinto.id_celda(meta)
+    fila_meta, col_meta = divmod(id_meta, ancho)
+    padres[inicio] = SIN_PADRE
+    generados.append(inicio)
+
+    g_costo = array('i', [-1]) * len(celdas)  # -1: sin costo conocido
+    cerrados = bytearray(len(celdas))
+    g_costo[inicio] = 0
+    memoria = (padres.itemsize + g_costo.itemsize + 1) * len(celdas)
+
+    # Cola de prioridad: (f-value, contador, id); las entradas obsoletas se descartan al extraerlas
+    contador = 0
+    frontera = [(distancia_manhattan(estado_inicial, meta), contador, inicio)]
+    expansiones = extracciones = reaperturas = pico_frontera = 0
+    while frontera:
+        if len(frontera) > pico_frontera:
+            pico_frontera = len(frontera)
+        _, _, actual = heapq.heappop(frontera)
+        extracciones += 1
+        if actual == id_meta:
+            return completar_estadisticas(
+                estadisticas, (arbol.camino(actual), arbol, arbol.nodo(actual)), reloj,
+                expansiones=expansiones, generaciones=len(generados), inserciones=contador + 1,
+                extracciones=extracciones, pico_frontera=pico_frontera,
+                memoria_pico=memoria + generados.itemsize * len(generados) + BYTES_ENTRADA_MONTICULO * pico_frontera,
+                reaperturas=reaperturas)
+        if cerrados[actual]:
+            continue
+        cerrados[actual] = 1
+        expansiones += 1
+
+        nuevo_costo = g_costo[actual] + 1
+        for desplazamiento in desplazamientos:
+            vecino = actual + desplazamiento
+            if celdas[vecino] or cerrados[vecino]:
+                continue
+            costo_vecino = g_costo[vecino]
+            if costo_vecino == -1 or nuevo_costo < costo_vecino:
+                if costo_vecino != -1:
+                    reaperturas += 1
+                g_costo[vecino] = nuevo_costo
+                padres[vecino] = actual
+                generados.append(vecino)
+                fila, col = divmod(vecino, ancho)
+                contador += 1
+                heapq.heappush(frontera, (nuevo_costo + abs(fila - fila_meta) + abs(col - col_meta),
+                                          contador, vecino))
+
+    return completar_estadisticas(  # No se encontró camino
+        estadisticas, (None, arbol, None), reloj, expansiones=expansiones, generaciones=len(generados),
+        inserciones=contador + 1, extracciones=extracciones, pico_frontera=pico_frontera,
+        memoria_pico=memoria + generados.itemsize * len(generados) + BYTES_ENTRADA_MONTICULO * pico_frontera,
+        reaperturas=reaperturas)
+
+def unir_arboles_bidireccionales(laberinto, ida, vuelta, encuentro):
+    """Une los árboles de una búsqueda bidireccional en un solo árbol con raíz en el inicio.
+
+    El tramo encuentro -> meta del árbol inverso se reencadena hacia el inicio y el
+    resto de celdas del árbol inverso cuelga de su padre en ese árbol. Devuelve
+    (camino, arbol, nodo_final) como las demás búsquedas.
+    """
+    padres = ida.padres
+    padres_vuelta = vuelta.padres
+    anterior = encuentro
+    actual = padres_vuelta[encuentro]
+    while actual != SIN_PADRE:
+        siguiente = padres_vuelta[actual]
+        if padres[actual] == NO_GENERADO:
+            ida.generados.append(actual)
+        padres[actual] = anterior
+        anterior, actual = actual, siguiente
+    for id_celda in vuelta.generados:
+        if padres[id_celda] == NO_GENERADO:
+            padres[id_celda] = padres_vuelta[id_celda]
+            ida.generados.append(id_celda)
+    return ida.camino(anterior), ida, ida.nodo(anterior)
+
+def bfs_bidireccional(laberinto, estado_inicial, meta, estadisticas=None):  # BFS desde el inicio y desde la meta, alternando capas completas.
+    reloj = time.perf_counter()
+    ida = ArbolPadres(laberinto)
+    vuelta = ArbolPadres(laberinto)
+    celdas = laberinto.celdas
+    desplazamientos = laberinto.desplazamientos
+
+    inicio = laberinto.id_celda(estado_inicial)
+    id_meta = laberinto.id_celda(meta)
+    ida.padres[inicio] = SIN_PADRE
+    ida.generados.append(inicio)
+    # Dos árboles de padres y dos arreglos de distancias
+    memoria = 4 * ida.padres.itemsize * len(celdas)
+    if inicio == id_meta:
+        return completar_estadisticas(estadisticas, ([estado_inicial], ida, ida.nodo(inicio)), reloj,
+                                      expansiones=0, generaciones=1, inserciones=0, extracciones=0,
+                                      pico_frontera=0, memoria_pico=memoria)
+    vuelta.padres[id_meta] = SIN_PADRE
+    vuelta.generados.append(id_meta)
+
+    distancias_ida = array('i', [-1]) * len(celdas)
+    distancias_vuelta = array('i', [-1]) * len(celdas)
+    distancias_ida[inicio] = 0
+    distancias_vuelta[id_meta] = 0
+    frontera_ida = [inicio]
+    frontera_vuelta = [id_meta]
+    expansiones = pico_frontera = 0
+    while frontera_ida and frontera_vuelta:
+        pico_frontera = max(pico_frontera, len(frontera_ida) + len(frontera_vuelta))
+        # Se expande completa la capa de la frontera más pequeña
+        if len(frontera_ida) <= len(frontera_vuelta):
+            arbol, distancias, distancias_otro, frontera = ida, distancias_ida, distancias_vuelta, frontera_ida
+        else:
+            arbol, distancias, distancias_otro, frontera = vuelta, distancias_vuelta, distancias_ida, frontera_vuelta
+        padres = arbol.padres
+        generados = arbol.generados
+        siguiente_capa = []
+        mejor_costo = INFINITO
+        encuentro = None
+        for actual in frontera:
+            distancia = distancias[actual] + 1
+            for desplazamiento in desplazamientos:
+                vecino = actual + desplazamiento
+                if celdas[vecino] or padres[vecino] != NO_GENERADO:
+                    continue
+                padres[vecino] = actual
+                generados.append(vecino)
+                distancias[vecino] = distancia
+                if distancias_otro[vecino] != -1 and distancia + distancias_otro[vecino] < mejor_costo:
+                    mejor_costo = distancia + distancias_otro[vecino]
+                    encuentro = vecino
+                siguiente_capa.append(vecino)
+        expansiones += len(frontera)
+        # El mejor encuentro de una capa completa es óptimo
+        if encuentro is not None:
+            generaciones = len(ida.generados) + len(vuelta.generados)
+            return completar_estadisticas(
+                estadisticas, unir_arboles_bidireccionales(laberinto, ida, vuelta, encuentro), reloj,
+                expansiones=expansiones, generaciones=generaciones, inserciones=generaciones,
+                extracciones=expansiones, pico_frontera=pico_frontera,
+                memoria_pico=memoria + ida.generados.itemsize * generaciones + BYTES_ENTRADA * pico_frontera)
+        if arbol is ida:
+            frontera_ida = siguiente_capa
+        else:
+            frontera_vuelta = siguiente_capa
+
+    generaciones = len(ida.generados) + len(vuelta.generados)
+    return completar_estadisticas(  # No se encontró camino
+        estadisticas, (None, ida, None), reloj, expansiones=expansiones, generaciones=generaciones,
+        inserciones=generaciones, extracciones=expansiones, pico_frontera=pico_frontera,
+        memoria_pico=memoria + ida.generados.itemsize * generaciones + BYTES_ENTRADA * pico_frontera)
+
+def a_estrella_bidireccional(laberinto, estado_inicial, meta, estadisticas=None):  # A* desde ambos extremos con heurística front-to-end.
+    reloj = time.perf_counter()
+    ida = ArbolPadres(laberinto)
+    vuelta = ArbolPadres(laberinto)
+    celdas = laberinto.celdas
+    desplazamientos = laberinto.desplazamientos
+    ancho = laberinto.ancho
+
+    inicio = laberinto.id_celda(estado_inicial)
+    id_meta = laberinto.id_celda(meta)
+    ida.padres[inicio] = SIN_PADRE
+    ida.generados.append(inicio)
+    # Por cada sentido: arreglo de padres, costos g y cerrados
+    memoria = 2 * (ida.padres.itemsize * 2 + 1) * len(celdas)
+    if inicio == id_meta:
+        return completar_estadisticas(estadisticas, ([estado_inicial], ida, ida.nodo(inicio)), reloj,
+                                      expansiones=0, generaciones=1, inserciones=0, extracciones=0,
+                                      pico_frontera=0, memoria_pico=memoria)
+    vuelta.padres[id_meta] = SIN_PADRE
+    vuelta.generados.append(id_meta)
+
+    # Por cada sentido: árbol, costos g, cerrados, cola y celda objetivo de la heurística
+    sentidos = []
+    for arbol, origen, objetivo in ((ida, inicio, id_meta), (vuelta, id_meta, inicio)):
+        g_costo = array('i', [-1]) * len(celdas)
+        g_costo[origen] = 0
+        fila_objetivo, col_objetivo = divmod(objetivo, ancho)
+        fila, col = divmod(origen, ancho)
+        frontera = [(abs(fila - fila_objetivo) + abs(col - col_objetivo), 0, origen)]
+        sentidos.append((arbol, g_costo, bytearray(len(celdas)), frontera, fila_objetivo, col_objetivo))
+
+    mejor_costo = INFINITO  # Costo del mejor camino encontrado al cruzarse las búsquedas
+    encuentro = None
+    contador = 0
+    expansiones = extracciones = reaperturas = pico_frontera = 0
+    while sentidos[0][3] and sentidos[1][3]:
+        pico_frontera = max(pico_frontera, len(sentidos[0][3]) + len(sentidos[1][3]))
+        # Terminación: ningún camino por celdas abiertas puede mejorar el encontrado
+        if mejor_costo <= max(sentidos[0][3][0][0], sentidos[1][3][0][0]):
+            break
+        # Se expande el sentido con la cola más pequeña
+        indice = 0 if len(sentidos[0][3]) <= len(sentidos[1][3]) else 1
+        arbol, g_costo, cerrados, frontera, fila_objetivo, col_objetivo = sentidos[indice]
+        g_otro = sentidos[1 - indice][1]
+        padres = arbol.padres
+
+        _, _, actual = heapq.heappop(frontera)
+        extracciones += 1
+        if cerrados[actual]:
+            continue
+        cerrados[actual] = 1
+        expansiones += 1
+        nuevo_costo = g_costo[actual] + 1
+        for desplazamiento in desplazamientos:
+            vecino = actual + desplazamiento
+            if celdas[vecino] or cerrados[vecino]:
+                continue
+            costo_vecino = g_costo[vecino]
+            if costo_vecino == -1 or nuevo_costo < costo_vecino:
+                if costo_vecino != -1:
+                    reaperturas += 1
+                g_costo[vecino] = nuevo_costo
+                padres[vecino] = actual
+                arbol.generados.append(vecino)
+                if g_otro[vecino] != -1 and nuevo_costo + g_otro[vecino] < mejor_costo:
+                    mejor_costo = nuevo_costo + g_otro[vecino]
+                    encuentro = vecino
+                fila, col = divmod(vecino, ancho)
+                contador += 1
+                heapq.heappush(frontera, (nuevo_costo + abs(fila - fila_objetivo) + abs(col - col_objetivo),
+                                          contador, vecino))
+
+    generaciones = len(ida.generados) + len(vuelta.generados)
+    memoria += ida.generados.itemsize * generaciones + BYTES_ENTRADA_MONTICULO * pico_frontera
+    if encuentro is None:
+        resultado = (None, ida, None)  # No se encontró camino
+    else:
+        resultado = unir_arboles_bidireccionales(laberinto, ida, vuelta, encuentro)
+    return completar_estadisticas(estadisticas, resultado, reloj, expansiones=expansiones,
+                                  generaciones=generaciones, inserciones=contador + 2,
+                                  extracciones=extracciones, pico_frontera=pico_frontera,
+                                  memoria_pico=memoria, reaperturas=reaperturas)
+
+def ids(laberinto, estado_inicial, meta, limite_max=None, heuristica=True, max_nodos_retenidos=None,
+        estadisticas=None):
+    """Búsqueda por profundización iterativa (IDA* por defecto) con pila explícita.
+
+    - Sin recursión: no depende del límite de recursión de Python.
+    - En cada iteración se guarda la menor profundidad con que se alcanzó cada
+      celda y no se vuelve a expandir por caminos más largos.
+    - Con heuristica=True (IDA*) se poda por profundidad + Manhattan y el
+      siguiente límite es el menor valor que superó al actual. Con
+      heuristica=False (IDS clásico) se poda solo por profundidad y el límite
+      crece de 2 en 2 desde la distancia Manhattan; reabre muchas más celdas.
+    - Si la meta no está conectada con el inicio se termina sin iterar. Con
+      limite_max=None el tope es el número de celdas libres; además, si una
+      iteración no corta ninguna rama, la meta es inalcanzable y se termina.
+    - max_nodos_retenidos limita los nodos de la última iteración que se
+      devuelven para la visualización.
+    - Las estadísticas suman el trabajo de todas las iteraciones.
+    """
+    reloj = time.perf_counter()
+    celdas = laberinto.celdas
+    desplazamientos = laberinto.desplazamientos
+    id_inicial = laberinto.id_celda(estado_inicial)
+    id_meta = laberinto.id_celda(meta)
+    fila_meta, col_meta = meta
+    ancho = laberinto.ancho
+
+    def manhattan(id_celda):
+        return abs(id_celda // ancho - 1 - fila_meta) + abs(id_celda % ancho - 1 - col_meta)
+
+    if id_inicial != id_meta and not laberinto.hay_camino(estado_inicial, meta):
+        # Cada iteración recorrería de nuevo toda la región alcanzable sin éxito
+        return completar_estadisticas(estadisticas, (None, [Nodo(estado_inicial)], None), reloj,
+                                      expansiones=0, generaciones=1, inserciones=0, extracciones=0,
+                                      pico_frontera=0, memoria_pico=BYTES_NODO)
+    if limite_max is None:
+        limite_max = celdas.count(0)
+    limite = distancia_manhattan(estado_inicial, meta)
     nodos_generados = []
+    expansiones = generaciones = extracciones = reaperturas = pico_frontera = memoria = 0
 
-    def dls(nodo, meta, limite):
-        if nodo.estado == meta:
-            return nodo
-        if limite == 0:
+    while limite <= limite_max:
+        raiz = Nodo(estado_inicial)
+        nodos_generados = [raiz]
+        generaciones += 1
+        if id_inicial == id_meta:
+            return completar_estadisticas(estadisticas, ([estado_inicial], nodos_generados, raiz), reloj,
+                                          expansiones=0, generaciones=1, inserciones=0, extracciones=0,
+                                          pico_frontera=0, memoria_pico=BYTES_NODO)
+
+        mejor = {id_inicial: 0}  # Menor profundidad de cada celda en esta iteración
+        padres = {id_inicial: SIN_PADRE}
+        pila = [(id_inicial, 0, raiz)]
+        cortado = False
+        siguiente_limite = INFINITO
+        while pila:
+            if len(pila) > pico_frontera:
+                pico_frontera = len(pila)
+            actual, profundidad, nodo = pila.pop()
+            extracciones += 1
+            if mejor[actual] < profundidad:
+                continue  # Se alcanzó después por un camino más corto
+            expansiones += 1
+            hijos = []
+            for i, desplazamiento in enumerate(desplazamientos):
+                vecino = actual + desplazamiento
+                if celdas[vecino]:
+                    continue
+                profundidad_vecino = profundidad + 1
+                if mejor.get(vecino, INFINITO) <= profundidad_vecino:
+                    continue
+                costo = profundidad_vecino + manhattan(vecino) if heuristica else profundidad_vecino
+                if costo > limite:
+                    cortado = True
+                    siguiente_limite = min(siguiente_limite, costo)
+                    continue
+                generaciones += 1
+                if vecino in mejor:
+                    reaperturas += 1
+                mejor[vecino] = profundidad_vecino
+                padres[vecino] = actual
+                hijo = None
+                if nodo is not None and (max_nodos_retenidos is None or len(nodos_generados) < max_nodos_retenidos):
+                    hijo = Nodo(laberinto.posicion_celda(vecino), nodo, NOMBRES_MOVIMIENTOS[i], profundidad_vecino)
+                    nodos_generados.append(hijo)
+                if vecino == id_meta:
+                    if hijo is None:
+                        # El nodo no se retuvo: reconstruirlo desde el registro de padres
+                        ids_camino = []
+                        while vecino != SIN_PADRE:
+                            ids_camino.append(vecino)
+                            vecino = padres[vecino]
+                        ids_camino.reverse()
+                        hijo = raiz
+                        for anterior, siguiente in zip(ids_camino, ids_camino[1:]):
+                            accion = NOMBRES_MOVIMIENTOS[desplazamientos.index(siguiente - anterior)]
+                            hijo = Nodo(laberinto.posicion_celda(siguiente), hijo, accion, hijo.costo + 1)
+                    memoria = max(memoria, 2 * BYTES_ENTRADA_DICCIONARIO * len(mejor) +
+                                  BYTES_NODO * len(nodos_generados) + BYTES_ENTRADA_MONTICULO * pico_frontera)
+                    return completar_estadisticas(
+                        estadisticas, (reconstruir_camino(hijo), nodos_generados, hijo), reloj,
+                        expansiones=expansiones, generaciones=generaciones, inserciones=generaciones - 1,
+                        extracciones=extracciones, pico_frontera=pico_frontera, memoria_pico=memoria,
+                        reaperturas=reaperturas)
+                hijos.append((vecino, profundidad_vecino, hijo))
+            # Apilar en orden inverso para expandir primero la primera acción
+            pila.extend(reversed(hijos))
+
+        # mejor y padres guardan una entrada por celda alcanzada en la iteración
+        memoria = max(memoria, 2 * BYTES_ENTRADA_DICCIONARIO * len(mejor) +
+                      BYTES_NODO * len(nodos_generados) + BYTES_ENTRADA_MONTICULO * pico_frontera)
+        if not cortado:
+            break  # Se recorrió todo lo alcanzable sin llegar a la meta
+        limite = max(siguiente_limite, limite + 2) if not heuristica else siguiente_limite
+
+    return completar_estadisticas(estadisticas, (None, nodos_generados, None), reloj, expansiones=expansiones,
+                                  generaciones=generaciones, inserciones=generaciones,
+                                  extracciones=extracciones, pico_frontera=pico_frontera,
+                                  memoria_pico=memoria, reaperturas=reaperturas)
+
+
+class PlanificadorIncremental:
+    """Planificador D* Lite que conserva sus tablas g/rhs entre llamadas.
+
+    La búsqueda se hace desde la meta hacia el agente, así que cuando el agente
+    avanza o cambian algunas celdas solo se repara la parte afectada del árbol
+    en lugar de repetir la búsqueda completa.
+    """
+
+    def __init__(self):
+        self.laberinto = None
+        self.meta = None
+        self.inicio = None
+        self.ultimo_inicio = None
+        self.generacion = None
+        self.version = None     # Versión del laberinto hasta la que se leyeron sus cambios
+        self.km = 0             # Corrección acumulada de claves al moverse el agente
+        self.g = {}
+        self.rhs = {}
+        self.cola = []          # Heap de (clave, estado) con borrado perezoso
+        self.claves = {}        # Clave vigente de cada estado en la cola
+        # Contadores acumulados desde la creación; pico_cola es el de la última planificación
+        self.expansiones = 0
+        self.actualizaciones = 0
+        self.inserciones = 0
+        self.extracciones = 0
+        self.reaperturas = 0
+        self.pico_cola = 0
+
+    def _reiniciar(self, laberinto, meta):
+        """Descarta las tablas y empieza un árbol nuevo enraizado en la meta."""
+        self.laberinto = laberinto
+        self.meta = meta
+        self.generacion = laberinto.generacion
+        self.version = laberinto.version
+        laberinto.registrar_lector(self)
+        self.km = 0
+        self.g = {}
+        self.rhs = {meta: 0}
+        self.cola = []
+        self.claves = {}
+        self.ultimo_inicio = self.inicio
+        self._insertar(meta)
+
+    def _es_libre(self, estado):
+        # Como en las demás búsquedas, el agente puede salir de su celda aunque se vuelva pared
+        return estado == self.inicio or self.laberinto.es_libre(estado)
+
+    def _vecinos(self, estado):
+        fila, col = estado
+        for df, dc in MOVIMIENTOS:
+            nueva_fila, nueva_col = fila + df, col + dc
+            if 0 <= nueva_fila < self.laberinto.filas and 0 <= nueva_col < self.laberinto.columnas:
+                yield (nueva_fila, nueva_col)
+
+    def _calcular_clave(self, estado):
+        minimo = min(self.g.get(estado, INFINITO), self.rhs.get(estado, INFINITO))
+        return (minimo + distancia_manhattan(self.inicio, estado) + self.km, minimo)
+
+    def _insertar(self, estado):
+        clave = self._calcular_clave(estado)
+        self.claves[estado] = clave
+        heapq.heappush(self.cola, (clave, estado))
+        self.inserciones += 1
+        if len(self.cola) > self.pico_cola:
+            self.pico_cola = len(self.cola)
+
+    def _tope(self):
+        """Devuelve la menor entrada vigente de la cola, descartando las obsoletas."""
+        while self.cola:
+            clave, estado = self.cola[0]
+            if self.claves.get(estado) == clave:
+                return clave, estado
+            heapq.heappop(self.cola)
+            self.extracciones += 1
+        return (INFINITO, INFINITO), None
+
+    def _actualizar_vertice(self, estado):
+        self.actualizaciones += 1
+        if estado != self.meta:
+            if self._es_libre(estado):
+                self.rhs[estado] = min(
+                    (self.g.get(vecino, INFINITO) + 1
+                     for vecino in self._vecinos(estado) if self._es_libre(vecino)),
+                    default=INFINITO
+                )
+            else:
+                self.rhs[estado] = INFINITO
+        self.claves.pop(estado, None)
+        if self.g.get(estado, INFINITO) != self.rhs.get(estado, INFINITO):
+            self._insertar(estado)
+
+    def notificar_cambios(self, celdas):
+        """Repara las tablas para las celdas que cambiaron (pared <-> camino)."""
+        for celda in set(celdas):
+            self._actualizar_vertice(celda)
+            for vecino in self._vecinos(celda):
+                self._actualizar_vertice(vecino)
+
+    def _calcular_camino_mas_corto(self):
+        while True:
+            clave_tope, estado = self._tope()
+            if estado is None:
+                break
+            if (clave_tope >= self._calcular_clave(self.inicio) and
+                    self.rhs.get(self.inicio, INFINITO) == self.g.get(self.inicio, INFINITO)):
+                break
+            heapq.heappop(self.cola)
+            del self.claves[estado]
+            self.expansiones += 1
+            self.extracciones += 1
+
+            clave_nueva = self._calcular_clave(estado)
+            g_estado = self.g.get(estado, INFINITO)
+            rhs_estado = self.rhs.get(estado, INFINITO)
+            if clave_tope < clave_nueva:
+                self._insertar(estado)
+            elif g_estado > rhs_estado:
+                self.g[estado] = rhs_estado
+                for vecino in self._vecinos(estado):
+                    self._actualizar_vertice(vecino)
+            else:
+                # Subconsistente: el estado se reabre con g infinito
+                self.reaperturas += 1
+                self.g[estado] = INFINITO
+                self._actualizar_vertice(estado)
+                for vecino in self._vecinos(estado):
+                    self._actualizar_vertice(vecino)
+
+    def _extraer_camino(self):
+        if self.g.get(self.inicio, INFINITO) == INFINITO:
             return None
-        for accion, vecino in acciones_validas(nodo.estado, laberinto):
-            hijo = NodoIDS(vecino, nodo, accion, nodo.profundidad + 1)
-            nodos_generados.append(hijo)
-            resultado = dls(hijo, meta, limite - 1)
-            if resultado:
-                return resultado
+        camino = [self.inicio]
+        actual = self.inicio
+        while actual != self.meta:
+            # Siguiente paso: el vecino libre con menor g (descenso por el árbol)
+            actual = min(
+                (vecino for vecino in self._vecinos(actual) if self._es_libre(vecino)),
+                key=lambda vecino: self.g.get(vecino, INFINITO)
+            )
+            if self.g.get(actual, INFINITO) == INFINITO or len(camino) > len(self.g):
+                return None
+            camino.append(actual)
+        return camino
+
+    def planificar(self, laberinto, estado_inicial, meta):
+        """Devuelve el camino desde estado_inicial hasta meta reutilizando el trabajo previo."""
+        self.inicio = estado_inicial
+        self.pico_cola = len(self.cola)
+        cambios = None
+        if laberinto is self.laberinto and meta == self.meta and laberinto.generacion == self.generacion:
+            cambios = laberinto.cambios_desde(self.version)
+        if cambios is None:
+            self._reiniciar(laberinto, meta)
+        else:
+            # El agente se movió: se corrigen las claves en lugar de reordenar la cola
+            self.km += distancia_manhattan(self.ultimo_inicio, estado_inicial)
+            self.version = laberinto.version
+            laberinto.registrar_lector(self)
+            # Una celda de partida que es pared solo cuenta como libre mientras el agente esté en ella
+            cambios = list(cambios)
+            for celda in (self.ultimo_inicio, estado_inicial):
+                if not laberinto.es_libre(celda):
+                    cambios.append(celda)
+            self.notificar_cambios(cambios)
+        self.ultimo_inicio = estado_inicial
+
+        self._calcular_camino_mas_corto()
+        return self._extraer_camino()
+
+
+def d_estrella_lite(laberinto, estado_inicial, meta, planificador=None, estadisticas=None):
+    """Búsqueda incremental D* Lite. Reutiliza el planificador si se proporciona."""
+    reloj = time.perf_counter()
+    if planificador is None:
+        planificador = PlanificadorIncremental()
+    antes = (planificador.expansiones, planificador.actualizaciones, planificador.inserciones,
+             planificador.extracciones, planificador.reaperturas)
+    camino = planificador.planificar(laberinto, estado_inicial, meta)
+    if camino is None:
+        resultado = None, [Nodo(estado_inicial)], None
+    else:
+        # Se construyen nodos solo a lo largo del camino para la visualización
+        nodo = Nodo(camino[0])
+        nodos_generados = [nodo]
+        for estado in camino[1:]:
+            nodo = Nodo(estado, nodo, None, nodo.costo + 1)
+            nodos_generados.append(nodo)
+        resultado = camino, nodos_generados, nodo
+
+    if estadisticas is not None:
+        expansiones, actualizaciones, inserciones, extracciones, reaperturas = (
+            planificador.expansiones - antes[0], planificador.actualizaciones - antes[1],
+            planificador.inserciones - antes[2], planificador.extracciones - antes[3],
+            planificador.reaperturas - antes[4])
+        # g, rhs y claves persisten entre llamadas y cuentan en la memoria retenida
+        memoria = (BYTES_ENTRADA_DICCIONARIO * (len(planificador.g) + len(planificador.rhs) +
+                                                len(planificador.claves)) +
+                   BYTES_ENTRADA_MONTICULO * planificador.pico_cola +
+                   BYTES_NODO * len(resultado[1]))
+        completar_estadisticas(estadisticas, resultado, reloj, expansiones=expansiones,
+                               generaciones=actualizaciones, inserciones=inserciones,
+                               extracciones=extracciones, pico_frontera=planificador.pico_cola,
+                               memoria_pico=memoria, reaperturas=reaperturas)
+    return resultado
+
+
+class CampoDistancias:
+    """Distancia de cada celda a la meta (BFS inverso desde la meta) con reparación incremental.
+
+    Todos los agentes persiguen la misma meta, así que el siguiente paso óptimo
+    desde cualquier celda es un vecino con una unidad menos de distancia y se
+    responde en O(1). Cuando cambian paredes solo se recalcula la región cuyas
+    distancias dependían de ellas; el campo completo se rehace solo si cambia la
+    meta o se genera un laberinto nuevo.
+    """
+
+    INALCANZABLE = 2**31 - 1
+
+    def __init__(self):
+        self.laberinto = None
+        self.meta = None
+        self.generacion = None
+        self.version = None  # Versión del laberinto hasta la que se leyeron sus cambios
+        self.distancias = None  # array('i') indexado por id de celda
+        self.celdas_actualizadas = 0  # Celdas tocadas en la última sincronización
+        self.pico_frontera = 0        # Mayor frontera de la última sincronización
+
+    def sincronizar(self, laberinto, meta=None):
+        """Pone el campo al día con el laberinto. Devuelve True si alguna distancia pudo cambiar."""
+        meta = laberinto.meta if meta is None else meta
+        cambios = None
+        if laberinto is self.laberinto and meta == self.meta and laberinto.generacion == self.generacion:
+            cambios = laberinto.cambios_desde(self.version)
+        if cambios is None:
+            self._construir(laberinto, meta)
+            return True
+        self.version = laberinto.version
+        laberinto.registrar_lector(self)
+        self.celdas_actualizadas = 0
+        self.pico_frontera = 0
+        if not cambios:
+            return False
+        id_meta = laberinto.id_celda(meta)
+        # Cada celda se procesa una vez, según su estado final
+        for posicion in dict.fromkeys(cambios):
+            id_celda = laberinto.id_celda(posicion)
+            if id_celda == id_meta:
+                self._construir(laberinto, meta)
+                return True
+            if laberinto.celdas[id_celda]:
+                self._cerrar(id_celda)
+            else:
+                self._abrir(id_celda)
+        return True
+
+    def al_dia(self, laberinto, meta=None):
+        """Indica si el campo ya refleja el laberinto y la meta (sincronizar no haría nada)."""
+        meta = laberinto.meta if meta is None else meta
+        return (laberinto is self.laberinto and meta == self.meta and
+                laberinto.generacion == self.generacion and laberinto.version == self.version)
+
+    def _construir(self, laberinto, meta):
+        self.laberinto = laberinto
+        self.meta = meta
+        self.generacion = laberinto.generacion
+        self.version = laberinto.version
+        laberinto.registrar_lector(self)
+        self.celdas_actualizadas = 0
+        self.pico_frontera = 0
+        distancias = np.full(len(laberinto.celdas), self.INALCANZABLE, dtype=np.int32)
+        if laberinto.es_libre(meta):
+            # BFS por niveles desde la meta, vectorizado: cada nivel es un arreglo de ids
+            pendientes = laberinto.matriz.ravel() == 0
+            desplazamientos = np.array(laberinto.desplazamientos)
+            frontera = np.array([laberinto.id_celda(meta)])
+            pendientes[frontera] = False
+            distancias[frontera] = 0
+            distancia = 0
+            while frontera.size:
+                self.celdas_actualizadas += frontera.size
+                self.pico_frontera = max(self.pico_frontera, int(frontera.size))
+                distancia += 1
+                vecinos = (frontera[:, None] + desplazamientos).ravel()
+                frontera = np.unique(vecinos[pendientes[vecinos]])
+                pendientes[frontera] = False
+                distancias[frontera] = distancia
+        self.distancias = array('i', distancias.tobytes())
+
+    def _abrir(self, id_celda):
+        """Una pared pasó a ser camino: las distancias solo pueden bajar desde ella."""
+        celdas = self.laberinto.celdas
+        distancias = self.distancias
+        desplazamientos = self.laberinto.desplazamientos
+        mejor = min(distancias[id_celda + desplazamiento] for desplazamiento in desplazamientos)
+        if mejor == self.INALCANZABLE:
+            return
+        distancias[id_celda] = mejor + 1
+        cola = deque([id_celda])
+        while cola:
+            if len(cola) > self.pico_frontera:
+                self.pico_frontera = len(cola)
+            actual = cola.popleft()
+            self.celdas_actualizadas += 1
+            distancia = distancias[actual] + 1
+            for desplazamiento in desplazamientos:
+                vecino = actual + desplazamiento
+                if not celdas[vecino] and distancias[vecino] > distancia:
+                    distancias[vecino] = distancia
+                    cola.append(vecino)
+
+    def _cerrar(self, id_celda):
+        """Un camino pasó a ser pared: se recalculan solo las celdas que dependían de él."""
+        celdas = self.laberinto.celdas
+        distancias = self.distancias
+        desplazamientos = self.laberinto.desplazamientos
+        distancia_cerrada = distancias[id_celda]
+        distancias[id_celda] = self.INALCANZABLE
+        if distancia_cerrada == self.INALCANZABLE:
+            return
+
+        # Celdas afectadas: las que ya no tienen un vecino no afectado a una unidad menos.
+        # Se recorren por niveles crecientes, así cada nivel se decide antes que el siguiente.
+        cola = deque(id_celda + desplazamiento for desplazamiento in desplazamientos
+                     if distancias[id_celda + desplazamiento] == distancia_cerrada + 1)
+        afectadas = {}
+        while cola:
+            actual = cola.popleft()
+            if actual in afectadas:
+                continue
+            distancia = distancias[actual]
+            if any(distancias[actual + desplazamiento] == distancia - 1 and
+                   actual + desplazamiento not in afectadas for desplazamiento in desplazamientos):
+                continue
+            afectadas[actual] = True
+            for desplazamiento in desplazamientos:
+                vecino = actual + desplazamiento
+                if distancias[vecino] == distancia + 1:
+                    cola.append(vecino)
+
+        # Se vuelven a calcular desde el borde de la región afectada (Dijkstra local)
+        for actual in afectadas:
+            distancias[actual] = self.INALCANZABLE
+        cola = []
+        for actual in afectadas:
+            mejor = min(distancias[actual + desplazamiento] for desplazamiento in desplazamientos)
+            if mejor != self.INALCANZABLE:
+                distancias[actual] = mejor + 1
+                heapq.heappush(cola, (mejor + 1, actual))
+        self.celdas_actualizadas += len(afectadas)
+        while cola:
+            if len(cola) > self.pico_frontera:
+                self.pico_frontera = len(cola)
+            distancia, actual = heapq.heappop(cola)
+            if distancia != distancias[actual]:
+                continue
+            for desplazamiento in desplazamientos:
+                vecino = actual + desplazamiento
+                if not celdas[vecino] and distancias[vecino] > distancia + 1:
+                    distancias[vecino] = distancia + 1
+                    heapq.heappush(cola, (distancia + 1, vecino))
+
+    def distancia(self, posicion):
+        """Pasos hasta la meta, o None si no se puede llegar."""
+        distancia = self.distancias[self.laberinto.id_celda(posicion)]
+        return None if distancia == self.INALCANZABLE else distancia
+
+    def siguiente(self, posicion):
+        """Siguiente celda de un camino más corto hacia la meta (None en la meta o sin camino).
+
+        Desde una celda que se volvió pared (p. ej. bajo el agente) se sale por el
+        vecino más cercano a la meta.
+        """
+        distancias = self.distancias
+        id_celda = self.laberinto.id_celda(posicion)
+        distancia = distancias[id_celda]
+        if distancia == 0:
+            return None
+        if distancia == self.INALCANZABLE:
+            distancia = min(distancias[id_celda + desplazamiento]
+                            for desplazamiento in self.laberinto.desplazamientos) + 1
+            if distancia > self.INALCANZABLE:
+                return None
+        for desplazamiento in self.laberinto.desplazamientos:
+            if distancias[id_celda + desplazamiento] == distancia - 1:
+                return self.laberinto.posicion_celda(id_celda + desplazamiento)
         return None
 
-    for limite in range(1, limite_max + 1):
-        raiz = NodoIDS(estado_inicial)
-        nodos_generados = [raiz]
-        resultado = dls(raiz, meta, limite)
-        if resultado:
-            camino = reconstruir_camino_desde_nodo(resultado)
-            return camino, nodos_generados, resultado
+    def camino(self, posicion):
+        """Camino completo desde posicion hasta la meta descendiendo por el campo."""
+        camino = [posicion]
+        while camino[-1] != self.meta:
+            siguiente = self.siguiente(camino[-1])
+            if siguiente is None:
+                return None
+            camino.append(siguiente)
+        return camino
+
+
+def campo_distancias(laberinto, estado_inicial, meta, campo=None, estadisticas=None):
+    """Camino más corto leído del campo de distancias a la meta. Reutiliza el campo si se proporciona.
+
+    En las estadísticas cada celda cuya distancia se recalculó cuenta como una
+    expansión; una consulta sobre un campo al día no expande nada.
+    """
+    reloj = time.perf_counter()
+    if campo is None:
+        campo = CampoDistancias()
+    if campo.sincronizar(laberinto, meta):
+        actualizadas, pico = campo.celdas_actualizadas, campo.pico_frontera
+    else:
+        actualizadas = pico = 0
+    camino = campo.camino(estado_inicial)
+    if camino is None:
+        resultado = None, [Nodo(estado_inicial)], None
+    else:
+        # Se construyen nodos solo a lo largo del camino para la visualización
+        nodo = Nodo(camino[0])
+        nodos_generados = [nodo]
+        for estado in camino[1:]:
+            nodo = Nodo(estado, nodo, None, nodo.costo + 1)
+            nodos_generados.append(nodo)
+        resultado = camino, nodos_generados, nodo
+
+    # El campo guarda un entero de 4 bytes por celda
+    memoria = (4 * len(campo.distancias) + BYTES_ENTRADA_MONTICULO * pico +
+               BYTES_NODO * len(resultado[1]))
+    return completar_estadisticas(estadisticas, resultado, reloj, expansiones=actualizadas,
+                                  generaciones=actualizadas, inserciones=actualizadas,
+                                  extracciones=actualizadas, pico_frontera=pico, memoria_pico=memoria)
+
+
+class TablasSalto:
+    """Distancias de salto precalculadas (JPS+) para la rejilla 4-conexa.
+
+    Para cada celda y dirección (en el orden de Laberinto.desplazamientos)
+    guarda d > 0 si a d pasos hay un punto de salto, o -k si solo hay k celdas
+    libres antes de una pared. Se mantienen al día con Laberinto.cambios: solo
+    se recalculan las filas vecinas a cada celda modificada y las columnas cuyos
+    puntos de giro cambiaron.
+    """
+
+    def __init__(self):
+        self.laberinto = None
+        self.generacion = None
+        self.version = None  # Versión del laberinto hasta la que se leyeron sus cambios
+        self.saltos = None  # [izquierda, abajo, derecha, arriba]
+
+    def sincronizar(self, laberinto):
+        """Construye las tablas o aplica los cambios pendientes del laberinto."""
+        nuevos = None
+        if laberinto is self.laberinto and laberinto.generacion == self.generacion:
+            nuevos = laberinto.cambios_desde(self.version)
+        if nuevos is None or len(self.saltos[0]) != len(laberinto.celdas):
+            self.laberinto = laberinto
+            self.generacion = laberinto.generacion
+            self.version = laberinto.version
+            laberinto.registrar_lector(self)
+            self.saltos = [array('i', [0]) * len(laberinto.celdas) for _ in range(4)]
+            self._calcular_filas(range(laberinto.filas))
+            self._calcular_columnas(range(laberinto.columnas))
+            return
+
+        if not nuevos:
+            return
+        self.version = laberinto.version
+        laberinto.registrar_lector(self)
+        # Un punto de salto horizontal depende de la fila y de sus dos vecinas
+        filas = {fila + d for fila, _ in nuevos for d in (-1, 0, 1) if 0 <= fila + d < laberinto.filas}
+        columnas = {col for _, col in nuevos}
+        giros_antes = {fila: self._giros_fila(fila) for fila in filas}
+        self._calcular_filas(filas)
+        for fila in filas:
+            for col, (antes, ahora) in enumerate(zip(giros_antes[fila], self._giros_fila(fila))):
+                if antes != ahora:
+                    columnas.add(col)
+        self._calcular_columnas(columnas)
+
+    def es_giro(self, id_celda):
+        """Una celda es punto de giro si desde ella un salto horizontal encuentra un punto de salto."""
+        return self.saltos[0][id_celda] > 0 or self.saltos[2][id_celda] > 0
+
+    def _giros_fila(self, fila):
+        inicio = self.laberinto.id_celda((fila, 0))
+        return [self.es_giro(id_celda) for id_celda in range(inicio, inicio + self.laberinto.columnas)]
+
+    def _calcular_filas(self, filas):
+        celdas = self.laberinto.celdas
+        ancho = self.laberinto.ancho
+        columnas = self.laberinto.columnas
+        for indice, delta in ((0, -1), (2, 1)):
+            tabla = self.saltos[indice]
+            for fila in filas:
+                inicio = self.laberinto.id_celda((fila, 0))
+                ids_fila = range(inicio, inicio + columnas)
+                # Se recorre desde el extremo hacia el que se salta
+                for id_celda in (reversed(ids_fila) if delta == 1 else ids_fila):
+                    siguiente = id_celda + delta
+                    if celdas[id_celda] or celdas[siguiente]:
+                        tabla[id_celda] = 0
+                    elif ((celdas[siguiente - ancho - delta] and not celdas[siguiente - ancho])
+                          or (celdas[siguiente + ancho - delta] and not celdas[siguiente + ancho])):
+                        tabla[id_celda] = 1  # La siguiente celda tiene un vecino forzado
+                    else:
+                        distancia = tabla[siguiente]
+                        tabla[id_celda] = distancia + 1 if distancia > 0 else distancia - 1
+
+    def _calcular_columnas(self, columnas):
+        celdas = self.laberinto.celdas
+        ancho = self.laberinto.ancho
+        filas = self.laberinto.filas
+        es_giro = self.es_giro
+        for indice, delta in ((1, ancho), (3, -ancho)):
+            tabla = self.saltos[indice]
+            for col in columnas:
+                inicio = self.laberinto.id_celda((0, col))
+                ids_columna = range(inicio, inicio + filas * ancho, ancho)
+                for id_celda in (reversed(ids_columna) if delta > 0 else ids_columna):
+                    siguiente = id_celda + delta
+                    if celdas[id_celda] or celdas[siguiente]:
+                        tabla[id_celda] = 0
+                    elif es_giro(siguiente):
+                        tabla[id_celda] = 1
+                    else:
+                        distancia = tabla[siguiente]
+                        tabla[id_celda] = distancia + 1 if distancia > 0 else distancia - 1
+
+def jps(laberinto, estado_inicial, meta, tablas=None, estadisticas=None):
+    """Jump Point Search (JPS+) para la rejilla 4-conexa de costo uniforme.
+
+    Orden canónico: los movimientos verticales pueden girar a horizontal en
+    cualquier celda y los horizontales solo giran en vecinos forzados. A* solo
+    encola puntos de salto, que se obtienen de las tablas precalculadas.
+    Reutiliza las tablas si se proporcionan.
+    """
+    reloj = time.perf_counter()
+    if tablas is None:
+        tablas = TablasSalto()
+    tablas.sincronizar(laberinto)
+    saltos = tablas.saltos
+    celdas = laberinto.celdas
+    desplazamientos = laberinto.desplazamientos
+    ancho = laberinto.ancho
+
+    inicio = laberinto.id_celda(estado_inicial)
+    id_meta = laberinto.id_celda(meta)
+    fila_meta, col_meta = meta
+
+    raiz = Nodo(estado_inicial)
+    nodos_generados = [raiz]
+    if inicio == id_meta:
+        return completar_estadisticas(estadisticas, ([estado_inicial], nodos_generados, raiz), reloj,
+                                      expansiones=0, generaciones=1, inserciones=0, extracciones=0,
+                                      pico_frontera=0, memoria_pico=BYTES_NODO)
+
+    def saltar(actual, direccion):
+        """Siguiente punto de salto desde actual en la dirección dada: (id, distancia) o None."""
+        tabla = saltos[direccion]
+        distancia = tabla[actual]
+        alcance = distancia if distancia > 0 else -distancia
+        fila, col = divmod(actual, ancho)
+        fila, col = fila - 1, col - 1
+        signo = 1 if direccion in (1, 2) else -1
+        if direccion in (0, 2):
+            if fila == fila_meta:
+                pasos = (col_meta - col) * signo
+                if 0 < pasos <= alcance:
+                    return id_meta, pasos
+        else:
+            pasos = (fila_meta - fila) * signo
+            if 0 < pasos <= alcance:
+                if col == col_meta:
+                    return id_meta, pasos
+                # En la fila de la meta se comprueba si un salto horizontal la alcanza
+                celda_fila_meta = actual + pasos * desplazamientos[direccion]
+                horizontal = saltos[2][celda_fila_meta] if col_meta > col else saltos[0][celda_fila_meta]
+                if abs(col_meta - col) <= abs(horizontal):
+                    return celda_fila_meta, pasos
+        if distancia > 0:
+            return actual + distancia * desplazamientos[direccion], distancia
+        return None
+
+    g_costo = {inicio: 0}
+    padres = {inicio: None}  # Punto de salto anterior y dirección de llegada
+    nodos = {inicio: raiz}
+    contador = 0
+    frontera = [(distancia_manhattan(estado_inicial, meta), contador, inicio)]
+    cerrados = set()
+    salidas = set()  # Vecinos de un inicio que es pared; desde ellos se salta en las cuatro direcciones
+    if celdas[inicio]:
+        # Las tablas solo cubren celdas libres: como en las demás búsquedas, el agente
+        # sale de su celda convertida en pared por los vecinos libres
+        frontera = []
+        cerrados.add(inicio)
+        for direccion, delta in enumerate(desplazamientos):
+            vecino = inicio + delta
+            if celdas[vecino]:
+                continue
+            g_costo[vecino] = 1
+            padres[vecino] = (inicio, direccion)
+            nodo = Nodo(laberinto.posicion_celda(vecino), raiz, NOMBRES_MOVIMIENTOS[direccion], 1)
+            nodos[vecino] = nodo
+            nodos_generados.append(nodo)
+            salidas.add(vecino)
+            fila, col = laberinto.posicion_celda(vecino)
+            contador += 1
+            heapq.heappush(frontera, (1 + abs(fila - fila_meta) + abs(col - col_meta), contador, vecino))
+    extracciones = pico_frontera = 0
+    while frontera:
+        if len(frontera) > pico_frontera:
+            pico_frontera = len(frontera)
+        _, _, actual = heapq.heappop(frontera)
+        extracciones += 1
+        if actual == id_meta:
+            break
+        if actual in cerrados:
+            continue
+        cerrados.add(actual)
+
+        llegada = padres[actual][1] if padres[actual] else None
+        if llegada is None or actual in salidas:
+            direcciones = (0, 1, 2, 3)
+        elif llegada in (1, 3):
+            direcciones = (llegada, 0, 2)
+        else:
+            # Horizontal: sigue recto y solo gira hacia los vecinos forzados
+            delta = desplazamientos[llegada]
+            direcciones = [llegada]
+            if celdas[actual - ancho - delta] and not celdas[actual - ancho]:
+                direcciones.append(3)
+            if celdas[actual + ancho - delta] and not celdas[actual + ancho]:
+                direcciones.append(1)
+
+        for direccion in direcciones:
+            salto = saltar(actual, direccion)
+            if salto is None:
+                continue
+            vecino, distancia = salto
+            nuevo_costo = g_costo[actual] + distancia
+            if vecino in cerrados or nuevo_costo >= g_costo.get(vecino, INFINITO):
+                continue
+            g_costo[vecino] = nuevo_costo
+            padres[vecino] = (actual, direccion)
+            nodo = Nodo(laberinto.posicion_celda(vecino), nodos[actual], NOMBRES_MOVIMIENTOS[direccion], nuevo_costo)
+            nodos[vecino] = nodo
+            nodos_generados.append(nodo)
+            fila, col = laberinto.posicion_celda(vecino)
+            contador += 1
+            heapq.heappush(frontera, (nuevo_costo + abs(fila - fila_meta) + abs(col - col_meta), contador, vecino))
+
+    # Solo se cuentan los puntos de salto: las celdas de los tramos no se generan.
+    # Las tablas de salto (cuatro enteros por celda) persisten entre búsquedas.
+    generaciones = len(nodos_generados)
+    memoria = (16 * len(celdas) + 3 * BYTES_ENTRADA_DICCIONARIO * len(g_costo) +
+               BYTES_NODO * generaciones + BYTES_ENTRADA_MONTICULO * pico_frontera)
+    if id_meta not in padres:
+        return completar_estadisticas(  # No se encontró camino
+            estadisticas, (None, nodos_generados, None), reloj, expansiones=len(cerrados),
+            generaciones=generaciones, inserciones=contador + 1, extracciones=extracciones,
+            pico_frontera=pico_frontera, memoria_pico=memoria, reaperturas=generaciones - len(g_costo))
+
+    # Se expanden los tramos rectos entre puntos de salto
+    tramos = []
+    actual = id_meta
+    while padres[actual] is not None:
+        anterior, direccion = padres[actual]
+        tramos.append((anterior, direccion, (actual - anterior) // desplazamientos[direccion]))
+        actual = anterior
+    nodo_final = raiz
+    for anterior, direccion, pasos in reversed(tramos):
+        for paso in range(1, pasos + 1):
+            nodo_final = Nodo(laberinto.posicion_celda(anterior + paso * desplazamientos[direccion]),
+                              nodo_final, NOMBRES_MOVIMIENTOS[direccion], nodo_final.costo + 1)
+    return completar_estadisticas(
+        estadisticas, (reconstruir_camino(nodo_final), nodos_generados, nodo_final), reloj,
+        expansiones=len(cerrados), generaciones=generaciones, inserciones=contador + 1,
+        extracciones=extracciones, pico_frontera=pico_frontera, memoria_pico=memoria,
+        reaperturas=generaciones - len(g_costo))
+
+
+class PlanificadorJerarquico:
+    """Planificador jerárquico HPA* sobre bloques cuadrados del laberinto.
+
+    En cada borde entre bloques vecinos se eligen entradas (el centro de cada
+    tramo libre, o sus dos extremos si es largo) y dentro de cada bloque se
+    calculan las distancias entre sus entradas. La búsqueda se hace primero en
+    ese grafo abstracto y solo se refina a celdas el tramo hasta salir del bloque
+    del agente; el resto de la ruta abstracta se reutiliza en la siguiente
+    llamada. Los bloques se calculan cuando la búsqueda los necesita y se
+    invalidan solo los afectados por Laberinto.cambios.
+    """
+
+    LARGO_TRAMO = 6  # Tramos libres de este largo o más tienen dos entradas
+
+    def __init__(self, tamano_bloque=16):
+        self.tamano_bloque = tamano_bloque
+        self.laberinto = None
+        self.generacion = None
+        self.version = None  # Versión del laberinto hasta la que se leyeron sus cambios
+        self.bordes = {}   # (bloque, bloque vecino) -> [(id en bloque, id en vecino), ...]
+        self.bloques = {}  # bloque -> (distancias entre entradas, enlaces con otros bloques)
+        self.ruta = None   # Puntos de la ruta abstracta aún no refinados
+        self.meta = None
+        self.nodos_abstractos = []
+        # Trabajo acumulado de la búsqueda abstracta y de los BFS dentro de bloques;
+        # los picos corresponden a la última planificación
+        self.expansiones = 0
+        self.generaciones = 0
+        self.inserciones = 0
+        self.extracciones = 0
+        self.reaperturas = 0
+        self.pico_frontera = 0
+        self.memoria_pico = 0
+
+    def _sincronizar(self, laberinto):
+        """Descarta lo que dependa de celdas modificadas desde la última llamada."""
+        nuevos = None
+        if laberinto is self.laberinto and laberinto.generacion == self.generacion:
+            nuevos = laberinto.cambios_desde(self.version)
+        self.version = laberinto.version
+        laberinto.registrar_lector(self)
+        if nuevos is None:
+            self.laberinto = laberinto
+            self.generacion = laberinto.generacion
+            self.bordes = {}
+            self.bloques = {}
+            self.ruta = None
+            return
+        tamano = self.tamano_bloque
+        for fila, col in nuevos:
+            bloque = (fila // tamano, col // tamano)
+            self.bloques.pop(bloque, None)
+            # Una celda en el límite de un bloque también cambia las entradas del borde
+            vecinos = []
+            if col % tamano == tamano - 1:
+                vecinos.append((bloque, (bloque[0], bloque[1] + 1)))
+            if col % tamano == 0 and col > 0:
+                vecinos.append(((bloque[0], bloque[1] - 1), bloque))
+            if fila % tamano == tamano - 1:
+                vecinos.append((bloque, (bloque[0] + 1, bloque[1])))
+            if fila % tamano == 0 and fila > 0:
+                vecinos.append(((bloque[0] - 1, bloque[1]), bloque))
+            for borde in vecinos:
+                self.bordes.pop(borde, None)
+                self.bloques.pop(borde[0], None)
+                self.bloques.pop(borde[1], None)
+        if nuevos:
+            self.ruta = None
+
+    def bloque_de(self, id_celda):
+        fila, col = self.laberinto.posicion_celda(id_celda)
+        return (fila // self.tamano_bloque, col // self.tamano_bloque)
+
+    def _limites(self, bloque):
+        tamano = self.tamano_bloque
+        return (bloque[0] * tamano, min((bloque[0] + 1) * tamano, self.laberinto.filas),
+                bloque[1] * tamano, min((bloque[1] + 1) * tamano, self.laberinto.columnas))
+
+    def _existe(self, bloque):
+        return (0 <= bloque[0] * self.tamano_bloque < self.laberinto.filas
+                and 0 <= bloque[1] * self.tamano_bloque < self.laberinto.columnas)
+
+    def _entradas(self, bloque, vecino):
+        """Pares de celdas que conectan bloque con su vecino de la derecha o de abajo."""
+        clave = (bloque, vecino)
+        if clave in self.bordes:
+            return self.bordes[clave]
+        laberinto = self.laberinto
+        celdas = laberinto.celdas
+        fila_0, fila_1, col_0, col_1 = self._limites(bloque)
+        if vecino[1] == bloque[1] + 1:
+            pares = [(laberinto.id_celda((fila, col_1 - 1)), laberinto.id_celda((fila, col_1)))
+                     for fila in range(fila_0, fila_1)]
+        else:
+            pares = [(laberinto.id_celda((fila_1 - 1, col)), laberinto.id_celda((fila_1, col)))
+                     for col in range(col_0, col_1)]
+        entradas = []
+        tramo = []
+        for par in pares + [None]:
+            if par is not None and not celdas[par[0]] and not celdas[par[1]]:
+                tramo.append(par)
+                continue
+            if tramo:
+                if len(tramo) < self.LARGO_TRAMO:
+                    entradas.append(tramo[len(tramo) // 2])
+                else:
+                    entradas.extend((tramo[0], tramo[-1]))
+                tramo = []
+        self.bordes[clave] = entradas
+        return entradas
+
+    def _bloque(self, bloque):
+        """Devuelve (distancias entre entradas, enlaces) del bloque, calculándolos si hace falta."""
+        if bloque in self.bloques:
+            return self.bloques[bloque]
+        fila, col = bloque
+        enlaces = {}
+        for vecino, propio_primero in (((fila, col + 1), True), ((fila + 1, col), True),
+                                       ((fila, col - 1), False), ((fila - 1, col), False)):
+            if not self._existe(vecino):
+                continue
+            entradas = self._entradas(bloque, vecino) if propio_primero else self._entradas(vecino, bloque)
+            for primera, segunda in entradas:
+                propia, ajena = (primera, segunda) if propio_primero else (segunda, primera)
+                enlaces.setdefault(propia, []).append(ajena)
+        distancias = {entrada: self._distancias_en_bloque(entrada, bloque, enlaces) for entrada in enlaces}
+        self.bloques[bloque] = (distancias, enlaces)
+        return self.bloques[bloque]
+
+    def _bfs_en_bloque(self, origen, bloque, destino=None):
+        """BFS sin salir del bloque, sobre una copia local del bloque rodeada de paredes.
+
+        Devuelve (distancias, padres, a_local, a_global): listas indexadas por id
+        local y las funciones que convierten ids del laberinto a locales y al revés.
+        """
+        laberinto = self.laberinto
+        fila_0, fila_1, col_0, col_1 = self._limites(bloque)
+        ancho_local = col_1 - col_0 + 2
+        celdas = bytearray(b"\x01" * ancho_local)
+        for fila in range(fila_0, fila_1):
+            inicio = laberinto.id_celda((fila, col_0))
+            celdas += b"\x01" + laberinto.celdas[inicio:inicio + col_1 - col_0] + b"\x01"
+        celdas += b"\x01" * ancho_local
+        ancho = laberinto.ancho
+
+        def a_local(id_celda):
+            fila, col = divmod(id_celda, ancho)
+            return (fila - 1 - fila_0 + 1) * ancho_local + col - 1 - col_0 + 1
+
+        def a_global(id_local):
+            fila, col = divmod(id_local, ancho_local)
+            return (fila + fila_0) * ancho + col + col_0
+
+        desplazamientos = (-1, ancho_local, 1, -ancho_local)
+        distancias = [-1] * len(celdas)
+        padres = [-1] * len(celdas)
+        origen_local = a_local(origen)
+        destino_local = a_local(destino) if destino is not None else -1
+        distancias[origen_local] = 0
+        frontera = deque([origen_local])
+        expansiones = generaciones = pico_frontera = 0
+        while frontera:
+            if len(frontera) > pico_frontera:
+                pico_frontera = len(frontera)
+            actual = frontera.popleft()
+            if actual == destino_local:
+                break
+            expansiones += 1
+            distancia = distancias[actual] + 1
+            for desplazamiento in desplazamientos:
+                vecino = actual + desplazamiento
+                if not celdas[vecino] and distancias[vecino] == -1:
+                    distancias[vecino] = distancia
+                    padres[vecino] = actual
+                    frontera.append(vecino)
+                    generaciones += 1
+        self.expansiones += expansiones
+        self.generaciones += generaciones + 1
+        self.inserciones += generaciones + 1
+        self.extracciones += expansiones + (actual == destino_local)
+        self.pico_frontera = max(self.pico_frontera, pico_frontera)
+        # Copia del bloque más las dos listas locales
+        self.memoria_pico = max(self.memoria_pico, (1 + 2 * BYTES_ENTRADA) * len(celdas) +
+                                BYTES_ENTRADA * pico_frontera)
+        return distancias, padres, a_local, a_global
+
+    def _distancias_en_bloque(self, origen, bloque, objetivos):
+        distancias, _, a_local, _ = self._bfs_en_bloque(origen, bloque)
+        resultado = {}
+        for objetivo in objetivos:
+            distancia = distancias[a_local(objetivo)]
+            if distancia > 0:
+                resultado[objetivo] = distancia
+        return resultado
+
+    def _refinar(self, origen, destino):
+        """Celdas entre dos puntos consecutivos de la ruta abstracta."""
+        if destino - origen in self.laberinto.desplazamientos:
+            return [origen, destino]
+        _, padres, a_local, a_global = self._bfs_en_bloque(origen, self.bloque_de(origen), destino)
+        camino = []
+        actual = a_local(destino)
+        while actual != -1:
+            camino.append(a_global(actual))
+            actual = padres[actual]
+        return list(reversed(camino))
+
+    def precalcular(self, laberinto):
+        """Calcula todas las entradas y distancias de una vez (por ejemplo, antes de empezar)."""
+        self._sincronizar(laberinto)
+        tamano = self.tamano_bloque
+        for fila in range(0, laberinto.filas, tamano):
+            for col in range(0, laberinto.columnas, tamano):
+                self._bloque((fila // tamano, col // tamano))
+
+    def _buscar_abstracto(self, inicio, meta):
+        """A* sobre el grafo de entradas, con el inicio y la meta insertados temporalmente."""
+        laberinto = self.laberinto
+        bloque_inicio = self.bloque_de(inicio)
+        bloque_meta = self.bloque_de(meta)
+        objetivos_inicio = set(self._bloque(bloque_inicio)[1])
+        if bloque_inicio == bloque_meta:
+            objetivos_inicio.add(meta)
+        desde_inicio = self._distancias_en_bloque(inicio, bloque_inicio, objetivos_inicio)
+        hacia_meta = self._distancias_en_bloque(meta, bloque_meta, self._bloque(bloque_meta)[1])
+        fila_meta, col_meta = laberinto.posicion_celda(meta)
+
+        raiz = Nodo(laberinto.posicion_celda(inicio))
+        self.nodos_abstractos = [raiz]
+        nodos = {inicio: raiz}
+        g_costo = {inicio: 0}
+        padres = {inicio: None}
+        cerrados = set()
+        contador = 0
+        frontera = [(0, contador, inicio)]
+        pico_frontera = 0
+        ruta = None
+        while frontera:
+            if len(frontera) > pico_frontera:
+                pico_frontera = len(frontera)
+            _, _, actual = heapq.heappop(frontera)
+            self.extracciones += 1
+            if actual == meta:
+                ruta = []
+                while actual is not None:
+                    ruta.append(actual)
+                    actual = padres[actual]
+                ruta.reverse()
+                break
+            if actual in cerrados:
+                continue
+            cerrados.add(actual)
+            self.expansiones += 1
+
+            sucesores = []
+            if actual == inicio:
+                sucesores.extend(desde_inicio.items())
+            distancias, enlaces = self._bloque(self.bloque_de(actual))
+            sucesores.extend(distancias.get(actual, {}).items())
+            sucesores.extend((vecino, 1) for vecino in enlaces.get(actual, ()))
+            if actual in hacia_meta:
+                sucesores.append((meta, hacia_meta[actual]))
+
+            for vecino, costo in sucesores:
+                nuevo_costo = g_costo[actual] + costo
+                if vecino in cerrados or nuevo_costo >= g_costo.get(vecino, INFINITO):
+                    continue
+                if vecino in g_costo:
+                    self.reaperturas += 1
+                g_costo[vecino] = nuevo_costo
+                padres[vecino] = actual
+                fila, col = laberinto.posicion_celda(vecino)
+                nodo = Nodo((fila, col), nodos[actual], None, nuevo_costo)
+                nodos[vecino] = nodo
+                self.nodos_abstractos.append(nodo)
+                contador += 1
+                heapq.heappush(frontera, (nuevo_costo + abs(fila - fila_meta) + abs(col - col_meta),
+                                          contador, vecino))
+
+        self.generaciones += len(self.nodos_abstractos)
+        self.inserciones += contador + 1
+        self.pico_frontera = max(self.pico_frontera, pico_frontera)
+        self.memoria_pico = max(self.memoria_pico,
+                                3 * BYTES_ENTRADA_DICCIONARIO * len(g_costo) +
+                                BYTES_NODO * len(self.nodos_abstractos) +
+                                BYTES_ENTRADA_MONTICULO * pico_frontera)
+        return ruta
+
+    def planificar(self, laberinto, inicio, meta):
+        """Devuelve las celdas hasta salir del bloque del inicio (o hasta la meta), o None."""
+        self.pico_frontera = self.memoria_pico = 0
+        self._sincronizar(laberinto)
+        id_inicio = laberinto.id_celda(inicio)
+        id_meta = laberinto.id_celda(meta)
+        if id_inicio == id_meta:
+            self.ruta = None
+            return [inicio]
+        # Se reutiliza la ruta abstracta si el agente está donde terminó el último tramo
+        if not (self.ruta and self.meta == meta and self.ruta[0] == id_inicio):
+            self.meta = meta
+            self.ruta = self._buscar_abstracto(id_inicio, id_meta)
+            if self.ruta is None:
+                return None
+        else:
+            self.nodos_abstractos = []
+
+        ruta = self.ruta
+        bloque_inicio = self.bloque_de(id_inicio)
+        tramo = [id_inicio]
+        indice = 0
+        while indice + 1 < len(ruta):
+            tramo.extend(self._refinar(ruta[indice], ruta[indice + 1])[1:])
+            indice += 1
+            if self.bloque_de(ruta[indice]) != bloque_inicio:
+                break
+        self.ruta = ruta[indice:]
+        return [laberinto.posicion_celda(id_celda) for id_celda in tramo]
+
+def hpa_estrella(laberinto, estado_inicial, meta, planificador=None, estadisticas=None):
+    """Búsqueda jerárquica HPA*. Devuelve solo el primer tramo refinado del camino.
+
+    Las estadísticas suman la búsqueda abstracta y los BFS dentro de bloques
+    (cálculo de entradas y refinado) de esta llamada.
+    """
+    reloj = time.perf_counter()
+    if planificador is None:
+        planificador = PlanificadorJerarquico()
+    antes = (planificador.expansiones, planificador.generaciones, planificador.inserciones,
+             planificador.extracciones, planificador.reaperturas)
+    camino = planificador.planificar(laberinto, estado_inicial, meta)
+    if camino is None:
+        resultado = None, planificador.nodos_abstractos or [Nodo(estado_inicial)], None
+    else:
+        # Nodos del tramo refinado más los de la búsqueda abstracta para la visualización
+        nodo = Nodo(camino[0])
+        nodos_generados = [nodo]
+        for estado in camino[1:]:
+            nodo = Nodo(estado, nodo, None, nodo.costo + 1)
+            nodos_generados.append(nodo)
+        resultado = camino, nodos_generados + planificador.nodos_abstractos[1:], nodo
+
+    if estadisticas is not None:
+        # Las distancias entre entradas de los bloques calculados persisten entre llamadas
+        retenida = BYTES_ENTRADA_DICCIONARIO * sum(
+            len(destinos) for distancias, _ in planificador.bloques.values()
+            for destinos in distancias.values())
+        completar_estadisticas(
+            estadisticas, resultado, reloj, expansiones=planificador.expansiones - antes[0],
+            generaciones=planificador.generaciones - antes[1],
+            inserciones=planificador.inserciones - antes[2],
+            extracciones=planificador.extracciones - antes[3], pico_frontera=planificador.pico_frontera,
+            memoria_pico=retenida + planificador.memoria_pico + BYTES_NODO * len(resultado[1]),
+            reaperturas=planificador.reaperturas - antes[4])
+    return resultado
+
+
+class CacheBusquedas:
+    """Caché LRU de resultados de búsqueda acotada por memoria.
+
+    La clave combina la huella Zobrist del laberinto (igual para laberintos con el
+    mismo contenido), el inicio, la meta y el algoritmo, así que sirve tanto para
+    los reintentos dentro de un episodio como entre episodios sobre el mismo
+    laberinto. Cuando la memoria estimada supera el máximo se descartan las
+    entradas usadas hace más tiempo.
+
+    Los árboles de padres se guardan sin el laberinto (ver ArbolPadres.compartido)
+    y cada acierto recibe un árbol sin nodos construidos, así lo que retiene una
+    entrada no crece después de medirla.
+    """
+
+    def __init__(self, memoria_maxima=MEMORIA_CACHE_BUSQUEDAS):
+        self.memoria_maxima = memoria_maxima
+        self.memoria = 0
+        self.entradas = OrderedDict()  # clave -> (resultado, tamaño estimado)
+        self.aciertos = 0
+        self.fallos = 0
+
+    @staticmethod
+    def clave(laberinto, inicio, meta, algoritmo, compacto):
+        return (laberinto.filas, laberinto.columnas, laberinto.huella(), inicio, meta,
+                algoritmo, compacto)
+
+    @staticmethod
+    def tamano(resultado):
+        """Estimación de los bytes que retiene un resultado."""
+        camino, nodos_generados, _ = resultado
+        # El camino y la cadena de nodos de nodo_final tienen un elemento por paso
+        tamano = (BYTES_ENTRADA + BYTES_NODO) * len(camino) if camino else 0
+        if isinstance(nodos_generados, ArbolPadres):
+            tamano += (nodos_generados.padres.itemsize * len(nodos_generados.padres) +
+                       nodos_generados.generados.itemsize * len(nodos_generados.generados))
+        else:
+            tamano += BYTES_NODO * len(nodos_generados)
+        return tamano
+
+    def obtener(self, clave):
+        entrada = self.entradas.get(clave)
+        if entrada is None:
+            self.fallos += 1
+            return None
+        self.entradas.move_to_end(clave)
+        self.aciertos += 1
+        camino, nodos_generados, nodo_final = entrada[0]
+        if isinstance(nodos_generados, ArbolPadres):
+            # Los nodos que construya quien lo recorra no quedan en la caché
+            nodos_generados = nodos_generados.compartido(nodos_generados.laberinto)
+        # Copia del camino: quien lo recibe puede modificarlo
+        return (list(camino) if camino else camino), nodos_generados, nodo_final
+
+    def guardar(self, clave, resultado):
+        camino, nodos_generados, nodo_final = resultado
+        if isinstance(nodos_generados, ArbolPadres):
+            resultado = camino, nodos_generados.compartido(), nodo_final
+        tamano = self.tamano(resultado)
+        if tamano > self.memoria_maxima:
+            return
+        anterior = self.entradas.pop(clave, None)
+        if anterior is not None:
+            self.memoria -= anterior[1]
+        self.entradas[clave] = (resultado, tamano)
+        self.memoria += tamano
+        while self.memoria > self.memoria_maxima:
+            _, (_, tamano_descartado) = self.entradas.popitem(last=False)
+            self.memoria -= tamano_descartado
+
+    def limpiar(self):
+        self.entradas.clear()
+        self.memoria = 0
+
+    def __len__(self):
+        return len(self.entradas)
+
+
+# Caché compartida por los agentes del proceso
+CACHE_BUSQUEDAS = CacheBusquedas()
+
 
-    return None, nodos_generados, None
+def elegir_algoritmo(laberinto, estado_actual, meta, algoritmo="A*", planificador=None, compacto=False,
+                     tablas_salto=None, planificador_jerarquico=None, cache=None, campo=None,
+                     estadisticas=None):
+    """Selecciona y ejecuta el algoritmo de búsqueda apropiado.
 
+    Con compacto=True, BFS, DFS y A* guardan el árbol en un arreglo de padres
+    (ArbolPadres) y solo crean objetos Nodo cuando se recorren. Con una cache
+    (CacheBusquedas) se reutilizan los resultados ya calculados para el mismo
+    contenido del laberinto, salvo en los algoritmos con estado propio. Si se
+    pasa un EstadisticasBusqueda, se rellena con el esfuerzo de la búsqueda.
+    """
+    if cache is not None and algoritmo not in ALGORITMOS_CON_ESTADO:
+        reloj = time.perf_counter()
+        clave = cache.clave(laberinto, estado_actual, meta, algoritmo, compacto)
+        resultado = cache.obtener(clave)
+        if resultado is None:
+            resultado = ejecutar_algoritmo(laberinto, estado_actual, meta, algoritmo, planificador,
+                                           compacto, tablas_salto, planificador_jerarquico, campo,
+                                           estadisticas)
+            cache.guardar(clave, resultado)
+            camino, nodos_generados, nodo_final = resultado
+            resultado = (list(camino) if camino else camino), nodos_generados, nodo_final
+        elif estadisticas is not None:
+            # Acierto: no hubo búsqueda, solo la consulta a la caché
+            completar_estadisticas(estadisticas, resultado, reloj, expansiones=0, generaciones=0,
+                                   inserciones=0, extracciones=0, pico_frontera=0, memoria_pico=0)
+            estadisticas.algoritmo = algoritmo
+            estadisticas.desde_cache = True
+        return resultado
+    return ejecutar_algoritmo(laberinto, estado_actual, meta, algoritmo, planificador, compacto,
+                              tablas_salto, planificador_jerarquico, campo, estadisticas)
 
 
-def elegir_algoritmo(laberinto, estado_actual, meta, algoritmo="A*"):
-    """Selecciona y ejecuta el algoritmo de búsqueda apropiado."""
+def ejecutar_algoritmo(laberinto, estado_actual, meta, algoritmo="A*", planificador=None,
+                       compacto=False, tablas_salto=None, planificador_jerarquico=None, campo=None,
+                       estadisticas=None):
+    """Ejecuta el algoritmo indicado, sin caché."""
+    if estadisticas is not None:
+        estadisticas.algoritmo = algoritmo
     if algoritmo == "BFS":
-        return bfs(laberinto, estado_actual, meta)
+        if compacto:
+            return bfs_compacto(laberinto, estado_actual, meta, estadisticas)
+        return bfs(laberinto, estado_actual, meta, estadisticas)
     elif algoritmo == "DFS":
-        return dfs(laberinto, estado_actual, meta)
+        if compacto:
+            return dfs_compacto(laberinto, estado_actual, meta, estadisticas)
+        return dfs(laberinto, estado_actual, meta, estadisticas)
     elif algoritmo == "A*":
-        return a_estrella(laberinto, estado_actual, meta)
+        if compacto:
+            return a_estrella_compacto(laberinto, estado_actual, meta, estadisticas)
+        return a_estrella(laberinto, estado_actual, meta, estadisticas)
     elif algoritmo == "IDS":
-        return ids(laberinto, estado_actual, meta)
+        return ids(laberinto, estado_actual, meta, max_nodos_retenidos=MAX_NODOS_RETENIDOS_IDS,
+                   estadisticas=estadisticas)
+    elif algoritmo == "D* Lite":
+        return d_estrella_lite(laberinto, estado_actual, meta, planificador, estadisticas)
+    elif algoritmo == "BFS bidireccional":
+        return bfs_bidireccional(laberinto, estado_actual, meta, estadisticas)
+    elif algoritmo == "A* bidireccional":
+        return a_estrella_bidireccional(laberinto, estado_actual, meta, estadisticas)
+    elif algoritmo == "JPS":
+        return jps(laberinto, estado_actual, meta, tablas_salto, estadisticas)
+    elif algoritmo == "HPA*":
+        return hpa_estrella(laberinto, estado_actual, meta, planificador_jerarquico, estadisticas)
+    elif algoritmo == "Campo de distancias":
+        return campo_distancias(laberinto, estado_actual, meta, campo, estadisticas)
     else:
         # Por defecto, usar A* (mejor opción para la mayoría de casos)
-        return a_estrella(laberinto, estado_actual, meta)
+        if compacto:
+            return a_estrella_compacto(laberinto, estado_actual, meta, estadisticas)
+        return a_estrella(laberinto, estado_actual, meta, estadisticas)
 
 # Función para determinar si el agente está atrapado
 def agente_atrapado(laberinto, estado, umbral=1):
@@ -1,12 +1,15 @@
+import threading
+from collections import deque
 import networkx as nx
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_agg import FigureCanvasAgg
-from networkx.drawing.nx_agraph import graphviz_layout
+from matplotlib.figure import Figure
 import pygame
 import numpy as np
 
+from core.medicion import Medidor
+
 class VisualizadorArbol:
-    def __init__(self):
+    def __init__(self, en_segundo_plano=False, medidor=None):
         self.grafo = nx.DiGraph()
         self.posiciones = None
         self.figura = None
@@ -15,13 +18,27 @@ class VisualizadorArbol:
         self.ancho = 500
         self.alto = 700  # Aumentar la altura para dar más espacio vertical
         self.niveles = {}  # Diccionario para almacenar los niveles de los nodos
+        # "nativo": distribución de árbol propia en tiempo lineal; "graphviz": dot (requiere pygraphviz)
+        self.motor_layout = "nativo"
+        # "pygame": dibujo directo sobre la superficie; "matplotlib": figura rasterizada
+        # (más lenta; se usa siempre en exportar_png)
+        self.motor_dibujo = "pygame"
+        self.dibujo_pygame = DibujoArbolPygame(self.ancho, self.alto)
+        # Tiempos de distribución y dibujo del árbol (normalmente, el medidor del agente)
+        self.medidor = medidor if medidor is not None else Medidor()
+        # Con en_segundo_plano, matplotlib dibuja en un hilo aparte y se sigue
+        # mostrando la última imagen hasta que la nueva esté lista
+        self.renderizador = RenderizadorSegundoPlano(medidor=self.medidor) if en_segundo_plano else None
+        self.cambios_sin_enviar = True
 
     def limpiar(self):
         """Limpia el grafo y reinicia la visualización."""
         self.grafo.clear()
         self.posiciones = None
         self.figura = None
-        self.superficie = None
+        if self.renderizador is None:
+            self.superficie = None
+        self.cambios_sin_enviar = True
         self.niveles = {}
 
     def construir_arbol_desde_nodo(self, nodo_final):
@@ -64,7 +81,8 @@ class VisualizadorArbol:
                     self.grafo.add_node(estado_str)
 
         # Calcular las posiciones de los nodos
-        self.posiciones = graphviz_layout(self.grafo, prog='dot')
+        self.posiciones = self.calcular_layout()
+
     def construir_arbol_desde_nodos(self, algoritmo, nodos, camino=None):
         self.limpiar()
         self.ultimo_algoritmo = algoritmo
@@ -72,6 +90,9 @@ class VisualizadorArbol:
         if not nodos:
             return
 
+        # Padre con el que apareció cada estado por primera vez; como un padre siempre
+        # se genera antes que sus hijos, estos enlaces forman un árbol sin ciclos
+        padres = {}
         for nodo in nodos:
             hijo_str = f"{nodo.estado[0]},{nodo.estado[1]}"
             self.grafo.add_node(hijo_str)
@@ -80,8 +101,10 @@ class VisualizadorArbol:
                 padre_str = f"{nodo.padre.estado[0]},{nodo.padre.estado[1]}"
                 self.grafo.add_node(padre_str)
                 self.grafo.add_edge(padre_str, hijo_str)
-
-        self.niveles = self.calcular_niveles_desde_inicio(nodos[0].estado)
+                padres.setdefault(padre_str, None)
+                padres.setdefault(hijo_str, padre_str)
+            else:
+                padres.setdefault(hijo_str, None)
 
         if camino:
             for i in range(len(camino) - 1):
@@ -90,7 +113,7 @@ class VisualizadorArbol:
                 if self.grafo.has_edge(estado1, estado2):
                     self.grafo[estado1][estado2]['optimal'] = True
 
-        self.posiciones = graphviz_layout(self.grafo, prog='dot') 
+        self.posiciones = self.calcular_layout(padres)
 
     def construir_arbol_desde_visitados(self, algoritmo, visitados, camino=None):
         # Construye un árbol de búsqueda a partir de los nodos visitados.
@@ -111,10 +134,6 @@ class VisualizadorArbol:
             estado_siguiente = f"{visitados[i+1][0]},{visitados[i+1][1]}"
             self.grafo.add_edge(estado_actual, estado_siguiente)
             
-        # Calcular niveles de los nodos basado en la distancia al nodo inicial
-        self.niveles = self.calcular_niveles_desde_inicio(visitados[0])
-        max_profundidad = max(self.niveles.values()) if self.niveles else 0
-
         # Resaltar el camino óptimo si se proporciona
         if camino:
             for i in range(len(camino) - 1):
@@ -131,8 +150,38 @@ class VisualizadorArbol:
                 self.grafo[estado1_str][estado2_str]['optimal'] = True
 
         # Calcular las posiciones de los nodos
-        self.posiciones = graphviz_layout(self.grafo, prog='dot')
-        
+        self.posiciones = self.calcular_layout()
+
+    def calcular_layout(self, padres=None):
+        """Calcula las posiciones de los nodos del grafo como un árbol ordenado.
+
+        padres asocia cada nodo con su padre (None en las raíces). Si no se da, se
+        obtiene un árbol generador recorriendo el grafo en amplitud desde los nodos
+        sin predecesores. También actualiza self.niveles con la profundidad de cada nodo.
+        """
+        inicio = self.medidor.inicio()
+        posiciones = self._calcular_layout(padres)
+        self.medidor.fin("arbol_layout", inicio)
+        return posiciones
+
+    def _calcular_layout(self, padres):
+        if self.motor_layout == "graphviz":
+            # Dependencia opcional: solo se importa si se pide explícitamente
+            from networkx.drawing.nx_agraph import graphviz_layout
+            return graphviz_layout(self.grafo, prog='dot')
+
+        if padres is None:
+            padres = arbol_generador(self.grafo)
+        hijos = {nodo: [] for nodo in padres}
+        raices = []
+        for nodo, padre in padres.items():
+            if padre is None:
+                raices.append(nodo)
+            else:
+                hijos[padre].append(nodo)
+        posiciones, self.niveles = layout_arbol(raices, hijos)
+        return posiciones
+
     def calcular_niveles_desde_inicio(self, nodo_inicio):
         
         # Calcula los niveles de los nodos en el grafo desde un nodo de inicio dado.
@@ -208,91 +257,494 @@ class VisualizadorArbol:
         
         return posiciones_escaladas
     
+    def tomar_instantanea(self):
+        """Copia los datos necesarios para dibujar el árbol, de modo que otro hilo
+        pueda rasterizarlos mientras el grafo sigue cambiando. None si no hay árbol."""
+        if not self.grafo or not self.posiciones:
+            return None
+        aristas_normales = []
+        aristas_optimas = []
+        for u, v, d in self.grafo.edges(data=True):
+            if d.get('optimal'):
+                aristas_optimas.append((u, v))
+            else:
+                aristas_normales.append((u, v))
+        return {
+            "algoritmo": self.ultimo_algoritmo,
+            "nodos": list(self.grafo.nodes()),
+            "posiciones": dict(self.posiciones),
+            "aristas_normales": aristas_normales,
+            "aristas_optimas": aristas_optimas,
+        }
+
+    def _superficie_desde_buffer(self, imagen):
+        """Convierte el resultado de rasterizar_instantanea en una superficie escalada."""
+        datos, tamano = imagen
+        surf = pygame.image.frombuffer(datos, tamano, "RGBA")
+        # Escalar al tamaño deseado (crea una copia independiente del buffer)
+        return pygame.transform.scale(surf, (self.ancho, self.alto))
+
     def actualizar_visualizacion(self):
         # Actualiza la visualización del árbol y la convierte en una superficie de pygame.
-        if not self.grafo or not self.posiciones:
-            # Crear un grafo vacío si no hay datos
-            self.figura = plt.figure(figsize=(5, 7), dpi=100)  # Mayor tamaño y relación de aspecto
-            ax = self.figura.add_subplot(111)
-            ax.text(0.5, 0.5, "No hay datos para visualizar",
-                   horizontalalignment='center', verticalalignment='center')
-            ax.set_xticks([])
-            ax.set_yticks([])
-            plt.tight_layout()
+        inicio = self.medidor.inicio()
+        if self.motor_dibujo == "pygame":
+            self.superficie = self.dibujo_pygame.dibujar(self.tomar_instantanea())
         else:
-            # Crear figura con mayor tamaño vertical
-            self.figura = plt.figure(figsize=(5, 7), dpi=100)  # Ajuste para árboles altos
-            ax = self.figura.add_subplot(111)
-            
-            # Ajustar margen para dar más espacio
-            plt.subplots_adjust(left=0.05, right=0.95, top=0.95, bottom=0.05)
-            
-            # Determinar el número de nodos para ajustar el tamaño
-            num_nodos = len(self.grafo.nodes())
-            # Ajustar tamaño de nodo según la cantidad de nodos
-            node_size = 600 if num_nodos < 20 else 350 if num_nodos < 50 else 400
-            # Ajustar tamaño de fuente según la cantidad de nodos
-            font_size = 8 if num_nodos < 20 else 6 if num_nodos < 50 else 5
-
-            # Colores de nodos según el algoritmo
-            if self.ultimo_algoritmo == "BFS":
-                node_color = 'skyblue'
-            elif self.ultimo_algoritmo == "DFS":
-                node_color = 'lightgreen'
-            else:  # A*
-                node_color = 'lightcoral'
-
-            # Dibujar nodos con tamaño ajustado
-            nx.draw_networkx_nodes(self.grafo, self.posiciones, node_size=node_size,
-                                  node_color=node_color, ax=ax)
-
-            # Dibujar bordes normales
-            normal_edges = [(u, v) for u, v, d in self.grafo.edges(data=True)
-                            if 'optimal' not in d or not d['optimal']]
-            if normal_edges:
-                nx.draw_networkx_edges(self.grafo, self.posiciones, edgelist=normal_edges,
-                                      width=0.8, alpha=0.7, ax=ax)  # Bordes más delgados
-
-            # Dibujar bordes del camino óptimo
-            optimal_edges = [(u, v) for u, v, d in self.grafo.edges(data=True)
-                            if 'optimal' in d and d['optimal']]
-            if optimal_edges:
-                nx.draw_networkx_edges(self.grafo, self.posiciones, edgelist=optimal_edges,
-                                      width=2.0, edge_color='red', ax=ax)  # Camino óptimo más destacado
-
-            # Mostrar etiquetas de nodos con tamaño ajustable
-            nx.draw_networkx_labels(self.grafo, self.posiciones, font_size=font_size, ax=ax)
-
-            # Título más compacto
-            plt.title(f"Árbol - {self.ultimo_algoritmo}", fontsize=10)
-            
-            # Remover bordes
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            ax.spines['bottom'].set_visible(False)
-            ax.spines['left'].set_visible(False)
-            
-            plt.tight_layout(pad=0.1)  # Reducir padding
-
-        # Convertir figura a superficie de pygame
-        canvas = FigureCanvasAgg(self.figura)
-        canvas.draw()
-        renderer = canvas.get_renderer()
-        raw_data = renderer.tostring_rgb()
-        size = canvas.get_width_height()
-
-        # Cerrar la figura para liberar memoria
-        plt.close(self.figura)
+            self.superficie = self._superficie_desde_buffer(rasterizar_instantanea(self.tomar_instantanea()))
+        self.medidor.fin("arbol_dibujo", inicio)
+        self.cambios_sin_enviar = False
+        return self.superficie
 
-        # Crear surface de pygame
-        surf = pygame.image.fromstring(raw_data, size, "RGB")
-        # Escalar al tamaño deseado
-        self.superficie = pygame.transform.scale(surf, (self.ancho, self.alto))
+    def exportar_png(self, ruta, dpi=200):
+        """Guarda el árbol actual como PNG de alta calidad usando matplotlib."""
+        figura = crear_figura(self.tomar_instantanea(), dpi)
+        FigureCanvasAgg(figura)
+        figura.savefig(ruta, dpi=dpi)
+        return ruta
 
+    def obtener_superficie(self):
+        """Devuelve la superficie actualizada para dibujar en pygame.
+
+        En segundo plano devuelve la última imagen terminada (o None al principio)
+        y encarga la nueva al hilo renderizador sin bloquear el bucle de la interfaz.
+        """
+        # El dibujo directo con pygame es lo bastante rápido para hacerse en el momento
+        if self.renderizador is None or self.motor_dibujo == "pygame":
+            if self.superficie is None or self.cambios_sin_enviar:
+                self.actualizar_visualizacion()
+            return self.superficie
+
+        if self.cambios_sin_enviar:
+            self.renderizador.enviar(self.tomar_instantanea())
+            self.cambios_sin_enviar = False
+        imagen = self.renderizador.tomar_resultado()
+        if imagen is not None:
+            self.superficie = self._superficie_desde_buffer(imagen)
         return self.superficie
 
-    def obtener_superficie(self):
-        """Devuelve la superficie actualizada para dibujar en pygame."""
-        if self.superficie is None:
-            self.actualizar_visualizacion()
-        return self.superficie
\ No newline at end of file
+    def detener(self):
+        """Detiene el hilo renderizador, si existe."""
+        if self.renderizador is not None:
+            self.renderizador.detener()
+            self.renderizador = None
+
+
+def arbol_generador(grafo):
+    """Devuelve {nodo: padre} de un árbol generador del grafo (recorrido en amplitud).
+
+    Las raíces son los nodos sin predecesores; si quedan nodos sin alcanzar (ciclos),
+    el primero de ellos se toma como raíz adicional.
+    """
+    padres = {}
+    pendientes = [nodo for nodo in grafo.nodes if grafo.in_degree(nodo) == 0]
+    pendientes += list(grafo.nodes)
+    for raiz in pendientes:
+        if raiz in padres:
+            continue
+        padres[raiz] = None
+        cola = deque([raiz])
+        while cola:
+            nodo = cola.popleft()
+            for sucesor in grafo.successors(nodo):
+                if sucesor not in padres:
+                    padres[sucesor] = nodo
+                    cola.append(sucesor)
+    return padres
+
+
+def layout_arbol(raices, hijos, separacion_x=1.0, separacion_y=1.0):
+    """Distribución ordenada de árboles (Reingold-Tilford, versión lineal de Buchheim et al.).
+
+    raices es la lista de raíces (un bosque se cuelga de una raíz virtual) e hijos
+    asocia cada nodo con la lista ordenada de sus hijos. Devuelve (posiciones,
+    niveles): posiciones {nodo: (x, y)} con la raíz arriba, como la salida de dot,
+    y niveles {nodo: profundidad}. Los recorridos son iterativos, así que la
+    profundidad del árbol no está limitada por la recursión de Python.
+    """
+    if not raices:
+        return {}, {}
+
+    # Se trabaja con índices enteros; el índice 0 es la raíz virtual
+    claves = [None]
+    hijos_idx = [[]]
+    padre = [-1]
+    numero = [0]  # Posición entre los hermanos
+    indices = {}
+    pila = [(raiz, 0) for raiz in reversed(raices)]
+    while pila:
+        clave, indice_padre = pila.pop()
+        indice = len(claves)
+        indices[clave] = indice
+        claves.append(clave)
+        hijos_idx.append([])
+        padre.append(indice_padre)
+        numero.append(len(hijos_idx[indice_padre]))
+        hijos_idx[indice_padre].append(indice)
+        for hijo in reversed(hijos.get(clave, ())):
+            pila.append((hijo, indice))
+
+    n = len(claves)
+    prelim = [0.0] * n
+    mod = [0.0] * n
+    cambio = [0.0] * n
+    desplazamiento = [0.0] * n
+    hilo = [-1] * n
+    ancestro = list(range(n))
+    ancestro_defecto = [h[0] if h else -1 for h in hijos_idx]
+
+    def hermano_izquierdo(v):
+        return hijos_idx[padre[v]][numero[v] - 1] if padre[v] >= 0 and numero[v] > 0 else -1
+
+    def siguiente_izquierda(v):
+        return hijos_idx[v][0] if hijos_idx[v] else hilo[v]
+
+    def siguiente_derecha(v):
+        return hijos_idx[v][-1] if hijos_idx[v] else hilo[v]
+
+    def mover_subarbol(wm, wp, cantidad):
+        subarboles = numero[wp] - numero[wm]
+        cambio[wp] -= cantidad / subarboles
+        desplazamiento[wp] += cantidad
+        cambio[wm] += cantidad / subarboles
+        prelim[wp] += cantidad
+        mod[wp] += cantidad
+
+    def repartir(v, defecto):
+        w = hermano_izquierdo(v)
+        if w < 0:
+            return defecto
+        vip = vop = v
+        vim = w
+        vom = hijos_idx[padre[v]][0]
+        sip, sop, sim, som = mod[vip], mod[vop], mod[vim], mod[vom]
+        while siguiente_derecha(vim) >= 0 and siguiente_izquierda(vip) >= 0:
+            vim = siguiente_derecha(vim)
+            vip = siguiente_izquierda(vip)
+            vom = siguiente_izquierda(vom)
+            vop = siguiente_derecha(vop)
+            ancestro[vop] = v
+            cantidad = (prelim[vim] + sim) - (prelim[vip] + sip) + separacion_x
+            if cantidad > 0:
+                a = ancestro[vim] if padre[ancestro[vim]] == padre[v] else defecto
+                mover_subarbol(a, v, cantidad)
+                sip += cantidad
+                sop += cantidad
+            sim += mod[vim]
+            sip += mod[vip]
+            som += mod[vom]
+            sop += mod[vop]
+        if siguiente_derecha(vim) >= 0 and siguiente_derecha(vop) < 0:
+            hilo[vop] = siguiente_derecha(vim)
+            mod[vop] += sim - sop
+        if siguiente_izquierda(vip) >= 0 and siguiente_izquierda(vom) < 0:
+            hilo[vom] = siguiente_izquierda(vip)
+            mod[vom] += sip - som
+            defecto = v
+        return defecto
+
+    # Primer recorrido (postorden): posiciones preliminares relativas a los hermanos
+    orden = []
+    pila = [0]
+    while pila:
+        v = pila.pop()
+        orden.append(v)
+        pila.extend(hijos_idx[v])
+    for v in reversed(orden):
+        izquierdo = hermano_izquierdo(v)
+        if hijos_idx[v]:
+            # Aplica los desplazamientos acumulados de los hijos
+            acumulado = acumulado_cambio = 0.0
+            for w in reversed(hijos_idx[v]):
+                prelim[w] += acumulado
+                mod[w] += acumulado
+                acumulado_cambio += cambio[w]
+                acumulado += desplazamiento[w] + acumulado_cambio
+            medio = (prelim[hijos_idx[v][0]] + prelim[hijos_idx[v][-1]]) / 2
+            if izquierdo >= 0:
+                prelim[v] = prelim[izquierdo] + separacion_x
+                mod[v] = prelim[v] - medio
+            else:
+                prelim[v] = medio
+        elif izquierdo >= 0:
+            prelim[v] = prelim[izquierdo] + separacion_x
+        if padre[v] >= 0:
+            ancestro_defecto[padre[v]] = repartir(v, ancestro_defecto[padre[v]])
+
+    # Segundo recorrido (preorden): posiciones absolutas acumulando los modificadores
+    posiciones = {}
+    niveles = {}
+    pila = [(hijo, mod[0], 0) for hijo in hijos_idx[0]]
+    while pila:
+        v, m, profundidad = pila.pop()
+        posiciones[claves[v]] = (prelim[v] + m, -profundidad * separacion_y)
+        niveles[claves[v]] = profundidad
+        for w in hijos_idx[v]:
+            pila.append((w, m + mod[v], profundidad + 1))
+    return posiciones, niveles
+
+
+# Colores de los nodos según el algoritmo (los mismos que en la figura de matplotlib)
+COLORES_ALGORITMO = {
+    "BFS": (135, 206, 235),   # skyblue
+    "DFS": (144, 238, 144),   # lightgreen
+}
+COLOR_NODO_DEFECTO = (240, 128, 128)  # lightcoral
+COLOR_ARISTA = (110, 110, 110)
+COLOR_OPTIMO = (255, 0, 0)
+COLOR_FONDO = (255, 255, 255)
+
+
+def polilineas_aristas(aristas):
+    """Agrupa las aristas en polilíneas que recorren cada arista de ida y vuelta.
+
+    Así todas las aristas de un árbol se dibujan con una sola llamada a
+    pygame.draw.lines por componente, en lugar de una llamada por arista.
+    """
+    adyacencia = {}
+    destinos = set()
+    for u, v in aristas:
+        adyacencia.setdefault(u, []).append(v)
+        destinos.add(v)
+    raices = [u for u in adyacencia if u not in destinos] + list(adyacencia)
+
+    expandidos = set()
+    polilineas = []
+    for raiz in raices:
+        if raiz in expandidos:
+            continue
+        expandidos.add(raiz)
+        puntos = [raiz]
+        pila = [(raiz, iter(adyacencia[raiz]))]
+        while pila:
+            u, sucesores = pila[-1]
+            v = next(sucesores, None)
+            if v is None:
+                pila.pop()
+                if pila:
+                    puntos.append(pila[-1][0])  # Volver al padre por la misma arista
+                continue
+            puntos.append(v)
+            if v not in expandidos and v in adyacencia:
+                expandidos.add(v)
+                pila.append((v, iter(adyacencia[v])))
+            else:
+                puntos.append(u)
+        polilineas.append(puntos)
+    return polilineas
+
+
+class DibujoArbolPygame:
+    """Dibuja el árbol directamente sobre una pygame.Surface, sin matplotlib.
+
+    Las aristas se dibujan en lote con pygame.draw.lines y las etiquetas de los
+    nodos se renderizan una sola vez y se reutilizan entre dibujos.
+    """
+
+    MARGEN = 20
+    ALTO_TITULO = 30
+
+    def __init__(self, ancho, alto):
+        self.ancho = ancho
+        self.alto = alto
+        self._fuentes = {}
+        self._glifos = {}  # (texto, tamaño) -> Surface
+
+    def _fuente(self, tamano):
+        if tamano not in self._fuentes:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self._fuentes[tamano] = pygame.font.SysFont("Arial", tamano)
+        return self._fuentes[tamano]
+
+    def _glifo(self, texto, tamano):
+        clave = (texto, tamano)
+        glifo = self._glifos.get(clave)
+        if glifo is None:
+            glifo = self._fuente(tamano).render(texto, True, (0, 0, 0))
+            self._glifos[clave] = glifo
+        return glifo
+
+    def dibujar(self, instantanea):
+        superficie = pygame.Surface((self.ancho, self.alto))
+        superficie.fill(COLOR_FONDO)
+        if instantanea is None:
+            texto = self._glifo("No hay datos para visualizar", 16)
+            superficie.blit(texto, texto.get_rect(center=(self.ancho // 2, self.alto // 2)))
+            return superficie
+
+        algoritmo = instantanea["algoritmo"]
+        titulo = self._glifo(f"Árbol - {algoritmo}", 16)
+        superficie.blit(titulo, titulo.get_rect(midtop=(self.ancho // 2, 6)))
+
+        # Escala de las coordenadas del layout a píxeles (raíz arriba)
+        posiciones = instantanea["posiciones"]
+        xs = [x for x, _ in posiciones.values()]
+        ys = [y for _, y in posiciones.values()]
+        min_x, max_x, min_y, max_y = min(xs), max(xs), min(ys), max(ys)
+        ancho_util = self.ancho - 2 * self.MARGEN
+        alto_util = self.alto - 2 * self.MARGEN - self.ALTO_TITULO
+        escala_x = ancho_util / (max_x - min_x) if max_x > min_x else 0
+        escala_y = alto_util / (max_y - min_y) if max_y > min_y else 0
+        desplazamiento_x = self.MARGEN + (ancho_util / 2 if escala_x == 0 else 0)
+        desplazamiento_y = self.MARGEN + self.ALTO_TITULO + (alto_util / 2 if escala_y == 0 else 0)
+        pixeles = {
+            nodo: (desplazamiento_x + (x - min_x) * escala_x, desplazamiento_y + (max_y - y) * escala_y)
+            for nodo, (x, y) in posiciones.items()
+        }
+
+        # Aristas: una llamada por componente para las normales y otra para el camino
+        for polilinea in polilineas_aristas(instantanea["aristas_normales"] + instantanea["aristas_optimas"]):
+            if len(polilinea) > 1:
+                pygame.draw.lines(superficie, COLOR_ARISTA, False, [pixeles[n] for n in polilinea])
+        for polilinea in polilineas_aristas(instantanea["aristas_optimas"]):
+            if len(polilinea) > 1:
+                pygame.draw.lines(superficie, COLOR_OPTIMO, False, [pixeles[n] for n in polilinea], 3)
+
+        # Nodos con un radio acorde al espacio disponible
+        separacion = min(e for e in (escala_x, escala_y, 40) if e > 0)
+        radio = max(1, min(12, int(separacion * 0.4)))
+        color = COLORES_ALGORITMO.get(algoritmo, COLOR_NODO_DEFECTO)
+        for x, y in pixeles.values():
+            pygame.draw.circle(superficie, color, (int(x), int(y)), radio)
+
+        # Etiquetas solo si caben; los glifos se reutilizan entre dibujos
+        if radio >= 8:
+            tamano = 10 if radio >= 11 else 8
+            etiquetas = []
+            for nodo, (x, y) in pixeles.items():
+                glifo = self._glifo(nodo, tamano)
+                etiquetas.append((glifo, glifo.get_rect(center=(int(x), int(y)))))
+            superficie.blits(etiquetas, doreturn=False)
+        return superficie
+
+
+def crear_figura(instantanea, dpi=100):
+    """Crea la figura de matplotlib de una instantánea del árbol (None: figura vacía)."""
+    figura = Figure(figsize=(5, 7), dpi=dpi)  # Mayor tamaño y relación de aspecto
+    ax = figura.add_subplot(111)
+    if instantanea is None:
+        # Crear un grafo vacío si no hay datos
+        ax.text(0.5, 0.5, "No hay datos para visualizar",
+               horizontalalignment='center', verticalalignment='center')
+        ax.set_xticks([])
+        ax.set_yticks([])
+        figura.tight_layout()
+    else:
+        # Ajustar margen para dar más espacio
+        figura.subplots_adjust(left=0.05, right=0.95, top=0.95, bottom=0.05)
+
+        grafo = nx.DiGraph()
+        grafo.add_nodes_from(instantanea["nodos"])
+        posiciones = instantanea["posiciones"]
+
+        # Determinar el número de nodos para ajustar el tamaño
+        num_nodos = len(instantanea["nodos"])
+        # Ajustar tamaño de nodo según la cantidad de nodos
+        node_size = 600 if num_nodos < 20 else 350 if num_nodos < 50 else 400
+        # Ajustar tamaño de fuente según la cantidad de nodos
+        font_size = 8 if num_nodos < 20 else 6 if num_nodos < 50 else 5
+
+        # Colores de nodos según el algoritmo
+        if instantanea["algoritmo"] == "BFS":
+            node_color = 'skyblue'
+        elif instantanea["algoritmo"] == "DFS":
+            node_color = 'lightgreen'
+        else:  # A*
+            node_color = 'lightcoral'
+
+        # Dibujar nodos con tamaño ajustado
+        nx.draw_networkx_nodes(grafo, posiciones, node_size=node_size,
+                              node_color=node_color, ax=ax)
+
+        # Dibujar bordes normales
+        if instantanea["aristas_normales"]:
+            nx.draw_networkx_edges(grafo, posiciones, edgelist=instantanea["aristas_normales"],
+                                  width=0.8, alpha=0.7, ax=ax)  # Bordes más delgados
+
+        # Dibujar bordes del camino óptimo
+        if instantanea["aristas_optimas"]:
+            nx.draw_networkx_edges(grafo, posiciones, edgelist=instantanea["aristas_optimas"],
+                                  width=2.0, edge_color='red', ax=ax)  # Camino óptimo más destacado
+
+        # Mostrar etiquetas de nodos con tamaño ajustable
+        nx.draw_networkx_labels(grafo, posiciones, font_size=font_size, ax=ax)
+
+        # Título más compacto
+        ax.set_title(f"Árbol - {instantanea['algoritmo']}", fontsize=10)
+
+        # Remover bordes
+        for borde in ax.spines.values():
+            borde.set_visible(False)
+
+        figura.tight_layout(pad=0.1)  # Reducir padding
+    return figura
+
+
+def rasterizar_instantanea(instantanea):
+    """Dibuja una instantánea del árbol con matplotlib y devuelve (bytes RGBA, (ancho, alto)).
+
+    Solo usa objetos propios (Figure + FigureCanvasAgg, sin pyplot), por lo que se
+    puede ejecutar fuera del hilo principal.
+    """
+    figura = crear_figura(instantanea)
+    canvas = FigureCanvasAgg(figura)
+    canvas.draw()
+    return bytes(canvas.buffer_rgba()), canvas.get_width_height()
+
+
+class RenderizadorSegundoPlano:
+    """Hilo que rasteriza instantáneas del árbol fuera del bucle de la interfaz.
+
+    Solo guarda el último trabajo pendiente: si llegan replanificaciones más rápido
+    de lo que se dibuja, las instantáneas intermedias se descartan.
+    """
+
+    def __init__(self, funcion=rasterizar_instantanea, medidor=None):
+        self.funcion = funcion
+        self.medidor = medidor if medidor is not None else Medidor()
+        self._condicion = threading.Condition()
+        self._pendiente = None
+        self._hay_pendiente = False
+        self._resultado = None
+        self._activo = True
+        self._hilo = threading.Thread(target=self._bucle, name="renderizador-arbol", daemon=True)
+        self._hilo.start()
+
+    def enviar(self, instantanea):
+        """Encarga dibujar una instantánea, reemplazando la pendiente si la hay."""
+        with self._condicion:
+            self._pendiente = instantanea
+            self._hay_pendiente = True
+            self._condicion.notify()
+
+    def tomar_resultado(self):
+        """Devuelve la última imagen terminada una sola vez, o None si no hay nueva."""
+        with self._condicion:
+            resultado, self._resultado = self._resultado, None
+        return resultado
+
+    def detener(self):
+        with self._condicion:
+            self._activo = False
+            self._condicion.notify()
+        self._hilo.join(timeout=1.0)
+
+    def _bucle(self):
+        while True:
+            with self._condicion:
+                while self._activo and not self._hay_pendiente:
+                    self._condicion.wait()
+                if not self._activo:
+                    return
+                instantanea = self._pendiente
+                self._pendiente = None
+                self._hay_pendiente = False
+            try:
+                inicio = self.medidor.inicio()
+                imagen = self.funcion(instantanea)
+                self.medidor.fin("arbol_rasterizado", inicio)
+            except Exception as e:  # Un fallo de dibujo no debe tumbar el hilo
+                print(f"Error al dibujar el árbol: {e}")
+                continue
+            with self._condicion:
+                self._resultado = imagen
\ No newline at end of file
@@ -0,0 +1,219 @@
+"""
+Benchmark de algoritmos de búsqueda
+===================================
+
+Construye laberintos con semilla fija para varios tamaños y densidades de paredes,
+ejecuta cada algoritmo a través de elegir_algoritmo y registra el tiempo, los nodos
+generados, la memoria pico (tracemalloc), la longitud del camino y el esfuerzo de
+la búsqueda según EstadisticasBusqueda (expansiones, operaciones de frontera, pico
+de frontera y memoria estimada).
+
+Uso:
+    python -m core.benchmark --tamanos 10,50,100 --densidades 0.1,0.3 --salida base.json
+    python -m core.benchmark --tamanos 10,50,100 --densidades 0.1,0.3 --comparar base.json
+"""
+
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from core.laberinto import Laberinto
+from core.algoritmos.busqueda import elegir_algoritmo, EstadisticasBusqueda
+
+TAMANOS = [10, 50, 100, 500, 1000, 2000]
+DENSIDADES = [0.1, 0.2, 0.3, 0.4]
+ALGORITMOS = ["BFS", "DFS", "A*", "IDS"]
+
+CAMPOS = ["algoritmo", "tamano", "densidad", "semilla", "exito", "tiempo",
+          "nodos_generados", "memoria_pico", "longitud_camino",
+          "expansiones", "generaciones", "extracciones", "pico_frontera", "memoria_estimada"]
+
+# Campos enteros de EstadisticasBusqueda que se copian en cada resultado
+CAMPOS_ESTADISTICAS = ["expansiones", "generaciones", "extracciones", "pico_frontera"]
+
+# Métricas que se comparan contra la línea base (las que deben bajar o mantenerse)
+METRICAS_COMPARADAS = ["tiempo", "nodos_generados", "memoria_pico", "expansiones"]
+
+# Por debajo de este tiempo (segundos) el ruido de medición domina y no se marcan regresiones
+TIEMPO_MINIMO_COMPARADO = 0.005
+
+
+def construir_laberinto(tamano, densidad, semilla):
+    """Crea un laberinto cuadrado reproducible para la semilla dada."""
+    random.seed(semilla)
+    laberinto = Laberinto(tamano, tamano, densidad)
+    laberinto.mostrar_mensajes = False
+    return laberinto
+
+
+def medir_algoritmo(laberinto, algoritmo, repeticiones=3, compacto=False):
+    """Mide un algoritmo sobre el laberinto desde el inicio hasta la meta."""
+    # Las corridas cronometradas se hacen sin tracemalloc, que distorsiona los tiempos
+    tiempos = []
+    for _ in range(repeticiones):
+        estadisticas = EstadisticasBusqueda()
+        inicio = time.perf_counter()
+        camino, nodos_generados, _ = elegir_algoritmo(
+            laberinto, laberinto.inicio, laberinto.meta, algoritmo, compacto=compacto,
+            estadisticas=estadisticas
+        )
+        tiempos.append(time.perf_counter() - inicio)
+
+    # Corrida adicional solo para medir la memoria pico
+    tracemalloc.start()
+    elegir_algoritmo(laberinto, laberinto.inicio, laberinto.meta, algoritmo, compacto=compacto)
+    _, memoria_pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    resultado = {
+        "exito": camino is not None,
+        "tiempo": min(tiempos),
+        "nodos_generados": len(nodos_generados),
+        "memoria_pico": memoria_pico,
+        "longitud_camino": len(camino) if camino else 0,
+        "memoria_estimada": estadisticas.memoria_pico,
+    }
+    for campo in CAMPOS_ESTADISTICAS:
+        resultado[campo] = getattr(estadisticas, campo)
+    return resultado
+
+
+def ejecutar_benchmark(tamanos=TAMANOS, densidades=DENSIDADES, algoritmos=ALGORITMOS,
+                       semillas=(0,), repeticiones=3, compacto=False, progreso=None):
+    """Recorre la rejilla de parámetros y devuelve la lista de resultados."""
+    resultados = []
+    for tamano in tamanos:
+        for densidad in densidades:
+            for semilla in semillas:
+                laberinto = construir_laberinto(tamano, densidad, semilla)
+                for algoritmo in algoritmos:
+                    resultado = {"algoritmo": algoritmo, "tamano": tamano,
+                                 "densidad": densidad, "semilla": semilla}
+                    resultado.update(medir_algoritmo(laberinto, algoritmo, repeticiones, compacto))
+                    resultados.append(resultado)
+                    if progreso is not None:
+                        progreso(resultado)
+    return resultados
+
+
+def guardar_resultados(resultados, ruta):
+    """Guarda los resultados en JSON o CSV según la extensión del archivo."""
+    if ruta.endswith(".csv"):
+        with open(ruta, "w", newline="") as archivo:
+            escritor = csv.DictWriter(archivo, fieldnames=CAMPOS)
+            escritor.writeheader()
+            escritor.writerows(resultados)
+    else:
+        with open(ruta, "w") as archivo:
+            json.dump(resultados, archivo, indent=2)
+
+
+def cargar_resultados(ruta):
+    """Carga resultados guardados con guardar_resultados."""
+    if ruta.endswith(".csv"):
+        with open(ruta, newline="") as archivo:
+            resultados = []
+            for fila in csv.DictReader(archivo):
+                fila["tamano"] = int(fila["tamano"])
+                fila["densidad"] = float(fila["densidad"])
+                fila["semilla"] = int(fila["semilla"])
+                fila["exito"] = fila["exito"] == "True"
+                fila["tiempo"] = float(fila["tiempo"])
+                for campo in ["nodos_generados", "memoria_pico", "longitud_camino",
+                              "memoria_estimada"] + CAMPOS_ESTADISTICAS:
+                    if fila.get(campo):  # Las líneas base antiguas no tienen estadísticas
+                        fila[campo] = int(fila[campo])
+                resultados.append(fila)
+            return resultados
+    with open(ruta) as archivo:
+        return json.load(archivo)
+
+
+def _clave(resultado):
+    return (resultado["algoritmo"], resultado["tamano"], resultado["densidad"], resultado["semilla"])
+
+
+def comparar_con_base(resultados, base, tolerancia=0.10):
+    """Compara contra una línea base y devuelve la lista de regresiones encontradas.
+
+    Una regresión es una métrica que empeora más que la tolerancia relativa, o un
+    cambio en el éxito o la longitud del camino (que deberían ser deterministas).
+    """
+    indice_base = {_clave(resultado): resultado for resultado in base}
+    regresiones = []
+    for resultado in resultados:
+        anterior = indice_base.get(_clave(resultado))
+        if anterior is None:
+            continue
+        for metrica in METRICAS_COMPARADAS:
+            if anterior.get(metrica) in (None, ""):
+                continue  # Línea base anterior a esta métrica
+            valor_base = anterior[metrica]
+            valor = resultado[metrica]
+            razon = valor / valor_base if valor_base else (1.0 if not valor else float("inf"))
+            resultado[f"{metrica}_vs_base"] = razon
+            if metrica == "tiempo" and max(valor, valor_base) < TIEMPO_MINIMO_COMPARADO:
+                continue
+            if razon > 1 + tolerancia:
+                regresiones.append((_clave(resultado), metrica, valor_base, valor))
+        for metrica in ("exito", "longitud_camino"):
+            if resultado[metrica] != anterior[metrica]:
+                regresiones.append((_clave(resultado), metrica, anterior[metrica], resultado[metrica]))
+    return regresiones
+
+
+def _lista(tipo):
+    return lambda texto: [tipo(valor) for valor in texto.split(",") if valor]
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m core.benchmark",
+        description="Compara BFS, DFS, A* e IDS en laberintos de distintos tamaños y densidades.")
+    parser.add_argument("--tamanos", type=_lista(int), default=TAMANOS)
+    parser.add_argument("--densidades", type=_lista(float), default=DENSIDADES)
+    parser.add_argument("--algoritmos", type=_lista(str), default=ALGORITMOS)
+    parser.add_argument("--semillas", type=_lista(int), default=[0])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--compacto", action="store_true",
+                        help="Usa las búsquedas con arreglo de padres")
+    parser.add_argument("--salida", default=None, help="Archivo .json o .csv de resultados")
+    parser.add_argument("--comparar", default=None, help="Archivo de línea base a comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.10,
+                        help="Empeoramiento relativo permitido antes de marcar regresión")
+    return parser
+
+
+def _imprimir(resultado):
+    print(f"{resultado['algoritmo']:>5} tamaño={resultado['tamano']:<5} "
+          f"densidad={resultado['densidad']:<4} semilla={resultado['semilla']:<3} "
+          f"éxito={str(resultado['exito']):<5} tiempo={resultado['tiempo'] * 1000:9.2f} ms "
+          f"nodos={resultado['nodos_generados']:<8} memoria={resultado['memoria_pico'] / 1024:9.1f} KiB "
+          f"camino={resultado['longitud_camino']} expansiones={resultado['expansiones']} "
+          f"frontera={resultado['pico_frontera']} "
+          f"estimada={resultado['memoria_estimada'] / 1024:.1f} KiB", flush=True)
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    resultados = ejecutar_benchmark(args.tamanos, args.densidades, args.algoritmos,
+                                    args.semillas, args.repeticiones, args.compacto,
+                                    progreso=_imprimir)
+    if args.salida:
+        guardar_resultados(resultados, args.salida)
+
+    if args.comparar:
+        regresiones = comparar_con_base(resultados, cargar_resultados(args.comparar), args.tolerancia)
+        for clave, metrica, anterior, actual in regresiones:
+            print(f"REGRESIÓN {clave}: {metrica} {anterior} -> {actual}")
+        if regresiones:
+            sys.exit(1)
+        print("Sin regresiones respecto a la línea base")
+
+
+if __name__ == "__main__":
+    main()
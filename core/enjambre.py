@@ -0,0 +1,165 @@
+"""
+Simulación de enjambres
+=======================
+
+Muchos agentes (cientos o miles) persiguen la misma meta en un laberinto
+dinámico compartido. Las posiciones viven en arreglos NumPy y todos avanzan a
+la vez en un paso vectorizado por tic, leyendo un único campo de distancias a
+la meta. Solo se crea un objeto Agente para el agente que se inspecciona.
+
+Uso:
+    python -m core.enjambre --filas 200 --columnas 200 --densidad 0.3 \\
+        --agentes 1000 --dinamico paredes --semilla 1
+"""
+
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+from core.laberinto import Laberinto
+from core.agente import Agente
+from core.algoritmos.busqueda import CampoDistancias
+from core.simular import PERIODO_DINAMICO
+
+MODOS_DINAMICOS_ENJAMBRE = ["no", "paredes"]
+
+CAMPOS_METRICAS = ["semilla", "filas", "columnas", "densidad", "dinamico", "agentes",
+                   "tics", "llegados", "pasos_agente", "tiempo", "pasos_por_segundo"]
+
+
+class Enjambre:
+    """Agentes de un mismo laberinto guardados como arreglos de ids de celda."""
+
+    def __init__(self, laberinto, n_agentes, campo=None):
+        self.laberinto = laberinto
+        self.campo = campo if campo is not None else CampoDistancias()
+        # Inicios al azar entre las celdas libres (pueden repetirse), sin empezar en la meta
+        libres = np.flatnonzero(laberinto.matriz.ravel() == 0)
+        libres = libres[libres != laberinto.id_celda(laberinto.meta)]
+        self.posiciones = laberinto.rng.choice(libres, n_agentes)
+        self.llegados = np.zeros(n_agentes, dtype=bool)
+        self.pasos = np.zeros(n_agentes, dtype=np.int64)
+        self.desplazamientos = np.array(laberinto.desplazamientos)
+        self.tics = 0
+
+    def __len__(self):
+        return self.posiciones.size
+
+    def paso(self):
+        """Avanza un paso a todos los agentes activos. Devuelve cuántos se movieron."""
+        self.campo.sincronizar(self.laberinto)
+        distancias = np.frombuffer(self.campo.distancias, dtype=np.int32)
+        vecinos = self.posiciones[:, None] + self.desplazamientos
+        distancias_vecinos = distancias[vecinos]
+        # El primer vecino de menor distancia, como CampoDistancias.siguiente
+        eleccion = distancias_vecinos.argmin(axis=1)
+        indices = np.arange(self.posiciones.size)
+        mejor = distancias_vecinos[indices, eleccion]
+        # Se mueve quien no llegó y tiene un vecino más cerca de la meta (también si
+        # su celda se volvió pared y su distancia es inalcanzable)
+        mueven = ~self.llegados & (mejor < distancias[self.posiciones])
+        self.posiciones = np.where(mueven, vecinos[indices, eleccion], self.posiciones)
+        self.pasos += mueven
+        self.llegados |= distancias[self.posiciones] == 0
+        self.tics += 1
+        return int(mueven.sum())
+
+    def posicion(self, indice):
+        return self.laberinto.posicion_celda(int(self.posiciones[indice]))
+
+    def inspeccionar(self, indice):
+        """Crea un Agente con el estado del agente indicado, para mostrarlo o seguirlo."""
+        agente = Agente(self.posicion(indice), visualizar_arbol=False)
+        agente.cambiar_algoritmo("Campo de distancias")
+        agente.campo_distancias = self.campo
+        agente.estado = "Meta encontrada" if self.llegados[indice] else "Siguiendo camino"
+        agente.camino_optimo = self.campo.camino(agente.posicion) or []
+        agente.en_camino_optimo = frozenset(agente.camino_optimo)
+        return agente
+
+    def aplicar_cambios_dinamicos(self, modo_dinamico, contador):
+        """Cambia paredes y meta como en la simulación de un agente. Devuelve el nuevo contador."""
+        if modo_dinamico == "paredes":
+            contador -= 1
+            if contador <= 0:
+                self.laberinto.cambiar_paredes_aleatorias(8)
+                activos = np.flatnonzero(~self.llegados)
+                if activos.size:
+                    # La nueva meta queda al alcance de al menos un agente activo
+                    self.laberinto.randomizar_meta(self.posicion(activos[0]))
+                contador = PERIODO_DINAMICO
+        return contador
+
+
+def ejecutar_enjambre(filas=50, columnas=50, densidad=0.3, agentes=1000, semilla=None,
+                      modo_dinamico="no", max_tics=None):
+    """Ejecuta un enjambre hasta que todos llegan o se agotan los tics y devuelve sus métricas."""
+    if semilla is not None:
+        random.seed(semilla)
+    laberinto = Laberinto(filas, columnas, densidad)
+    laberinto.mostrar_mensajes = False
+    enjambre = Enjambre(laberinto, agentes)
+    if max_tics is None:
+        # Con la meta en movimiento no todos llegan nunca: se limita a unas pocas travesías
+        max_tics = 4 * (filas + columnas)
+
+    contador = PERIODO_DINAMICO
+    pasos_agente = 0
+    inicio = time.perf_counter()
+    while enjambre.tics < max_tics and not enjambre.llegados.all():
+        movidos = enjambre.paso()
+        pasos_agente += movidos
+        if movidos == 0 and modo_dinamico == "no":
+            break  # Nadie puede avanzar y el laberinto no va a cambiar
+        contador = enjambre.aplicar_cambios_dinamicos(modo_dinamico, contador)
+    tiempo = time.perf_counter() - inicio
+
+    return {
+        "semilla": semilla,
+        "filas": filas,
+        "columnas": columnas,
+        "densidad": densidad,
+        "dinamico": modo_dinamico,
+        "agentes": agentes,
+        "tics": enjambre.tics,
+        "llegados": int(enjambre.llegados.sum()),
+        "pasos_agente": pasos_agente,
+        "tiempo": tiempo,
+        "pasos_por_segundo": pasos_agente / tiempo if tiempo > 0 else 0.0,
+    }
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m core.enjambre",
+        description="Simula muchos agentes en un mismo laberinto con pasos vectorizados.")
+    parser.add_argument("--filas", type=int, default=50)
+    parser.add_argument("--columnas", type=int, default=50)
+    parser.add_argument("--densidad", type=float, default=0.3, help="Proporción de paredes")
+    parser.add_argument("--agentes", type=int, default=1000)
+    parser.add_argument("--dinamico", default="no", choices=MODOS_DINAMICOS_ENJAMBRE)
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--max-tics", type=int, default=None)
+    parser.add_argument("--formato", default="csv", choices=["csv", "json"])
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    metricas = ejecutar_enjambre(args.filas, args.columnas, args.densidad, args.agentes,
+                                 args.semilla, args.dinamico, args.max_tics)
+    if args.formato == "csv":
+        escritor = csv.DictWriter(sys.stdout, fieldnames=CAMPOS_METRICAS)
+        escritor.writeheader()
+        escritor.writerow(metricas)
+    else:
+        print(json.dumps(metricas))
+
+
+if __name__ == "__main__":
+    main()
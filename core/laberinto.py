@@ -1,13 +1,166 @@
 import random
-from collections import deque # Importa deque para implementar colas eficientes, usado en asegurar_camino (BFS)
+import struct
+import weakref
+from array import array
+from collections import deque # Importa deque para implementar colas eficientes, usado en reparar_camino (BFS 0-1)
+
+import numpy as np
+
+from core.medicion import Medidor
+
+# Formato compacto de serialización: cabecera + un bit por celda del almacenamiento plano
+MAGIA_SERIALIZACION = b"LAB1"
+FORMATO_CABECERA = "<4sIIIIIId" # magia, filas, columnas, inicio (f, c), meta (f, c), densidad
+_BYTES_A_BITS = bytes.maketrans(b"\x00\x01", b"01")
+_BITS_A_BYTES = bytes.maketrans(b"01", b"\x00\x01")
+
+# Claves Zobrist por tamaño de almacenamiento, compartidas por todos los laberintos
+_CLAVES_ZOBRIST = {}
+
+# Largo del registro de cambios a partir del cual se recorta lo que ya leyeron todos
+LIMITE_CAMBIOS = 1024
+
+
+def empaquetar_bits(celdas):
+    """Empaqueta un arreglo de 0/1 en bytes (8 celdas por byte)."""
+    return int(celdas.translate(_BYTES_A_BITS), 2).to_bytes((len(celdas) + 7) // 8, "big")
+
+
+def desempaquetar_bits(datos, n):
+    """Inverso de empaquetar_bits: devuelve un bytearray de n celdas con valores 0/1."""
+    texto = format(int.from_bytes(datos, "big"), f"0{n}b").encode()
+    return bytearray(texto.translate(_BITS_A_BYTES))
+
+
+def claves_zobrist(n):
+    """Clave aleatoria de 64 bits por celda, fija para cada tamaño de almacenamiento."""
+    claves = _CLAVES_ZOBRIST.get(n)
+    if claves is None:
+        generador = np.random.default_rng(n)
+        claves = array('Q', generador.integers(0, 2**64, size=n, dtype=np.uint64).tobytes())
+        _CLAVES_ZOBRIST[n] = claves
+    return claves
+
+
+class VistaGrid:
+    """Vista de compatibilidad de solo lectura para seguir leyendo grid[f][c].
+
+    Cada fila es un memoryview de solo lectura sobre el almacenamiento plano del
+    laberinto. Las escrituras deben pasar por quitar_pared/poner_pared, que
+    registran el cambio para la versión, la huella y los planificadores
+    incrementales; escribir en una fila lanza TypeError.
+    """
+
+    def __init__(self, laberinto):
+        self.laberinto = laberinto
+
+    def __len__(self):
+        return self.laberinto.filas
+
+    def __getitem__(self, fila):
+        if fila < 0:
+            fila += self.laberinto.filas
+        if not 0 <= fila < self.laberinto.filas:
+            raise IndexError("fila fuera del laberinto")
+        inicio = self.laberinto.id_celda((fila, 0))
+        return memoryview(self.laberinto.celdas)[inicio:inicio + self.laberinto.columnas].toreadonly()
+
+    def __iter__(self):
+        for fila in range(self.laberinto.filas):
+            yield self[fila]
+
+
+class ConjuntosDisjuntos:
+    """Union-find sobre los identificadores de celda (unión por tamaño y compresión a la mitad)."""
+
+    def __init__(self, n):
+        self.padres = array('i', range(n))
+        self.tamanos = array('i', [1]) * n
+
+    @classmethod
+    def desde_arreglos(cls, padres, tamanos):
+        """Construye la estructura a partir de arreglos NumPy de padres y tamaños."""
+        conjuntos = cls(0)
+        conjuntos.padres.frombytes(padres.astype(np.int32).tobytes())
+        conjuntos.tamanos.frombytes(tamanos.astype(np.int32).tobytes())
+        return conjuntos
+
+    def buscar(self, x):
+        padres = self.padres
+        while padres[x] != x:
+            padres[x] = padres[padres[x]]
+            x = padres[x]
+        return x
+
+    def unir(self, a, b):
+        raiz_a, raiz_b = self.buscar(a), self.buscar(b)
+        if raiz_a == raiz_b:
+            return
+        if self.tamanos[raiz_a] < self.tamanos[raiz_b]:
+            raiz_a, raiz_b = raiz_b, raiz_a
+        self.padres[raiz_b] = raiz_a
+        self.tamanos[raiz_a] += self.tamanos[raiz_b]
+
+
+class IndiceCeldas:
+    """Celdas interiores libres y paredes en dos arreglos con borrado por intercambio.
+
+    lugares[id] es la posición de la celda dentro de su arreglo (-1 fuera del
+    interior), de modo que cambiar una celda de arreglo y elegir una al azar son O(1).
+    """
+
+    def __init__(self, laberinto):
+        ids = np.arange(len(laberinto.celdas), dtype=np.int32).reshape(laberinto.matriz.shape)
+        ids = ids[2:laberinto.filas, 2:laberinto.columnas].ravel()
+        es_pared = laberinto.interior().ravel().astype(bool)
+        libres, paredes = ids[~es_pared], ids[es_pared]
+        lugares = np.full(len(laberinto.celdas), -1, dtype=np.int32)
+        lugares[libres] = np.arange(libres.size)
+        lugares[paredes] = np.arange(paredes.size)
+        self.libres = array('i', libres.tobytes())
+        self.paredes = array('i', paredes.tobytes())
+        self.lugares = array('i', lugares.tobytes())
+
+    def _mover(self, id_celda, origen, destino):
+        lugar = self.lugares[id_celda]
+        if lugar < 0:
+            return # Celda del contorno: no forma parte del índice
+        ultimo = origen.pop()
+        if ultimo != id_celda:
+            origen[lugar] = ultimo
+            self.lugares[ultimo] = lugar
+        self.lugares[id_celda] = len(destino)
+        destino.append(id_celda)
+
+    def abrir(self, id_celda):
+        self._mover(id_celda, self.paredes, self.libres)
+
+    def cerrar(self, id_celda):
+        self._mover(id_celda, self.libres, self.paredes)
+
 
 class Laberinto:
-    def __init__(self, filas, columnas, densidad_paredes=0.3):
+    def __init__(self, filas, columnas, densidad_paredes=0.3, generar=True, semilla=None):
         self.filas = filas
         self.columnas = columnas
-        # Representa el laberinto como una matriz 2D (0: camino, 1: pared)
-        self.grid = [[0 for _ in range(columnas)] for _ in range(filas)]
+        # Almacenamiento plano (0: camino, 1: pared) con un borde extra de paredes,
+        # de modo que los vecinos de cualquier celda existen sin comprobar límites.
+        # La celda (f, c) tiene el identificador (f + 1) * ancho + (c + 1).
+        self.ancho = columnas + 2
+        self.celdas = bytearray(b"\x01") * ((filas + 2) * self.ancho)
+        # Vista NumPy (filas + 2, ancho) que comparte memoria con celdas
+        self.matriz = np.frombuffer(self.celdas, dtype=np.uint8).reshape(filas + 2, self.ancho)
+        # Desplazamientos de los vecinos: izquierda, abajo, derecha, arriba
+        self.desplazamientos = (-1, self.ancho, 1, -self.ancho)
+        # Desplazamientos de las 8 celdas circundantes (incluye diagonales)
+        self.desplazamientos_8 = self.desplazamientos + (
+            -self.ancho - 1, -self.ancho + 1, self.ancho - 1, self.ancho + 1
+        )
+        self._vista = VistaGrid(self)
         self.densidad_paredes = densidad_paredes # Proporción de paredes a generar
+        # Generador para la creación y los cambios del laberinto. Sin semilla explícita se
+        # deriva del módulo random, de modo que random.seed() sigue haciéndolo reproducible.
+        self.rng = np.random.default_rng(semilla if semilla is not None else random.getrandbits(64))
 
         # Posición inicial fija y meta inicial
         self.inicio = (1, 1)
@@ -17,92 +170,407 @@ class Laberinto:
         self.modo_dinamico_algoritmos = False
         # Contador para la frecuencia de cambios dinámicos
         self.contador_dinamico = 5
+        # Permite silenciar los mensajes de consola (p. ej. en simulaciones por lotes)
+        self.mostrar_mensajes = True
+
+        # Registro de celdas alteradas para los planificadores incrementales
+        self.generacion = 0 # Aumenta cada vez que se genera un laberinto nuevo
+        self.cambios = [] # Celdas (fila, col) que cambiaron desde version_cambios
+        self.version = 0 # Aumenta con cada celda modificada y con cada laberinto nuevo
+        self.version_cambios = 0 # Versión a partir de la cual cambios registra las celdas
+        # Quienes siguen los cambios (planificadores, agente, interfaz) -> versión hasta la que leyeron
+        self.lectores = weakref.WeakKeyDictionary()
+        self.limite_cambios = LIMITE_CAMBIOS
+        self.huella_zobrist = None # Hash del contenido (ver huella); None si hay que calcularlo
+        # Componentes conexas de las celdas libres; None si hay que recalcularlas
+        self.conectividad = None
+        # Índice de celdas libres y paredes para elegir al azar en O(1); None si hay que rehacerlo
+        self.indice_celdas = None
+        # Tiempos por fase (generación, cambios, conectividad); desactivado no cuesta casi nada
+        self.medidor = Medidor()
 
         # Genera la estructura inicial del laberinto
-        self.generar_laberinto()
+        if generar:
+            self.generar_laberinto()
+
+    @property
+    def grid(self):
+        """Vista grid[f][c] sobre el almacenamiento plano."""
+        return self._vista
+
+    @grid.setter
+    def grid(self, matriz):
+        # Permite asignar una matriz de listas completa (compatibilidad)
+        for i, fila in enumerate(matriz):
+            inicio = self.id_celda((i, 0))
+            self.celdas[inicio:inicio + self.columnas] = bytes(fila)
+        self.reiniciar_registro()
+
+    def serializar(self):
+        """Devuelve el laberinto en forma compacta (bytes), apta para enviar entre procesos."""
+        cabecera = struct.pack(FORMATO_CABECERA, MAGIA_SERIALIZACION, self.filas, self.columnas,
+                               *self.inicio, *self.meta, self.densidad_paredes)
+        return cabecera + empaquetar_bits(self.celdas)
+
+    @classmethod
+    def deserializar(cls, datos, semilla=None):
+        """Reconstruye un laberinto a partir de la salida de serializar().
+
+        semilla inicializa el generador de los cambios dinámicos, como en el constructor.
+        """
+        tamano_cabecera = struct.calcsize(FORMATO_CABECERA)
+        magia, filas, columnas, fila_inicio, col_inicio, fila_meta, col_meta, densidad = \
+            struct.unpack(FORMATO_CABECERA, datos[:tamano_cabecera])
+        if magia != MAGIA_SERIALIZACION:
+            raise ValueError("Los datos no corresponden a un laberinto serializado")
+        laberinto = cls(filas, columnas, densidad, generar=False, semilla=semilla)
+        laberinto.inicio = (fila_inicio, col_inicio)
+        laberinto.meta = (fila_meta, col_meta)
+        laberinto.celdas[:] = desempaquetar_bits(datos[tamano_cabecera:], len(laberinto.celdas))
+        laberinto.reiniciar_registro()
+        return laberinto
+
+    def informar(self, mensaje):
+        """Imprime un mensaje informativo si los mensajes están activados."""
+        if self.mostrar_mensajes:
+            print(mensaje)
+
+    def id_celda(self, posicion):
+        """Convierte una posición (fila, col) en el identificador entero de la celda."""
+        return (posicion[0] + 1) * self.ancho + posicion[1] + 1
+
+    def posicion_celda(self, id_celda):
+        """Convierte un identificador de celda en su posición (fila, col)."""
+        fila, col = divmod(id_celda, self.ancho)
+        return (fila - 1, col - 1)
+
+    def es_libre(self, posicion):
+        """Indica si la posición está dentro del laberinto y es camino."""
+        fila, col = posicion
+        return (0 <= fila < self.filas and 0 <= col < self.columnas and
+                self.celdas[(fila + 1) * self.ancho + col + 1] == 0)
 
     def generar_laberinto(self):
         """Genera un laberinto aleatorio asegurando que haya un camino desde inicio a meta."""
-        # Reinicia el grid
-        self.grid = [[0 for _ in range(self.columnas)] for _ in range(self.filas)]
-
-        # Crea los bordes exteriores como paredes
-        for i in range(self.filas):
-            self.grid[i][0] = 1
-            self.grid[i][self.columnas-1] = 1
-        for j in range(self.columnas):
-            self.grid[0][j] = 1
-            self.grid[self.filas-1][j] = 1
-
-        # Añade paredes internas aleatoriamente según la densidad
-        for i in range(1, self.filas-1):
-            for j in range(1, self.columnas-1):
-                # No colocar paredes en el inicio ni en la meta
-                if (i, j) != self.inicio and (i, j) != self.meta:
-                    if random.random() < self.densidad_paredes:
-                        self.grid[i][j] = 1
+        inicio = self.medidor.inicio()
+        # Reinicia el grid: todo pared (incluye los bordes exteriores)
+        self.matriz[:] = 1
+        self.reiniciar_registro()
+
+        # Paredes internas según la densidad, con un único sorteo vectorizado
+        interior = self.interior()
+        interior[:] = self.rng.random(interior.shape) < self.densidad_paredes
+        # No colocar paredes en el inicio ni en la meta
+        for fila, col in (self.inicio, self.meta):
+            if 1 <= fila < self.filas - 1 and 1 <= col < self.columnas - 1:
+                self.celdas[self.id_celda((fila, col))] = 0
 
         # Verifica y garantiza que exista al menos un camino a la meta
         self.asegurar_camino()
+        self.medidor.fin("generacion", inicio)
+
+    def reiniciar_registro(self):
+        """Marca el contenido como un laberinto nuevo para quienes siguen sus cambios."""
+        self.generacion += 1
+        self.version += 1
+        self.version_cambios = self.version
+        self.cambios = []
+        self.limite_cambios = LIMITE_CAMBIOS
+        self.conectividad = None
+        self.indice_celdas = None
+        self.huella_zobrist = None
+
+    def registrar_cambio(self, posicion):
+        """Anota una celda modificada (ya cambiada), avanza la versión y actualiza la huella."""
+        self.cambios.append(posicion)
+        self.version += 1
+        if self.huella_zobrist is not None:
+            self.huella_zobrist ^= claves_zobrist(len(self.celdas))[self.id_celda(posicion)]
+        if len(self.cambios) > self.limite_cambios:
+            self.recortar_cambios()
+
+    def registrar_lector(self, lector, version=None):
+        """Anota hasta qué versión leyó lector los cambios (por defecto, la actual).
+
+        cambios no se recorta por delante de la versión de ningún lector
+        registrado. Quien use cambios_desde sin registrarse puede recibir None
+        aunque no se haya generado un laberinto nuevo.
+        """
+        self.lectores[lector] = self.version if version is None else version
+
+    def recortar_cambios(self):
+        """Descarta del registro los cambios que ya leyeron todos los lectores."""
+        # Los lectores de una generación anterior ya no pueden usar el registro
+        minimo = min((version for version in self.lectores.values() if version >= self.version_cambios),
+                     default=self.version)
+        corte = minimo - self.version_cambios
+        if len(self.cambios) - corte > len(self.celdas):
+            # Un lector tan atrasado repetiría más cambios que celdas hay: le sale más
+            # barato reconstruir, así que recibirá None de cambios_desde
+            corte = len(self.cambios)
+        if corte > 0:
+            del self.cambios[:corte]
+            self.version_cambios += corte
+        self.limite_cambios = max(LIMITE_CAMBIOS, 2 * len(self.cambios))
+
+    def huella(self):
+        """Hash Zobrist de las paredes: XOR de la clave de cada celda que es pared.
+
+        A diferencia de version, dos laberintos con el mismo contenido tienen la misma
+        huella. Se calcula una vez y luego cada cambio la actualiza en O(1).
+        """
+        if self.huella_zobrist is None:
+            claves = np.frombuffer(claves_zobrist(len(self.celdas)), dtype=np.uint64)
+            self.huella_zobrist = int(np.bitwise_xor.reduce(claves[self.matriz.ravel() == 1]))
+        return self.huella_zobrist
+
+    def cambios_desde(self, version):
+        """Celdas modificadas desde la versión dada (puede haber repetidas).
+
+        Devuelve None si desde entonces se generó un laberinto nuevo o si esos
+        cambios ya se recortaron del registro (ver registrar_lector).
+        """
+        if version < self.version_cambios:
+            return None
+        return self.cambios[version - self.version_cambios:]
+
+    def interior(self):
+        """Vista de las celdas modificables: filas 1..filas-2 y columnas 1..columnas-2."""
+        return self.matriz[2:self.filas, 2:self.columnas]
+
+    def elegir_celda(self, candidatas):
+        """Elige al azar un True de la máscara (filas + 2, ancho) y devuelve su posición."""
+        ids = np.flatnonzero(candidatas)
+        if not ids.size:
+            return None
+        return self.posicion_celda(int(ids[self.rng.integers(ids.size)]))
+
+    def excluir(self, mascara, *posiciones):
+        """Marca como no elegibles las posiciones dadas en una máscara (filas + 2, ancho)."""
+        for fila, col in posiciones:
+            mascara[fila + 1, col + 1] = False
+        return mascara
+
+    def indice(self):
+        """Devuelve el índice de celdas libres y paredes, construyéndolo si hace falta."""
+        if self.indice_celdas is None:
+            self.indice_celdas = IndiceCeldas(self)
+        return self.indice_celdas
+
+    def elegir_libre(self, excluidas=(), origen=None, distancia_minima=None, intentos=32):
+        """Elige al azar una celda libre interior que no esté en excluidas.
+
+        Con origen solo valen celdas conectadas con él (si es libre) y, además, con
+        distancia_minima, a distancia Manhattan mayor que esa. Primero prueba con
+        muestreo por rechazo sobre el índice (O(1) por intento); si no acierta,
+        filtra la máscara completa para que la elección siga siendo exacta.
+        Devuelve None si no hay ninguna celda válida.
+        """
+        libres = self.indice().libres
+        ids_excluidos = {self.id_celda(posicion) for posicion in excluidas}
+        raiz = None
+        if origen is not None and self.es_libre(origen):
+            conjuntos = self.conectividad or self.calcular_conectividad()
+            raiz = conjuntos.buscar(self.id_celda(origen))
+        for _ in range(intentos if libres else 0):
+            id_celda = libres[self.rng.integers(len(libres))]
+            if id_celda in ids_excluidos:
+                continue
+            if raiz is not None and conjuntos.buscar(id_celda) != raiz:
+                continue
+            if distancia_minima is not None:
+                fila, col = self.posicion_celda(id_celda)
+                if abs(fila - origen[0]) + abs(col - origen[1]) <= distancia_minima:
+                    continue
+            return self.posicion_celda(id_celda)
+
+        # Pocas candidatas: se recorre la máscara completa
+        candidatas = self.mascara_alcanzable(origen) if origen is not None else self.matriz == 0
+        self.excluir(candidatas, *excluidas)
+        if distancia_minima is not None:
+            filas, columnas = np.ogrid[-1:self.filas + 1, -1:self.columnas + 1]
+            candidatas &= np.abs(filas - origen[0]) + np.abs(columnas - origen[1]) > distancia_minima
+        return self.elegir_celda(candidatas)
 
     def asegurar_camino(self):
-        """Asegura que existe un camino desde inicio a meta utilizando BFS."""
-        # Usa Búsqueda en Amplitud (BFS) para verificar conectividad
-        visitados = set()
-        cola = deque([self.inicio])
-        visitados.add(self.inicio)
-
-        encontrado = False
-
-        while cola and not encontrado:
+        """Asegura que existe un camino desde inicio a meta.
+
+        Comprueba la conectividad con union-find y, si inicio y meta están en
+        componentes distintas, abre solo las paredes de un camino que atraviesa
+        el menor número de paredes (ver reparar_camino).
+        """
+        if not self.hay_camino(self.inicio, self.meta):
+            self.reparar_camino(self.inicio, self.meta)
+
+    def calcular_conectividad(self):
+        """Agrupa las celdas libres en componentes conexas, con operaciones vectorizadas.
+
+        Cada tramo horizontal de celdas libres es un nodo; los tramos que se tocan
+        verticalmente se enganchan a la menor etiqueta y se comprimen saltando punteros.
+        """
+        inicio = self.medidor.inicio()
+        ancho = self.ancho
+        libres = (self.matriz == 0).ravel()
+        comienzos = libres.copy()
+        comienzos[1:] &= ~libres[:-1]
+        tramos = np.cumsum(comienzos) - 1 # Tramo de cada celda (válido solo en las libres)
+        etiquetas = np.arange(int(comienzos.sum()))
+
+        verticales = np.flatnonzero(libres[:-ancho] & libres[ancho:])
+        arriba, abajo = tramos[verticales], tramos[verticales + ancho]
+        while arriba.size:
+            etiqueta_arriba, etiqueta_abajo = etiquetas[arriba], etiquetas[abajo]
+            distintas = etiqueta_arriba != etiqueta_abajo
+            if not distintas.any():
+                break
+            # Los pares ya unidos siguen unidos: solo se revisan los demás
+            arriba, abajo = arriba[distintas], abajo[distintas]
+            etiqueta_arriba, etiqueta_abajo = etiqueta_arriba[distintas], etiqueta_abajo[distintas]
+            np.minimum.at(etiquetas, np.maximum(etiqueta_arriba, etiqueta_abajo),
+                          np.minimum(etiqueta_arriba, etiqueta_abajo))
+            while True:
+                siguientes = etiquetas[etiquetas]
+                if np.array_equal(siguientes, etiquetas):
+                    break
+                etiquetas = siguientes
+
+        # Cada componente apunta a su primera celda, que hace de raíz
+        ids_libres = np.flatnonzero(libres)
+        componentes = etiquetas[tramos[ids_libres]]
+        unicas, primeras, cantidades = np.unique(componentes, return_index=True, return_counts=True)
+        raices = np.empty(etiquetas.size, dtype=np.int64)
+        raices[unicas] = ids_libres[primeras]
+        padres = np.arange(libres.size)
+        padres[ids_libres] = raices[componentes]
+        tamanos = np.ones(libres.size)
+        tamanos[ids_libres[primeras]] = cantidades
+        self.conectividad = ConjuntosDisjuntos.desde_arreglos(padres, tamanos)
+        self.medidor.fin("conectividad", inicio)
+        return self.conectividad
+
+    def hay_camino(self, origen, destino):
+        """Indica si se puede ir de origen a la celda libre destino.
+
+        Si origen es una pared (p. ej. la celda del agente tras un cambio) se sale
+        por sus vecinos libres, igual que en las búsquedas.
+        """
+        if not self.es_libre(destino):
+            return False
+        conjuntos = self.conectividad or self.calcular_conectividad()
+        raiz_destino = conjuntos.buscar(self.id_celda(destino))
+        id_origen = self.id_celda(origen)
+        if self.es_libre(origen):
+            return conjuntos.buscar(id_origen) == raiz_destino
+        fila, col = origen
+        if not (0 <= fila < self.filas and 0 <= col < self.columnas):
+            return False
+        return any(not self.celdas[id_origen + desplazamiento] and
+                   conjuntos.buscar(id_origen + desplazamiento) == raiz_destino
+                   for desplazamiento in self.desplazamientos)
+
+    def mascara_alcanzable(self, posicion):
+        """Máscara (filas + 2, ancho) de las celdas libres conectadas con la posición dada.
+
+        Si la posición es una pared no se filtra por componente (todas las celdas libres).
+        """
+        libres = self.matriz == 0
+        if not self.es_libre(posicion):
+            return libres
+        conjuntos = self.conectividad or self.calcular_conectividad()
+        # Raíz de cada celda saltando punteros: cada pasada duplica el salto
+        raices = np.frombuffer(conjuntos.padres, dtype=np.int32)
+        while True:
+            siguientes = raices[raices]
+            if np.array_equal(siguientes, raices):
+                break
+            raices = siguientes
+        raiz = raices[self.id_celda(posicion)]
+        return libres & (raices == raiz).reshape(self.matriz.shape)
+
+    def quitar_pared(self, posicion):
+        """Convierte una pared en camino, registra el cambio y actualiza la conectividad."""
+        id_celda = self.id_celda(posicion)
+        if not self.celdas[id_celda]:
+            return # Ya es camino
+        if self.indice_celdas is not None:
+            self.indice_celdas.abrir(id_celda)
+        self.celdas[id_celda] = 0
+        self.registrar_cambio(posicion)
+        if self.conectividad is not None:
+            for desplazamiento in self.desplazamientos:
+                if not self.celdas[id_celda + desplazamiento]:
+                    self.conectividad.unir(id_celda, id_celda + desplazamiento)
+
+    def poner_pared(self, posicion):
+        """Convierte un camino en pared y registra el cambio."""
+        id_celda = self.id_celda(posicion)
+        if self.celdas[id_celda]:
+            return # Ya es pared
+        if self.indice_celdas is not None:
+            self.indice_celdas.cerrar(id_celda)
+        self.celdas[id_celda] = 1
+        self.registrar_cambio(posicion)
+        self.conectividad = None # Union-find no admite separar componentes
+
+    def reparar_camino(self, origen, destino):
+        """Abre las paredes de un camino de origen a destino que cruce el menor número de paredes.
+
+        BFS 0-1: moverse a una celda libre cuesta 0 y a una pared interior cuesta 1.
+        Devuelve las posiciones de las paredes abiertas.
+        """
+        celdas = self.celdas
+        ancho = self.ancho
+        inicio = self.id_celda(origen)
+        meta = self.id_celda(destino)
+        costos = array('i', [len(celdas)]) * len(celdas)
+        padres = array('i', [-1]) * len(celdas)
+        costos[inicio] = celdas[inicio]
+        cola = deque([inicio])
+        while cola:
             actual = cola.popleft()
-            if actual == self.meta:
-                encontrado = True
+            if actual == meta:
                 break
-
-            # Explora vecinos (arriba, abajo, izquierda, derecha)
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nx, ny = actual[0] + dx, actual[1] + dy
-                # Verifica si el vecino es válido (dentro de límites, es camino, no visitado)
-                if (0 <= nx < self.filas and 0 <= ny < self.columnas and
-                    self.grid[nx][ny] == 0 and (nx, ny) not in visitados):
-                    visitados.add((nx, ny))
-                    cola.append((nx, ny))
-
-        # Si BFS no encontró la meta, el camino está bloqueado
-        if not encontrado:
-            # Elimina algunas paredes aleatoriamente para intentar abrir un camino
-            self.eliminar_paredes_aleatorias(20) # Intenta eliminar hasta 20 paredes
-            self.asegurar_camino() # Llama recursivamente para verificar de nuevo
+            for desplazamiento in self.desplazamientos:
+                vecino = actual + desplazamiento
+                pared = celdas[vecino]
+                if pared:
+                    # Solo se abren paredes interiores (el contorno se mantiene)
+                    fila, col = divmod(vecino, ancho)
+                    if not (2 <= fila <= self.filas - 1 and 2 <= col <= self.columnas - 1):
+                        continue
+                costo = costos[actual] + pared
+                if costo < costos[vecino]:
+                    costos[vecino] = costo
+                    padres[vecino] = actual
+                    if pared:
+                        cola.append(vecino)
+                    else:
+                        cola.appendleft(vecino)
+
+        abiertas = []
+        actual = meta
+        while actual != -1:
+            if celdas[actual]:
+                posicion = self.posicion_celda(actual)
+                self.quitar_pared(posicion)
+                abiertas.append(posicion)
+            actual = padres[actual]
+        return abiertas
 
     def eliminar_paredes_aleatorias(self, n):
         """Elimina n paredes aleatorias del interior del laberinto."""
-        paredes = []
-        # Recolecta todas las posiciones de paredes internas
-        for i in range(1, self.filas-1):
-            for j in range(1, self.columnas-1):
-                if self.grid[i][j] == 1:
-                    paredes.append((i, j))
-
-        # Elimina hasta n paredes o todas las que haya si son menos de n
-        n = min(n, len(paredes))
-        for _ in range(n):
-            if paredes:
-                i, j = random.choice(paredes)
-                paredes.remove((i, j)) # Evita elegir la misma pared dos veces
-                self.grid[i][j] = 0 # Convierte la pared en camino
+        paredes = self.indice().paredes
+        # Elimina hasta n paredes distintas o todas las que haya si son menos de n
+        lugares = self.rng.choice(len(paredes), min(n, len(paredes)), replace=False)
+        for id_celda in [paredes[lugar] for lugar in lugares]:
+            self.quitar_pared(self.posicion_celda(id_celda)) # Convierte la pared en camino
 
     def mover_meta(self):
         """Mueve la meta a una posición aleatoria válida (camino libre)."""
-        posiciones_validas = []
-        # Busca todas las celdas de camino que no sean el inicio ni adyacentes a él
-        for i in range(1, self.filas-1):
-            for j in range(1, self.columnas-1):
-                if self.grid[i][j] == 0 and (i, j) != self.inicio and (i, j) not in self.get_paredes_adyacentes(self.inicio):
-                    posiciones_validas.append((i, j))
-
-        if posiciones_validas:
-            self.meta = random.choice(posiciones_validas)
+        # Cualquier celda de camino que no sea el inicio
+        meta = self.elegir_libre((self.inicio,))
+        if meta is not None:
+            self.meta = meta
         # Si no hay posiciones válidas (raro), la meta no se mueve
 
     def get_paredes_adyacentes(self, posicion):
@@ -112,48 +580,47 @@ class Laberinto:
         for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
             nx, ny = fila + dx, col + dy
             # Verifica límites y si es pared
-            if 0 <= nx < self.filas and 0 <= ny < self.columnas and self.grid[nx][ny] == 1:
+            if 0 <= nx < self.filas and 0 <= ny < self.columnas and self.celdas[self.id_celda((nx, ny))] == 1:
                 adyacentes.append((nx, ny))
         return adyacentes
 
     def cambiar_paredes_aleatorias(self, n=3):
         """Cambia aleatoriamente n celdas (añade o elimina paredes)."""
+        inicio = self.medidor.inicio()
         for _ in range(n):
             # Decide aleatoriamente si añadir o eliminar una pared
-            if random.random() < 0.5:
-                # Intenta añadir una pared en una celda de camino válida
-                posiciones_validas = []
-                for i in range(1, self.filas-1):
-                    for j in range(1, self.columnas-1):
-                        # Solo en celdas de camino que no sean inicio ni meta
-                        if (self.grid[i][j] == 0 and (i, j) != self.inicio
-                            and (i, j) != self.meta):
-                            posiciones_validas.append((i, j))
-                if posiciones_validas:
-                    i, j = random.choice(posiciones_validas)
-                    self.grid[i][j] = 1 # Convierte camino en pared
+            if self.rng.random() < 0.5:
+                # Intenta añadir una pared en una celda de camino que no sea inicio ni meta
+                posicion = self.elegir_libre((self.inicio, self.meta))
+                if posicion is not None:
+                    self.poner_pared(posicion) # Convierte camino en pared
             else:
-                # Intenta eliminar una pared existente
-                paredes = []
-                for i in range(1, self.filas-1):
-                    for j in range(1, self.columnas-1):
-                        if self.grid[i][j] == 1:
-                            paredes.append((i, j))
+                # Intenta eliminar una pared interna existente
+                paredes = self.indice().paredes
                 if paredes:
-                    i, j = random.choice(paredes)
-                    self.grid[i][j] = 0 # Convierte pared en camino
+                    id_celda = paredes[self.rng.integers(len(paredes))]
+                    self.quitar_pared(self.posicion_celda(id_celda)) # Convierte pared en camino
 
         # Después de cambiar paredes, siempre asegura que el camino a la meta siga existiendo
         self.asegurar_camino()
+        self.medidor.fin("cambio_paredes", inicio)
+
+    def medir_tiempos(self, activo=True):
+        """Activa o desactiva la medición de tiempos por fase."""
+        self.medidor.activo = activo
+
+    def tiempos(self):
+        """Percentiles móviles (p50, p95, max en segundos) de cada fase medida."""
+        return self.medidor.resumen()
 
     def calcular_situacion(self, posicion):
         """Evalúa el entorno local del agente para determinar si está 'atrapado', en un 'espacio abierto' o en un 'laberinto complejo'."""
         # Cuenta cuántas celdas libres hay en las 8 direcciones adyacentes
+        celdas = self.celdas
+        id_posicion = self.id_celda(posicion)
         espacios_libres = 0
-        fila, col = posicion
-        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]:
-            nx, ny = fila + dx, col + dy
-            if 0 <= nx < self.filas and 0 <= ny < self.columnas and self.grid[nx][ny] == 0:
+        for desplazamiento in self.desplazamientos_8:
+            if not celdas[id_posicion + desplazamiento]:
                 espacios_libres += 1
 
         # Clasifica la situación basada en el número de espacios libres
@@ -166,30 +633,23 @@ class Laberinto:
 
     def randomizar_meta(self, posicion_agente_actual):
         """Elige una nueva posición aleatoria para la meta."""
-        posibles_metas = []
-        # Busca todas las celdas de camino válidas que no sean inicio, meta actual o posición del agente
-        for r in range(self.filas):
-            for c in range(self.columnas):
-                if self.grid[r][c] == 0 and \
-                   (r, c) != self.inicio and \
-                   (r, c) != self.meta and \
-                   (r, c) != posicion_agente_actual:
-                    posibles_metas.append((r, c))
-
-        if not posibles_metas:
+        # Celdas de camino alcanzables por el agente (para que la nueva meta tenga solución)
+        # que no sean inicio, meta actual ni la posición del agente
+        meta = self.elegir_libre((self.inicio, self.meta, posicion_agente_actual),
+                                 origen=posicion_agente_actual)
+        if meta is None:
             # Si no hay opciones, no cambia la meta
-            print("Advertencia: No se encontraron posiciones válidas para la nueva meta.")
+            self.informar("Advertencia: No se encontraron posiciones válidas para la nueva meta.")
             return
 
-        # Elige aleatoriamente una de las posiciones válidas
-        self.meta = random.choice(posibles_metas)
-        print(f"Laberinto: Meta actualizada a {self.meta}")
+        self.meta = meta
+        self.informar(f"Laberinto: Meta actualizada a {self.meta}")
 
     def sugerir_algoritmo(self, situacion_actual):
         """Sugiere un algoritmo basado en la situación local del agente."""
         if situacion_actual == "atrapado":
             # Si está atrapado, sugiere algoritmos de profundidad (DFS o IDS) para salir rápido
-            return random.choice(["DFS", "IDS"])
+            return ("DFS", "IDS")[self.rng.integers(2)]
         elif situacion_actual == "abierto":
             # En espacios abiertos, A* suele ser eficiente por su heurística
             return "A*"
@@ -236,14 +696,14 @@ class Laberinto:
         # Aumenta la probabilidad de cambiar la meta, especialmente si está atrapado
         debe_cambiar_meta = (
             situacion == "atrapado" or
-            random.random() < 0.5 # 50% de probabilidad en otros casos
+            self.rng.random() < 0.5 # 50% de probabilidad en otros casos
         )
 
         if debe_cambiar_meta:
             # Intenta colocar la meta en una posición que favorezca un cambio de algoritmo
             self.randomizar_meta_estrategica(posicion_agente)
             resultado['meta_cambiada'] = True
-            print("Meta randomizada estratégicamente para forzar cambio de algoritmo")
+            self.informar("Meta randomizada estratégicamente para forzar cambio de algoritmo")
 
         # Sugiere un algoritmo basado en la situación actual
         resultado['algoritmo_sugerido'] = self.sugerir_algoritmo(situacion)
@@ -252,35 +712,24 @@ class Laberinto:
 
     def randomizar_meta_estrategica(self, posicion_agente_actual):
         """Intenta colocar la meta en una posición que desafíe al algoritmo actual."""
-        posibles_metas = []
-        posiciones_distantes = [] # Guarda posiciones lejanas al agente
-
-        # Recorre todas las celdas válidas
-        for r in range(self.filas):
-            for c in range(self.columnas):
-                if self.grid[r][c] == 0 and \
-                   (r, c) != self.inicio and \
-                   (r, c) != self.meta and \
-                   (r, c) != posicion_agente_actual:
-                    posibles_metas.append((r, c))
-
-                    # Calcula la distancia Manhattan desde el agente
-                    dist_manhattan = abs(r - posicion_agente_actual[0]) + abs(c - posicion_agente_actual[1])
-
-                    # Marca como 'distante' si está a más de la mitad del tamaño del laberinto
-                    if dist_manhattan > (self.filas + self.columnas) / 2:
-                        posiciones_distantes.append((r, c))
-
-        if posibles_metas:
-            # Con alta probabilidad (70%), si hay posiciones distantes, elige una de ellas
+        # Celdas válidas alcanzables por el agente
+        excluidas = (self.inicio, self.meta, posicion_agente_actual)
+        meta = None
+        if self.rng.random() < 0.7:
+            # Con alta probabilidad (70%), si hay posiciones distantes (distancia Manhattan
+            # mayor que la mitad del tamaño), elige una de ellas.
             # Esto tiende a favorecer algoritmos con heurística como A*
-            if random.random() < 0.7 and posiciones_distantes:
-                self.meta = random.choice(posiciones_distantes)
-                print(f"Meta colocada lejos (distancia) en {self.meta}")
+            meta = self.elegir_libre(excluidas, posicion_agente_actual,
+                                     (self.filas + self.columnas) / 2)
+            if meta is not None:
+                self.meta = meta
+                self.informar(f"Meta colocada lejos (distancia) en {self.meta}")
+        if meta is None:
+            # Si no, elige cualquier posición válida aleatoriamente
+            meta = self.elegir_libre(excluidas, posicion_agente_actual)
+            if meta is not None:
+                self.meta = meta
+                self.informar(f"Meta colocada aleatoriamente en {self.meta}")
             else:
-                # Si no, elige cualquier posición válida aleatoriamente
-                self.meta = random.choice(posibles_metas)
-                print(f"Meta colocada aleatoriamente en {self.meta}")
-        else:
-            # Si no hay ninguna posición válida (muy raro), no cambia la meta
-            print("No se encontraron posiciones válidas para la nueva meta estratégica")
+                # Si no hay ninguna posición válida (muy raro), no cambia la meta
+                self.informar("No se encontraron posiciones válidas para la nueva meta estratégica")
@@ -0,0 +1,225 @@
+"""
+Ejecución de episodios por lotes en paralelo
+============================================
+
+Reparte episodios con semilla entre todos los núcleos para barrer espacios de
+parámetros (tamaños x densidades x algoritmos x semillas). Los resultados se
+escriben en un archivo JSON Lines a medida que llegan, de modo que un barrido
+interrumpido se reanuda saltando los episodios ya registrados.
+
+Uso:
+    python -m core.lotes --tamanos 20,50 --densidades 0.2,0.3 --algoritmos BFS,A* \\
+        --semillas 0-99 --dinamico paredes --salida barrido.jsonl
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from core.laberinto import Laberinto
+from core.simular import ejecutar_episodio, ejecutar_episodio_en, ejecutar_escenario, MODOS_DINAMICOS
+from core.trazas import Traza
+
+
+def clave_tarea(tarea):
+    """Identificador estable de un episodio, usado para reanudar barridos."""
+    if tarea.get("escenario") is not None:
+        return f"{tarea['nombre_escenario']}|{tarea['algoritmo']}"
+    return (f"{tarea['filas']}x{tarea['columnas']}|{tarea['densidad']}|{tarea['semilla']}|"
+            f"{tarea['algoritmo']}|{tarea['dinamico']}")
+
+
+def generar_tareas(tamanos, densidades, algoritmos, semillas, modos_dinamicos=("no",),
+                   max_pasos=None):
+    """Producto cartesiano de parámetros. Cada proceso construye su laberinto desde la semilla."""
+    tareas = []
+    for tamano in tamanos:
+        for densidad in densidades:
+            for semilla in semillas:
+                for algoritmo in algoritmos:
+                    for modo in modos_dinamicos:
+                        tareas.append({"filas": tamano, "columnas": tamano, "densidad": densidad,
+                                       "semilla": semilla, "algoritmo": algoritmo,
+                                       "dinamico": modo, "max_pasos": max_pasos,
+                                       "laberinto": None})
+    return tareas
+
+
+def tareas_desde_laberintos(laberintos, algoritmos, semillas=(0,), modos_dinamicos=("no",),
+                            max_pasos=None):
+    """Tareas sobre laberintos ya construidos; se envían serializados (un bit por celda)."""
+    tareas = []
+    for laberinto in laberintos:
+        datos = laberinto.serializar()
+        for semilla in semillas:
+            for algoritmo in algoritmos:
+                for modo in modos_dinamicos:
+                    tareas.append({"filas": laberinto.filas, "columnas": laberinto.columnas,
+                                   "densidad": laberinto.densidad_paredes, "semilla": semilla,
+                                   "algoritmo": algoritmo, "dinamico": modo,
+                                   "max_pasos": max_pasos, "laberinto": datos})
+    return tareas
+
+
+def tareas_desde_escenarios(rutas, algoritmos, max_pasos=None):
+    """Tareas que repiten cada traza grabada con todos los algoritmos (ver core.trazas)."""
+    tareas = []
+    for ruta in rutas:
+        with open(ruta, "rb") as archivo:
+            datos = archivo.read()
+        laberinto = Traza.desde_bytes(datos).crear_laberinto()
+        for algoritmo in algoritmos:
+            tareas.append({"filas": laberinto.filas, "columnas": laberinto.columnas,
+                           "densidad": laberinto.densidad_paredes, "semilla": None,
+                           "algoritmo": algoritmo, "dinamico": "escenario",
+                           "max_pasos": max_pasos, "laberinto": None,
+                           "escenario": datos, "nombre_escenario": os.path.basename(ruta)})
+    return tareas
+
+
+def ejecutar_tarea(tarea):
+    """Ejecuta un episodio en el proceso trabajador y devuelve sus métricas."""
+    try:
+        if tarea.get("escenario") is not None:
+            metricas = ejecutar_escenario(Traza.desde_bytes(tarea["escenario"]),
+                                          tarea["algoritmo"], tarea["max_pasos"])
+            metricas["escenario"] = tarea["nombre_escenario"]
+        elif tarea["laberinto"] is None:
+            metricas = ejecutar_episodio(tarea["filas"], tarea["columnas"], tarea["densidad"],
+                                         tarea["semilla"], tarea["algoritmo"], tarea["dinamico"],
+                                         tarea["max_pasos"])
+        else:
+            # La semilla fija tanto random como el generador de cambios del laberinto
+            random.seed(tarea["semilla"])
+            laberinto = Laberinto.deserializar(tarea["laberinto"], tarea["semilla"])
+            metricas = ejecutar_episodio_en(laberinto, tarea["algoritmo"], tarea["dinamico"],
+                                            tarea["max_pasos"])
+            metricas["semilla"] = tarea["semilla"]
+    except Exception as error:  # Un episodio fallido no debe detener el barrido
+        metricas = {"semilla": tarea["semilla"], "algoritmo": tarea["algoritmo"],
+                    "filas": tarea["filas"], "columnas": tarea["columnas"],
+                    "densidad": tarea["densidad"], "dinamico": tarea["dinamico"],
+                    "exito": False, "error": repr(error)}
+    metricas["clave"] = clave_tarea(tarea)
+    return metricas
+
+
+def claves_completadas(ruta):
+    """Lee un archivo de resultados y devuelve las claves de los episodios sin error."""
+    completadas = set()
+    if not os.path.exists(ruta):
+        return completadas
+    with open(ruta) as archivo:
+        for linea in archivo:
+            try:
+                resultado = json.loads(linea)
+            except json.JSONDecodeError:
+                continue  # Línea truncada por una interrupción
+            if "error" not in resultado:
+                completadas.add(resultado["clave"])
+    return completadas
+
+
+def ejecutar_lote(tareas, ruta_salida, procesos=None, reanudar=True, progreso=None):
+    """Ejecuta las tareas en paralelo escribiendo cada resultado en cuanto termina.
+
+    Devuelve (ejecutadas, omitidas). Con reanudar=True se saltan las tareas que ya
+    aparecen en el archivo de salida.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    completadas = claves_completadas(ruta_salida) if reanudar else set()
+    pendientes = [tarea for tarea in tareas if clave_tarea(tarea) not in completadas]
+    omitidas = len(tareas) - len(pendientes)
+    # Los laberintos grandes primero, para que no queden rezagados al final del barrido
+    pendientes.sort(key=lambda tarea: tarea["filas"] * tarea["columnas"], reverse=True)
+
+    modo = "a" if reanudar else "w"
+    ejecutadas = 0
+    with open(ruta_salida, modo) as salida:
+        if not pendientes:
+            return ejecutadas, omitidas
+        # Bloques pequeños: poco tráfico entre procesos sin perder el balance de carga
+        tamano_bloque = max(1, len(pendientes) // (procesos * 16))
+        with Pool(procesos) as pool:
+            for metricas in pool.imap_unordered(ejecutar_tarea, pendientes, tamano_bloque):
+                salida.write(json.dumps(metricas) + "\n")
+                salida.flush()
+                ejecutadas += 1
+                if progreso is not None:
+                    progreso(ejecutadas, len(pendientes), metricas)
+    return ejecutadas, omitidas
+
+
+def _semillas(texto):
+    """Admite listas (1,2,3) y rangos inclusivos (0-99)."""
+    semillas = []
+    for parte in texto.split(","):
+        if "-" in parte:
+            inicio, fin = parte.split("-")
+            semillas.extend(range(int(inicio), int(fin) + 1))
+        elif parte:
+            semillas.append(int(parte))
+    return semillas
+
+
+def _lista(tipo):
+    return lambda texto: [tipo(valor) for valor in texto.split(",") if valor]
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m core.lotes",
+        description="Barre parámetros ejecutando episodios en paralelo en todos los núcleos.")
+    parser.add_argument("--tamanos", type=_lista(int), default=[10])
+    parser.add_argument("--densidades", type=_lista(float), default=[0.3])
+    parser.add_argument("--algoritmos", type=_lista(str), default=["A*"])
+    parser.add_argument("--semillas", type=_semillas, default=[0])
+    parser.add_argument("--dinamico", type=_lista(str), default=["no"],
+                        help=f"Modos separados por comas: {', '.join(MODOS_DINAMICOS)}")
+    parser.add_argument("--escenarios", type=_lista(str), default=None,
+                        help="Trazas grabadas con core.simular --traza; se repiten con cada "
+                             "algoritmo en lugar de barrer tamaños, densidades y semillas")
+    parser.add_argument("--max-pasos", type=int, default=None)
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="Número de procesos (por defecto, todos los núcleos)")
+    parser.add_argument("--salida", default="lotes.jsonl")
+    parser.add_argument("--reiniciar", action="store_true",
+                        help="Sobrescribe la salida en lugar de reanudar")
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    for modo in args.dinamico:
+        if modo not in MODOS_DINAMICOS:
+            crear_parser().error(f"modo dinámico desconocido: {modo}")
+    if args.escenarios:
+        tareas = tareas_desde_escenarios(args.escenarios, args.algoritmos, args.max_pasos)
+    else:
+        tareas = generar_tareas(args.tamanos, args.densidades, args.algoritmos, args.semillas,
+                                args.dinamico, args.max_pasos)
+
+    def progreso(hechas, total, metricas):
+        if hechas % 100 == 0 or hechas == total:
+            print(f"{hechas}/{total} episodios", file=sys.stderr, flush=True)
+
+    inicio = time.perf_counter()
+    try:
+        ejecutadas, omitidas = ejecutar_lote(tareas, args.salida, args.procesos,
+                                             not args.reiniciar, progreso)
+    except KeyboardInterrupt:
+        print("Barrido interrumpido; vuelva a ejecutar el mismo comando para reanudar.",
+              file=sys.stderr)
+        sys.exit(130)
+    tiempo = time.perf_counter() - inicio
+    ritmo = ejecutadas / tiempo if tiempo > 0 else 0.0
+    print(f"{ejecutadas} episodios ejecutados, {omitidas} ya completados, "
+          f"{tiempo:.1f} s ({ritmo:.1f} episodios/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
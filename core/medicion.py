@@ -0,0 +1,76 @@
+"""
+Medición de tiempos por fase
+============================
+
+Un Medidor acumula la duración de fases con nombre (búsqueda, dibujo, ...) y
+contadores, y resume las últimas muestras de cada fase con percentiles móviles
+(p50, p95 y máximo). Está pensado para dejarse en el código: desactivado, medir
+una fase cuesta solo comprobar una bandera.
+
+    inicio = medidor.inicio()
+    ...
+    medidor.fin("busqueda", inicio)
+"""
+
+import threading
+import time
+from collections import deque
+
+# Muestras que se conservan por fase para calcular los percentiles
+VENTANA_MUESTRAS = 256
+
+
+class Medidor:
+    """Tiempos por fase y contadores, con percentiles sobre las últimas muestras."""
+
+    def __init__(self, activo=False, ventana=VENTANA_MUESTRAS):
+        self.activo = activo
+        self.ventana = ventana
+        self.muestras = {}    # Fase -> deque con las últimas duraciones en segundos
+        self.contadores = {}  # Nombre -> total acumulado
+        # Algunas fases se miden en otro hilo (el renderizador del árbol)
+        self._cerrojo = threading.Lock()
+
+    def inicio(self):
+        """Marca de tiempo para fin(); 0.0 si el medidor está desactivado."""
+        return time.perf_counter() if self.activo else 0.0
+
+    def fin(self, fase, inicio):
+        """Registra la duración de una fase empezada con inicio()."""
+        if not self.activo:
+            return
+        duracion = time.perf_counter() - inicio
+        with self._cerrojo:
+            muestras = self.muestras.get(fase)
+            if muestras is None:
+                muestras = self.muestras[fase] = deque(maxlen=self.ventana)
+            muestras.append(duracion)
+
+    def contar(self, nombre, cantidad=1):
+        if self.activo:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+
+    def percentiles(self, fase):
+        """Devuelve {"n", "p50", "p95", "max"} de una fase (en segundos), o None si no hay muestras."""
+        with self._cerrojo:
+            muestras = sorted(self.muestras.get(fase, ()))
+        if not muestras:
+            return None
+        n = len(muestras)
+        return {
+            "n": n,
+            "p50": muestras[n // 2],
+            "p95": muestras[min(n - 1, int(n * 0.95))],
+            "max": muestras[-1],
+        }
+
+    def resumen(self):
+        """Percentiles de todas las fases medidas, por nombre de fase."""
+        with self._cerrojo:
+            fases = list(self.muestras)
+        return {fase: self.percentiles(fase) for fase in fases}
+
+    def limpiar(self):
+        with self._cerrojo:
+            self.muestras.clear()
+        self.contadores.clear()
@@ -0,0 +1,243 @@
+"""
+Simulación sin interfaz gráfica
+===============================
+
+Ejecuta episodios del agente en el laberinto tan rápido como sea posible, sin
+pygame, matplotlib ni networkx, y reporta métricas por episodio.
+
+Uso:
+    python -m core.simular --filas 50 --columnas 50 --densidad 0.3 \\
+        --algoritmo "A*" --dinamico paredes --episodios 100 --semilla 1
+
+    # Grabar un episodio y repetir sus cambios con otro algoritmo
+    python -m core.simular --dinamico paredes --semilla 7 --traza episodio.trz
+    python -m core.simular --escenario episodio.trz --algoritmo BFS
+"""
+
+import argparse
+import csv
+import json
+import random
+import sys
+import time
+
+from core.laberinto import Laberinto
+from core.agente import Agente
+from core.algoritmos.busqueda import ALGORITMOS_DISPONIBLES, CacheBusquedas
+from core.trazas import GrabadorTraza, Traza, aplicar_tic
+
+# Modos dinámicos equivalentes a los botones de la interfaz
+MODOS_DINAMICOS = ["no", "paredes", "algoritmos"]
+
+# Cada cuántos pasos se aplican los cambios dinámicos (igual que en la interfaz)
+PERIODO_DINAMICO = 5
+
+CAMPOS_METRICAS = ["episodio", "semilla", "algoritmo", "filas", "columnas", "densidad",
+                   "dinamico", "exito", "pasos", "replanificaciones",
+                   "nodos_generados", "tiempo", "expansiones", "generaciones",
+                   "pico_frontera", "memoria_busqueda", "tiempo_busqueda"]
+
+
+def crear_agente(laberinto, algoritmo, cache=False):
+    """Crea un agente sin visualizador listo para buscar con el algoritmo indicado.
+
+    Con cache=True el agente recibe una caché de búsquedas propia, así las
+    métricas de un episodio no dependen de los que se ejecutaron antes.
+    """
+    agente = Agente(laberinto.inicio, visualizar_arbol=False,
+                    cache_busquedas=CacheBusquedas() if cache else None)
+    if algoritmo == "auto":
+        # Selección automática: empieza con A* y deja que el agente cambie de algoritmo
+        agente.algoritmo_actual = "A*"
+    else:
+        agente.cambiar_algoritmo(algoritmo)
+    agente.estado = "Buscando"
+    return agente
+
+
+def aplicar_cambios_dinamicos(laberinto, agente, modo_dinamico, contador, grabador=None):
+    """Reproduce la lógica dinámica del bucle de la interfaz. Devuelve el nuevo contador."""
+    if modo_dinamico == "paredes":
+        contador -= 1
+        if contador <= 0:
+            laberinto.cambiar_paredes_aleatorias(8)
+            laberinto.randomizar_meta(agente.posicion)
+            agente.estado = "Buscando"
+            if grabador is not None:
+                grabador.replanificar()
+            contador = PERIODO_DINAMICO
+    elif modo_dinamico == "algoritmos":
+        if laberinto.decrementar_contador_dinamico():
+            cambios = laberinto.actualizar_dinamico_con_algoritmos(agente.posicion)
+            if cambios['algoritmo_sugerido'] and cambios['algoritmo_sugerido'] != agente.algoritmo_actual:
+                agente.cambiar_algoritmo(cambios['algoritmo_sugerido'])
+                if grabador is not None:
+                    grabador.algoritmo(cambios['algoritmo_sugerido'])
+            if cambios['meta_cambiada']:
+                agente.estado = "Buscando"
+                if grabador is not None:
+                    grabador.replanificar()
+        contador = laberinto.contador_dinamico
+    return contador
+
+
+def ejecutar_episodio(filas=10, columnas=10, densidad=0.4, semilla=None, algoritmo="A*",
+                      modo_dinamico="no", max_pasos=None, ruta_traza=None, cache=False):
+    """Ejecuta un episodio completo y devuelve un diccionario con sus métricas."""
+    if semilla is not None:
+        random.seed(semilla)
+    laberinto = Laberinto(filas, columnas, densidad)
+    metricas = ejecutar_episodio_en(laberinto, algoritmo, modo_dinamico, max_pasos, ruta_traza,
+                                    cache)
+    metricas["semilla"] = semilla
+    return metricas
+
+
+def ejecutar_episodio_en(laberinto, algoritmo="A*", modo_dinamico="no", max_pasos=None,
+                         ruta_traza=None, cache=False):
+    """Ejecuta un episodio sobre un laberinto ya construido y devuelve sus métricas.
+
+    Con ruta_traza se graba el episodio en ese archivo (ver core.trazas). Con
+    cache=True el agente usa una caché de búsquedas nueva para este episodio.
+    """
+    laberinto.mostrar_mensajes = False
+    if modo_dinamico == "algoritmos":
+        laberinto.cambiar_modo_dinamico_algoritmos()
+    agente = crear_agente(laberinto, algoritmo, cache)
+    grabador = GrabadorTraza(laberinto, agente) if ruta_traza is not None else None
+
+    if max_pasos is None:
+        max_pasos = 4 * laberinto.filas * laberinto.columnas
+
+    pasos = 0
+    contador = PERIODO_DINAMICO
+    inicio = time.perf_counter()
+    while pasos < max_pasos:
+        if agente.estado == "Meta encontrada" or agente.estado == "Sin solución":
+            break
+        agente.actuar(laberinto)
+        pasos += 1
+        if agente.estado != "Meta encontrada":
+            contador = aplicar_cambios_dinamicos(laberinto, agente, modo_dinamico, contador,
+                                                 grabador)
+        if grabador is not None:
+            grabador.tic()
+    tiempo = time.perf_counter() - inicio
+    if grabador is not None:
+        grabador.guardar(ruta_traza)
+
+    return metricas_episodio(laberinto, agente, algoritmo, modo_dinamico, pasos, tiempo)
+
+
+def ejecutar_escenario(traza, algoritmo="A*", max_pasos=None):
+    """Ejecuta un episodio repitiendo el calendario de cambios de una traza.
+
+    Los cambios de paredes, meta y algoritmo, y las replanificaciones forzadas, se
+    aplican en el mismo tic en que se grabaron, sin RNG, así que todos los algoritmos enfrentan el mismo escenario.
+    Con el algoritmo de la grabación se repiten exactamente sus movimientos.
+    """
+    laberinto = traza.crear_laberinto()
+    agente = crear_agente(laberinto, algoritmo)
+    agente.posicion = traza.inicio_agente
+    agente.historial_posiciones = [traza.inicio_agente]
+
+    if max_pasos is None:
+        max_pasos = 4 * laberinto.filas * laberinto.columnas
+
+    pasos = 0
+    inicio = time.perf_counter()
+    while pasos < max_pasos:
+        if agente.estado == "Meta encontrada" or agente.estado == "Sin solución":
+            break
+        agente.actuar(laberinto)
+        pasos += 1
+        if agente.estado != "Meta encontrada" and pasos <= len(traza.tics):
+            tic = traza.tics[pasos - 1]
+            if tic.cambia_laberinto():
+                aplicar_tic(laberinto, tic)
+            if tic.replanificar:
+                agente.estado = "Buscando"
+            if tic.algoritmo is not None:
+                agente.cambiar_algoritmo(tic.algoritmo)
+    tiempo = time.perf_counter() - inicio
+
+    return metricas_episodio(laberinto, agente, algoritmo, "escenario", pasos, tiempo)
+
+
+def metricas_episodio(laberinto, agente, algoritmo, modo_dinamico, pasos, tiempo):
+    return {
+        "semilla": None,
+        "algoritmo": algoritmo,
+        "filas": laberinto.filas,
+        "columnas": laberinto.columnas,
+        "densidad": laberinto.densidad_paredes,
+        "dinamico": modo_dinamico,
+        "exito": agente.estado == "Meta encontrada",
+        "pasos": pasos,
+        "replanificaciones": agente.replanificaciones,
+        "nodos_generados": agente.nodos_generados_total,
+        "tiempo": tiempo,
+        # Suma de las búsquedas del episodio (picos: el mayor de una búsqueda)
+        "expansiones": agente.estadisticas_busqueda.expansiones,
+        "generaciones": agente.estadisticas_busqueda.generaciones,
+        "pico_frontera": agente.estadisticas_busqueda.pico_frontera,
+        "memoria_busqueda": agente.estadisticas_busqueda.memoria_pico,
+        "tiempo_busqueda": agente.estadisticas_busqueda.tiempo,
+    }
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m core.simular",
+        description="Ejecuta episodios del agente sin interfaz gráfica.")
+    parser.add_argument("--filas", type=int, default=10)
+    parser.add_argument("--columnas", type=int, default=10)
+    parser.add_argument("--densidad", type=float, default=0.4, help="Proporción de paredes")
+    parser.add_argument("--algoritmo", default="A*", choices=ALGORITMOS_DISPONIBLES + ["auto"])
+    parser.add_argument("--dinamico", default="no", choices=MODOS_DINAMICOS)
+    parser.add_argument("--episodios", type=int, default=1)
+    parser.add_argument("--semilla", type=int, default=None,
+                        help="Semilla del primer episodio; el episodio i usa semilla + i")
+    parser.add_argument("--max-pasos", type=int, default=None)
+    parser.add_argument("--formato", default="csv", choices=["csv", "json"])
+    parser.add_argument("--salida", default=None, help="Archivo de salida (por defecto, stdout)")
+    parser.add_argument("--traza", default=None,
+                        help="Graba cada episodio en este archivo; admite {episodio} en el nombre")
+    parser.add_argument("--escenario", default=None,
+                        help="Repite los cambios de una traza grabada en lugar de generar episodios")
+    parser.add_argument("--cache", action="store_true",
+                        help="Reutiliza búsquedas repetidas dentro de cada episodio (caché nueva por episodio)")
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    salida = open(args.salida, "w", newline="") if args.salida else sys.stdout
+    try:
+        escritor = None
+        if args.formato == "csv":
+            escritor = csv.DictWriter(salida, fieldnames=CAMPOS_METRICAS)
+            escritor.writeheader()
+        traza = Traza.cargar(args.escenario) if args.escenario else None
+        for episodio in range(args.episodios):
+            semilla = args.semilla + episodio if args.semilla is not None else None
+            if traza is not None:
+                metricas = ejecutar_escenario(traza, args.algoritmo, args.max_pasos)
+            else:
+                ruta_traza = args.traza.format(episodio=episodio) if args.traza else None
+                metricas = ejecutar_episodio(args.filas, args.columnas, args.densidad, semilla,
+                                             args.algoritmo, args.dinamico, args.max_pasos,
+                                             ruta_traza, args.cache)
+            metricas["episodio"] = episodio
+            if escritor is not None:
+                escritor.writerow(metricas)
+            else:
+                salida.write(json.dumps(metricas) + "\n")
+            salida.flush()
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Trazas y escenarios binarios
+============================
+
+Formato compacto para grabar un episodio y reproducirlo sin RNG:
+
+    cabecera   "<4sI": magia b"TRZ2" y longitud del laberinto serializado
+    laberinto  Laberinto.serializar() (un bit por celda)
+    inicio     "<I": celda inicial del agente
+    eventos    un byte de tipo seguido de su dato; el primero siempre es TIC:
+               TIC          -            separa un tic del siguiente
+               PASO         "<B"         movimiento del agente (índice en MOVIMIENTOS)
+               POSICION     "<I"         salto del agente a otra celda
+               PARED        "<I"         celda que cambia (pared <-> camino)
+               META         "<I"         nueva celda de la meta
+               ALGORITMO    "<B" + nombre  algoritmo impuesto por el entorno (UTF-8,
+                                         precedido de su largo)
+               REPLANIFICAR -            el entorno obligó al agente a buscar de nuevo
+
+Las celdas se escriben como fila * columnas + columna. Dentro de cada tic los
+eventos se aplican en el orden de un paso de la simulación: primero actúa el
+agente y después cambia el laberinto. La misma traza sirve de "escenario":
+repite el mismo calendario de cambios contra cualquier algoritmo.
+
+Las trazas TRZ1 guardaban el algoritmo como índice en la lista de algoritmos de
+entonces (ALGORITMOS_TRZ1) y no registraban REPLANIFICAR; se siguen leyendo.
+"""
+
+import struct
+
+from core.laberinto import Laberinto
+from core.agente import Agente
+from core.algoritmos.busqueda import ALGORITMOS_DISPONIBLES, MOVIMIENTOS
+
+MAGIA_TRAZA = b"TRZ2"
+MAGIA_TRAZA_V1 = b"TRZ1"
+FORMATO_CABECERA = "<4sI"
+
+TIC, PASO, POSICION, PARED, META, ALGORITMO, REPLANIFICAR = range(7)
+
+# Tabla fija con que las trazas TRZ1 codificaban el algoritmo (no cambiar)
+ALGORITMOS_TRZ1 = ("BFS", "DFS", "A*", "IDS", "D* Lite", "BFS bidireccional", "A* bidireccional",
+                   "JPS", "HPA*", "Campo de distancias")
+
+
+class TicTraza:
+    """Lo ocurrido en un tic: movimiento del agente y cambios del entorno."""
+    __slots__ = ("posicion", "paredes", "meta", "algoritmo", "replanificar")
+
+    def __init__(self):
+        self.posicion = None   # Posición del agente al terminar el tic, si se movió
+        self.paredes = []      # Celdas que cambiaron, en orden
+        self.meta = None       # Nueva meta, si se movió
+        self.algoritmo = None  # Algoritmo impuesto por el entorno, si lo hubo
+        self.replanificar = False  # Si el entorno obligó al agente a buscar de nuevo
+
+    def cambia_laberinto(self):
+        return bool(self.paredes) or self.meta is not None
+
+
+class GrabadorTraza:
+    """Graba un episodio comparando el laberinto y el agente después de cada tic."""
+
+    def __init__(self, laberinto, agente):
+        self.laberinto = laberinto
+        self.agente = agente
+        serializado = laberinto.serializar()
+        self.datos = bytearray(struct.pack(FORMATO_CABECERA, MAGIA_TRAZA, len(serializado)))
+        self.datos += serializado
+        self.datos += struct.pack("<I", self._indice(agente.posicion))
+        self.version = laberinto.version
+        laberinto.registrar_lector(self)
+        self.meta = laberinto.meta
+        self.posicion = agente.posicion
+        self.algoritmo_pendiente = None
+        self.replanificar_pendiente = False
+        self.tics = 0
+
+    def _indice(self, posicion):
+        return posicion[0] * self.laberinto.columnas + posicion[1]
+
+    def algoritmo(self, nombre):
+        """Anota un cambio de algoritmo impuesto por el entorno en el tic actual."""
+        self.algoritmo_pendiente = nombre
+
+    def replanificar(self):
+        """Anota que en el tic actual el entorno puso al agente a buscar de nuevo."""
+        self.replanificar_pendiente = True
+
+    def tic(self):
+        """Cierra el tic actual escribiendo lo que cambió desde el anterior."""
+        datos = self.datos
+        datos.append(TIC)
+        posicion = self.agente.posicion
+        if posicion != self.posicion:
+            paso = (posicion[0] - self.posicion[0], posicion[1] - self.posicion[1])
+            if paso in MOVIMIENTOS:
+                datos += struct.pack("<BB", PASO, MOVIMIENTOS.index(paso))
+            else:
+                datos += struct.pack("<BI", POSICION, self._indice(posicion))
+            self.posicion = posicion
+
+        cambios = self.laberinto.cambios_desde(self.version)
+        if cambios is None:
+            raise ValueError("El laberinto se regeneró durante la grabación de la traza")
+        for celda in cambios:
+            datos += struct.pack("<BI", PARED, self._indice(celda))
+        self.version = self.laberinto.version
+        self.laberinto.registrar_lector(self)
+
+        if self.laberinto.meta != self.meta:
+            self.meta = self.laberinto.meta
+            datos += struct.pack("<BI", META, self._indice(self.meta))
+        if self.algoritmo_pendiente is not None:
+            nombre = self.algoritmo_pendiente.encode("utf-8")
+            datos += struct.pack("<BB", ALGORITMO, len(nombre)) + nombre
+            self.algoritmo_pendiente = None
+        if self.replanificar_pendiente:
+            datos.append(REPLANIFICAR)
+            self.replanificar_pendiente = False
+        self.tics += 1
+
+    def guardar(self, ruta):
+        with open(ruta, "wb") as archivo:
+            archivo.write(self.datos)
+
+
+class Traza:
+    """Traza decodificada: laberinto inicial, celda inicial del agente y lista de tics."""
+
+    def __init__(self, laberinto_serializado, inicio_agente, tics):
+        self.laberinto_serializado = laberinto_serializado
+        self.inicio_agente = inicio_agente
+        self.tics = tics
+
+    @classmethod
+    def desde_bytes(cls, datos):
+        tamano_cabecera = struct.calcsize(FORMATO_CABECERA)
+        magia, longitud = struct.unpack_from(FORMATO_CABECERA, datos)
+        if magia not in (MAGIA_TRAZA, MAGIA_TRAZA_V1):
+            raise ValueError("Los datos no corresponden a una traza")
+        serializado = bytes(datos[tamano_cabecera:tamano_cabecera + longitud])
+        # Solo hace falta el número de columnas para decodificar las celdas
+        columnas = Laberinto.deserializar(serializado).columnas
+        posicion = lambda indice: divmod(indice, columnas)
+
+        desplazamiento = tamano_cabecera + longitud
+        inicio_agente = posicion(struct.unpack_from("<I", datos, desplazamiento)[0])
+        desplazamiento += 4
+        tics = []
+        actual = inicio_agente
+        tic = None
+        while desplazamiento < len(datos):
+            tipo = datos[desplazamiento]
+            desplazamiento += 1
+            if tipo == TIC:
+                tic = TicTraza()
+                tics.append(tic)
+                continue
+            if tic is None:
+                raise ValueError(f"La traza no empieza con un tic (evento {tipo})")
+            if tipo == PASO:
+                df, dc = MOVIMIENTOS[datos[desplazamiento]]
+                desplazamiento += 1
+                actual = (actual[0] + df, actual[1] + dc)
+                tic.posicion = actual
+            elif tipo == ALGORITMO:
+                if magia == MAGIA_TRAZA_V1:
+                    indice = datos[desplazamiento]
+                    desplazamiento += 1
+                    if indice >= len(ALGORITMOS_TRZ1):
+                        raise ValueError(f"Algoritmo desconocido en la traza: {indice}")
+                    tic.algoritmo = ALGORITMOS_TRZ1[indice]
+                else:
+                    largo = datos[desplazamiento]
+                    nombre = bytes(datos[desplazamiento + 1:desplazamiento + 1 + largo]).decode("utf-8")
+                    desplazamiento += 1 + largo
+                    if nombre not in ALGORITMOS_DISPONIBLES:
+                        raise ValueError(f"Algoritmo desconocido en la traza: {nombre!r}")
+                    tic.algoritmo = nombre
+            elif tipo == REPLANIFICAR:
+                tic.replanificar = True
+            elif tipo in (POSICION, PARED, META):
+                celda = posicion(struct.unpack_from("<I", datos, desplazamiento)[0])
+                desplazamiento += 4
+                if tipo == POSICION:
+                    actual = celda
+                    tic.posicion = celda
+                elif tipo == PARED:
+                    tic.paredes.append(celda)
+                else:
+                    tic.meta = celda
+            else:
+                raise ValueError(f"Evento desconocido en la traza: {tipo}")
+        if magia == MAGIA_TRAZA_V1:
+            # TRZ1 no registraba las replanificaciones: se forzaban con cada cambio
+            for tic in tics:
+                tic.replanificar = tic.cambia_laberinto()
+        return cls(serializado, inicio_agente, tics)
+
+    @classmethod
+    def cargar(cls, ruta):
+        with open(ruta, "rb") as archivo:
+            return cls.desde_bytes(archivo.read())
+
+    def crear_laberinto(self):
+        """Laberinto en el estado inicial de la traza."""
+        laberinto = Laberinto.deserializar(self.laberinto_serializado)
+        laberinto.mostrar_mensajes = False
+        return laberinto
+
+
+def aplicar_tic(laberinto, tic):
+    """Aplica al laberinto los cambios de paredes y meta de un tic."""
+    for celda in tic.paredes:
+        if laberinto.es_libre(celda):
+            laberinto.poner_pared(celda)
+        else:
+            laberinto.quitar_pared(celda)
+    if tic.meta is not None:
+        laberinto.meta = tic.meta
+
+
+class ReproductorTraza:
+    """Reproduce una traza tal como se grabó: el agente sigue los movimientos registrados.
+
+    No busca caminos ni usa RNG; sirve para inspeccionar un episodio paso a paso
+    (por ejemplo, dibujando reproductor.laberinto y reproductor.agente).
+    """
+
+    def __init__(self, traza):
+        self.traza = traza
+        self.laberinto = traza.crear_laberinto()
+        self.agente = Agente(traza.inicio_agente, visualizar_arbol=False)
+        self.agente.estado = "Siguiendo camino"
+        self.tic = 0
+
+    def avanzar(self):
+        """Aplica el siguiente tic. Devuelve False cuando la traza se terminó."""
+        if self.tic >= len(self.traza.tics):
+            return False
+        tic = self.traza.tics[self.tic]
+        if tic.posicion is not None:
+            self.agente.posicion = tic.posicion
+            self.agente.historial_posiciones.append(tic.posicion)
+            self.agente.visitados.vincular(self.laberinto)
+            self.agente.visitados.agregar(tic.posicion)
+        aplicar_tic(self.laberinto, tic)
+        if tic.algoritmo is not None:
+            self.agente.algoritmo_actual = tic.algoritmo
+        if self.agente.posicion == self.laberinto.meta:
+            self.agente.estado = "Meta encontrada"
+        self.tic += 1
+        return True
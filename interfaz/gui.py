@@ -8,6 +8,10 @@ import os
 from core.laberinto import Laberinto
 # Importa la clase Agente desde el módulo core
 from core.agente import Agente
+# Caché de búsquedas compartida del proceso (la interfaz la activa explícitamente)
+from core.algoritmos.busqueda import CACHE_BUSQUEDAS
+# Importa el medidor de tiempos por fase
+from core.medicion import Medidor
 
 # --- Constantes de Configuración ---
 ANCHO_PANEL = 400 # Ancho del panel de control lateral
@@ -31,86 +35,202 @@ COLORES = {
     "borde_arbol": (220, 220, 220) # Borde para separar el área del árbol
 }
 
-def dibujar_laberinto(ventana, laberinto, agente):
-    """Dibuja el estado actual del laberinto y el agente."""
-    # Dibuja el fondo solo en el área del laberinto
-    area_laberinto = pygame.Rect(ANCHO_PANEL, 0, ANCHO_LABERINTO, ALTO_VENTANA)
-    pygame.draw.rect(ventana, COLORES["fondo"], area_laberinto)
-
-    # Itera sobre cada celda del grid del laberinto
-    for fila in range(laberinto.filas):
-        for col in range(laberinto.columnas):
-            # Calcula las coordenadas de dibujo, desplazadas por el panel
-            x = ANCHO_PANEL + col * (TAMANO_CELDA + MARGEN)
-            y = fila * (TAMANO_CELDA + MARGEN)
-
-            # Determina el color de la celda según su estado
-            if laberinto.grid[fila][col] == 1:
-                color = COLORES["pared"]
-            elif (fila, col) == laberinto.meta:
-                color = COLORES["camino"] # Fondo para la imagen de la meta
-            elif (fila, col) in agente.visitados:
-                color = COLORES["visitado"]
-            elif (fila, col) in agente.camino_optimo: # Resalta el camino óptimo
-                color = COLORES["ruta"]
+# --- Cachés de Dibujado ---
+_FUENTES = {} # (tamaño, negrita) -> pygame.font.Font
+_SPRITES = {} # (id de la imagen, tamaño) -> imagen ya escalada
+SUPERFICIE_PANEL = None # Superficie reutilizada por dibujar_panel
+
+def obtener_fuente(tamano, negrita=False):
+    """Devuelve una fuente Arial, creándola solo la primera vez."""
+    clave = (tamano, negrita)
+    if clave not in _FUENTES:
+        _FUENTES[clave] = pygame.font.SysFont("Arial", tamano, bold=negrita)
+    return _FUENTES[clave]
+
+def obtener_sprite(imagen, tamano):
+    """Devuelve la imagen escalada al tamaño dado, escalándola solo la primera vez."""
+    clave = (id(imagen), tamano)
+    if clave not in _SPRITES:
+        _SPRITES[clave] = pygame.transform.scale(imagen, tamano)
+    return _SPRITES[clave]
+
+def rect_celda(celda):
+    """Rectángulo de una celda en coordenadas de la ventana."""
+    fila, col = celda
+    return pygame.Rect(ANCHO_PANEL + col * (TAMANO_CELDA + MARGEN), fila * (TAMANO_CELDA + MARGEN),
+                       TAMANO_CELDA, TAMANO_CELDA)
+
+class CapaLaberinto:
+    """Superficie con las celdas del laberinto ya dibujadas (sin el agente).
+
+    Se dibuja completa una sola vez por laberinto generado; después solo se
+    repintan las celdas que cambiaron: paredes modificadas, meta, nuevas
+    posiciones visitadas y el camino óptimo.
+    """
+
+    def __init__(self):
+        self.superficie = None
+        self.laberinto = None
+        self.generacion = None
+        self.version = None # Versión del laberinto ya dibujada
+        self.meta = None
+        self.visitados = None # Registro de visitados del agente ya dibujado
+        self.n_visitados = 0
+        self.camino = frozenset() # Celdas del camino óptimo ya dibujado
+
+    def color_celda(self, laberinto, agente, celda):
+        """Color de la celda según su estado (consultas O(1) en los índices del agente)."""
+        if not laberinto.es_libre(celda):
+            return COLORES["pared"]
+        if celda == laberinto.meta:
+            return COLORES["camino"] # Fondo para la imagen de la meta
+        if celda in agente.visitados:
+            return COLORES["visitado"]
+        if celda in agente.en_camino_optimo: # Resalta el camino óptimo
+            return COLORES["ruta"]
+        return COLORES["camino"]
+
+    def pintar_celda(self, laberinto, agente, celda):
+        fila, col = celda
+        x = col * (TAMANO_CELDA + MARGEN)
+        y = fila * (TAMANO_CELDA + MARGEN)
+        pygame.draw.rect(self.superficie, self.color_celda(laberinto, agente, celda), (x, y, TAMANO_CELDA, TAMANO_CELDA))
+
+        # Dibuja la imagen de la meta si está disponible
+        if celda == laberinto.meta:
+            if 'IMG_META' in globals() and IMG_META is not None:
+                img_escalada = obtener_sprite(IMG_META, (TAMANO_CELDA - 4, TAMANO_CELDA - 4))
+                # Centra la imagen dentro de la celda
+                img_rect = img_escalada.get_rect(center=(x + TAMANO_CELDA // 2, y + TAMANO_CELDA // 2))
+                self.superficie.blit(img_escalada, img_rect)
             else:
-                color = COLORES["camino"]
-
-            # Dibuja el rectángulo de la celda
-            pygame.draw.rect(ventana, color, (x, y, TAMANO_CELDA, TAMANO_CELDA))
-
-            # Dibuja la imagen de la meta si está disponible
-            if (fila, col) == laberinto.meta:
-                if 'IMG_META' in globals() and IMG_META is not None:
-                    try:
-                        # Escala la imagen para que quepa en la celda
-                        img_escalada = pygame.transform.scale(IMG_META, (TAMANO_CELDA - 4, TAMANO_CELDA - 4))
-                        # Centra la imagen dentro de la celda
-                        img_rect = img_escalada.get_rect(center=(x + TAMANO_CELDA // 2, y + TAMANO_CELDA // 2))
-                        ventana.blit(img_escalada, img_rect)
-                    except Exception as e: # Manejo de errores si falla la carga/dibujo
-                        print(f"Error al dibujar meta: {e}")
-                        pygame.draw.rect(ventana, COLORES["meta"], (x, y, TAMANO_CELDA, TAMANO_CELDA)) # Fallback a color sólido
-                else:
-                    pygame.draw.rect(ventana, COLORES["meta"], (x, y, TAMANO_CELDA, TAMANO_CELDA)) # Fallback si no hay imagen
-
-    # Dibuja la imagen del agente si está disponible
-    agente_x_centro = ANCHO_PANEL + agente.posicion[1] * (TAMANO_CELDA + MARGEN) + TAMANO_CELDA // 2
-    agente_y_centro = agente.posicion[0] * (TAMANO_CELDA + MARGEN) + TAMANO_CELDA // 2
-
+                pygame.draw.rect(self.superficie, COLORES["meta"], (x, y, TAMANO_CELDA, TAMANO_CELDA)) # Fallback si no hay imagen
+
+    def actualizar(self, laberinto, agente):
+        """Repinta lo que cambió. Devuelve None si se redibujó todo o el conjunto de celdas repintadas."""
+        cambios = None
+        if laberinto is self.laberinto and laberinto.generacion == self.generacion:
+            cambios = laberinto.cambios_desde(self.version)
+        completo = (self.superficie is None or cambios is None
+                    or agente.visitados is not self.visitados
+                    or len(agente.visitados) < self.n_visitados)
+        self.version = laberinto.version
+        laberinto.registrar_lector(self)
+        if completo:
+            if self.superficie is None or self.superficie.get_size() != (ANCHO_LABERINTO, ALTO_VENTANA):
+                self.superficie = pygame.Surface((ANCHO_LABERINTO, ALTO_VENTANA))
+            self.superficie.fill(COLORES["fondo"])
+            self.laberinto = laberinto
+            self.generacion = laberinto.generacion
+            self.meta = laberinto.meta
+            self.visitados = agente.visitados
+            self.n_visitados = len(agente.visitados)
+            self.camino = agente.en_camino_optimo
+            for fila in range(laberinto.filas):
+                for col in range(laberinto.columnas):
+                    self.pintar_celda(laberinto, agente, (fila, col))
+            return None
+
+        sucias = set(cambios)
+        if laberinto.meta != self.meta:
+            sucias.add(self.meta)
+            sucias.add(laberinto.meta)
+            self.meta = laberinto.meta
+        # El registro de visitados solo crece: las celdas nuevas están al final
+        sucias.update(agente.visitados[self.n_visitados:])
+        self.n_visitados = len(agente.visitados)
+        if agente.en_camino_optimo is not self.camino:
+            sucias |= self.camino ^ agente.en_camino_optimo
+            self.camino = agente.en_camino_optimo
+        for celda in sucias:
+            self.pintar_celda(laberinto, agente, celda)
+        return sucias
+
+def lineas_tiempos(medidor_interfaz, agente, laberinto):
+    """Textos del panel de tiempos: p50/p95/max en ms de cada fase y los contadores."""
+    lineas = []
+    for medidor in (medidor_interfaz, agente.medidor, laberinto.medidor):
+        for fase, medida in medidor.resumen().items():
+            if medida is not None:
+                lineas.append(f"{fase}: {medida['p50'] * 1000:.1f} / {medida['p95'] * 1000:.1f} / "
+                              f"{medida['max'] * 1000:.1f}")
+        for nombre, valor in medidor.contadores.items():
+            lineas.append(f"{nombre}: {valor}")
+    return lineas
+
+def dibujar_tiempos(panel, lineas):
+    """Superpone al pie del panel un recuadro semitransparente con los tiempos por fase."""
+    fuente = obtener_fuente(18)
+    alto = 34 + 20 * len(lineas)
+    recuadro = pygame.Surface((ANCHO_PANEL, alto), pygame.SRCALPHA)
+    recuadro.fill((0, 0, 0, 190))
+    recuadro.blit(fuente.render("Tiempos (ms) p50 / p95 / max", True, (255, 255, 0)), (10, 8))
+    for i, linea in enumerate(lineas):
+        recuadro.blit(fuente.render(linea, True, (255, 255, 255)), (10, 30 + 20 * i))
+    panel.blit(recuadro, (0, min(ALTO_VENTANA, ALTO_PANEL) - alto))
+
+def dibujar_agente(ventana, agente):
+    """Dibuja el agente sobre su celda actual."""
+    centro = rect_celda(agente.posicion).center
     if 'IMG_AGENTE' in globals() and IMG_AGENTE is not None:
-        try:
-            img_escalada = pygame.transform.scale(IMG_AGENTE, (TAMANO_CELDA - 4, TAMANO_CELDA - 4))
-            img_rect = img_escalada.get_rect(center=(agente_x_centro, agente_y_centro))
-            ventana.blit(img_escalada, img_rect)
-        except Exception as e: # Manejo de errores
-            print(f"Error al dibujar agente: {e}")
-            pygame.draw.circle(ventana, COLORES["agente"], (agente_x_centro, agente_y_centro), TAMANO_CELDA // 4) # Fallback a círculo
+        img_escalada = obtener_sprite(IMG_AGENTE, (TAMANO_CELDA - 4, TAMANO_CELDA - 4))
+        ventana.blit(img_escalada, img_escalada.get_rect(center=centro))
     else:
-        pygame.draw.circle(ventana, COLORES["agente"], (agente_x_centro, agente_y_centro), TAMANO_CELDA // 4) # Fallback si no hay imagen
+        pygame.draw.circle(ventana, COLORES["agente"], centro, TAMANO_CELDA // 4) # Fallback si no hay imagen
+
+def dibujar_laberinto(ventana, laberinto, agente, capa, posicion_anterior=None, completo=False):
+    """Dibuja el laberinto y el agente. Devuelve los rectángulos de la ventana que cambiaron."""
+    area_laberinto = pygame.Rect(ANCHO_PANEL, 0, ANCHO_LABERINTO, ALTO_VENTANA)
+    sucias = capa.actualizar(laberinto, agente)
+    if sucias is None or completo:
+        ventana.blit(capa.superficie, area_laberinto)
+        dibujar_agente(ventana, agente)
+        return [area_laberinto]
+
+    # Restaura desde la capa las celdas cambiadas y la que deja el agente
+    sucias.add(agente.posicion)
+    if posicion_anterior is not None:
+        sucias.add(posicion_anterior)
+    rects = []
+    for celda in sucias:
+        rect = rect_celda(celda)
+        ventana.blit(capa.superficie, rect, rect.move(-ANCHO_PANEL, 0))
+        rects.append(rect)
+    dibujar_agente(ventana, agente)
+    return rects
+
+def tiempo_transcurrido(tiempo_inicio, tiempo_final=None):
+    """Tiempo que se muestra en el panel: el final si ya terminó, o el tiempo en vivo."""
+    if tiempo_final is not None:
+        return tiempo_final # Usa el tiempo registrado al encontrar la meta
+    return time.time() - tiempo_inicio if tiempo_inicio else 0 # Calcula tiempo en vivo
 
 def dibujar_panel(ventana, agente, laberinto, pasos, tiempo_inicio, estado, modo_dinamico,
                  contador_dinamico, velocidad, mostrar_arbol, tiempo_final=None,
-                 modo_dinamico_algoritmos=False):
-    """Dibuja el panel lateral con información y controles."""
+                 modo_dinamico_algoritmos=False, tiempos=None):
+    """Dibuja el panel lateral con información y controles.
+
+    tiempos es la lista de líneas de lineas_tiempos; si se da, se superponen al pie del panel.
+    """
+    global SUPERFICIE_PANEL
     panel_x = 0 # El panel se dibuja en el borde izquierdo
-    panel = pygame.Surface((ANCHO_PANEL, ALTO_PANEL)) # Crea una superficie para el panel
+    # La superficie del panel se crea una sola vez y se reutiliza
+    if SUPERFICIE_PANEL is None:
+        SUPERFICIE_PANEL = pygame.Surface((ANCHO_PANEL, ALTO_PANEL))
+    panel = SUPERFICIE_PANEL
     panel.fill(COLORES["panel"]) # Rellena con color de fondo
 
     # Configuración de fuentes
-    fuente = pygame.font.SysFont("Arial", 24)
-    fuente_titulo = pygame.font.SysFont("Arial", 28, bold=True)
-    fuente_pequeña = pygame.font.SysFont("Arial", 20)
+    fuente = obtener_fuente(24)
+    fuente_titulo = obtener_fuente(28, negrita=True)
+    fuente_pequeña = obtener_fuente(20)
 
     # Dibuja el título del panel
     texto_titulo = fuente_titulo.render("Panel de Control", True, (0, 0, 0))
     panel.blit(texto_titulo, (100, 20)) # Posición relativa al panel
 
     # Calcula el tiempo transcurrido o muestra el tiempo final
-    if tiempo_final is not None:
-        tiempo_actual = tiempo_final # Usa el tiempo registrado al encontrar la meta
-    else:
-        tiempo_actual = time.time() - tiempo_inicio if tiempo_inicio else 0 # Calcula tiempo en vivo
+    tiempo_actual = tiempo_transcurrido(tiempo_inicio, tiempo_final)
 
     # Renderiza la información del estado actual
     texto_algoritmo = fuente.render(f"Algoritmo: {agente.algoritmo_actual}", True, (0, 0, 0))
@@ -186,7 +306,7 @@ def dibujar_panel(ventana, agente, laberinto, pasos, tiempo_inicio, estado, modo
     panel.blit(texto_seleccion, (20, y_offset))
     y_offset += 40
 
-    algoritmos = ["BFS", "DFS", "A*", "IDS"]
+    algoritmos = ["BFS", "DFS", "A*", "IDS", "D* Lite"]
     for algo in algoritmos:
         boton_algo = pygame.Rect(50, y_offset, 300, 40)
         # Resalta el botón del algoritmo actualmente seleccionado
@@ -217,12 +337,26 @@ def dibujar_panel(ventana, agente, laberinto, pasos, tiempo_inicio, estado, modo
         botones.append((f"vel_{vel}", boton_vel.move(panel_x, 0))) # Guarda el botón con prefijo "vel_"
         x_vel += 160 # Incrementa la posición X para el siguiente botón
 
+    # Tiempos por fase (tecla T)
+    if tiempos is not None:
+        dibujar_tiempos(panel, tiempos)
+
     # Dibuja el panel completo sobre la ventana principal
     ventana.blit(panel, (panel_x, 0))
     return botones # Devuelve la lista de botones para la detección de clics
 
-def dibujar_arbol_busqueda(ventana, agente):
-    """Dibuja la visualización del árbol de búsqueda generado por el agente."""
+def lineas_estadisticas(estadisticas):
+    """Textos con el esfuerzo de la última búsqueda (EstadisticasBusqueda)."""
+    if estadisticas.desde_cache:
+        return [f"{estadisticas.algoritmo}: resultado de la caché",
+                f"camino de {estadisticas.longitud_camino} pasos, {estadisticas.tiempo * 1000:.2f} ms"]
+    return [f"{estadisticas.algoritmo}: {estadisticas.expansiones} expansiones, "
+            f"{estadisticas.generaciones} generados",
+            f"frontera máx. {estadisticas.pico_frontera}, memoria ~{estadisticas.memoria_pico / 1024:.0f} KiB, "
+            f"{estadisticas.tiempo * 1000:.2f} ms"]
+
+def dibujar_arbol_busqueda(ventana, superficie_arbol, estadisticas=None):
+    """Dibuja la visualización del árbol de búsqueda generado por el agente y, al pie, las estadísticas de la búsqueda."""
     # Calcula la posición X donde empieza el área del árbol
     arbol_x = ANCHO_PANEL + ANCHO_LABERINTO
 
@@ -230,16 +364,26 @@ def dibujar_arbol_busqueda(ventana, agente):
     pygame.draw.rect(ventana, COLORES["borde_arbol"], pygame.Rect(arbol_x, 0, ANCHO_ARBOL, ALTO_VENTANA))
 
     # Dibuja el título del área del árbol
-    fuente_titulo = pygame.font.SysFont("Arial", 28, bold=True)
+    fuente_titulo = obtener_fuente(28, negrita=True)
     titulo = fuente_titulo.render("Árbol de Búsqueda", True, (0, 0, 0))
     ventana.blit(titulo, (arbol_x + 100, 20)) # Posición relativa al área del árbol
 
-    # Obtiene la superficie (imagen) del árbol desde el visualizador del agente
-    superficie_arbol = agente.obtener_superficie_arbol()
+    # Dibuja la superficie (imagen) del árbol obtenida del visualizador del agente
     if superficie_arbol:
         # Dibuja la superficie del árbol en la ventana
         ventana.blit(superficie_arbol, (arbol_x, 60)) # Con un pequeño margen
 
+    if estadisticas is not None:
+        fuente = obtener_fuente(18)
+        lineas = lineas_estadisticas(estadisticas)
+        alto = 12 + 20 * len(lineas)
+        pygame.draw.rect(ventana, COLORES["borde_arbol"],
+                         pygame.Rect(arbol_x, ALTO_VENTANA - alto, ANCHO_ARBOL, alto))
+        for i, linea in enumerate(lineas):
+            ventana.blit(fuente.render(linea, True, (0, 0, 0)),
+                         (arbol_x + 10, ALTO_VENTANA - alto + 6 + 20 * i))
+    return pygame.Rect(arbol_x, 0, ANCHO_ARBOL, ALTO_VENTANA)
+
 def obtener_fps_por_velocidad(velocidad):
     """Devuelve la tasa de fotogramas por segundo (FPS) según la velocidad seleccionada."""
     if velocidad == "Lenta":
@@ -253,9 +397,10 @@ def main():
     pygame.init() # Inicializa todos los módulos de pygame
 
     # Variables globales para almacenar las imágenes cargadas
-    global IMG_AGENTE, IMG_META
+    global IMG_AGENTE, IMG_META, SUPERFICIE_PANEL
     IMG_AGENTE = None
     IMG_META = None
+    SUPERFICIE_PANEL = None
 
     # Obtiene las dimensiones de la pantalla para ajustar la ventana
     pantalla_info = pygame.display.Info()
@@ -333,7 +478,8 @@ def main():
     # Crea una instancia del laberinto con las dimensiones calculadas y densidad de paredes
     laberinto = Laberinto(FILAS, COLUMNAS, 0.4) # Densidad 0.4 = 40% de paredes
     # Crea una instancia del agente, iniciando en la posición inicial del laberinto
-    agente = Agente(laberinto.inicio)
+    # El árbol de búsqueda se dibuja en un hilo aparte para no congelar la ventana
+    agente = Agente(laberinto.inicio, arbol_en_segundo_plano=True, cache_busquedas=CACHE_BUSQUEDAS)
 
     # --- Variables de Control del Bucle Principal ---
     reloj = pygame.time.Clock() # Objeto para controlar los FPS
@@ -346,9 +492,21 @@ def main():
     velocidad = "Normal" # Velocidad inicial de ejecución
     mostrar_arbol = True # Controla si se muestra el árbol de búsqueda
     modo_dinamico_algoritmos = False # Controla si se sugieren algoritmos dinámicamente
+    mostrar_tiempos = False # Controla la medición y el panel de tiempos por fase (tecla T)
+    medidor = Medidor() # Tiempos de las fases del bucle de la interfaz
+
+    # --- Estado del Dibujado Incremental ---
+    capa = CapaLaberinto() # Celdas ya dibujadas; solo se repintan las que cambian
+    redibujar_todo = True # Fuerza un fotograma completo (inicio, clics en botones)
+    posicion_dibujada = None # Celda donde se dibujó el agente en el fotograma anterior
+    clave_panel = None # Contenido mostrado en el panel en el fotograma anterior
+    superficie_arbol_dibujada = None # Superficie del árbol mostrada en el fotograma anterior
+    busqueda_dibujada = None # Estadísticas de búsqueda mostradas bajo el árbol
+    botones = []
 
     # --- Bucle Principal del Juego ---
     while True:
+        inicio_fotograma = medidor.inicio()
         # --- Manejo de Eventos ---
         for evento in pygame.event.get():
             if evento.type == pygame.QUIT: # Evento de cerrar la ventana
@@ -358,9 +516,19 @@ def main():
                 if evento.key == pygame.K_ESCAPE: # Tecla Escape para salir
                     pygame.quit()
                     return
+                elif evento.key == pygame.K_e and agente.visualizador: # Tecla E para exportar el árbol
+                    ruta = agente.visualizador.exportar_png("arbol_busqueda.png")
+                    print(f"Árbol exportado a {ruta}")
+                elif evento.key == pygame.K_t: # Tecla T para medir y mostrar los tiempos por fase
+                    mostrar_tiempos = not mostrar_tiempos
+                    for objeto in (medidor, agente.medidor, laberinto.medidor):
+                        objeto.activo = mostrar_tiempos
+                        objeto.limpiar()
+                    redibujar_todo = True
             elif evento.type == pygame.MOUSEBUTTONDOWN: # Evento de clic del ratón
                 if evento.button == 1: # Botón izquierdo del ratón
                     x, y = pygame.mouse.get_pos() # Obtiene las coordenadas del clic
+                    redibujar_todo = True # Los botones pueden cambiar cualquier zona de la ventana
 
                     # Verifica qué botón(es) fueron presionados
                     botones_pulsados = []
@@ -371,7 +539,7 @@ def main():
                     # --- Lógica de Botones ---
                     # Prioriza la selección de algoritmo si se hizo clic en uno
                     algoritmo_seleccionado = False
-                    algoritmos_rev = ["A*", "DFS", "BFS", "IDS"] # Orden para probar (A* primero)
+                    algoritmos_rev = ["A*", "DFS", "BFS", "IDS", "D* Lite"] # Orden para probar (A* primero)
                     for algoritmo in algoritmos_rev:
                         algo_nombre = f"algo_{algoritmo}"
                         if algo_nombre in botones_pulsados:
@@ -435,7 +603,10 @@ def main():
                                 velocidad = nombre.split("_")[1] # Extrae el nombre de la velocidad
                                 break
 
+        medidor.fin("eventos", inicio_fotograma)
+
         # --- Actualización del Estado del Juego ---
+        inicio = medidor.inicio()
         if ejecutando:
             # Si el agente ya encontró la meta, detiene la ejecución y registra el tiempo final
             if agente.estado == "Meta encontrada":
@@ -454,8 +625,7 @@ def main():
                         print("Modo dinámico: Cambiando laberinto y meta...")
                         laberinto.cambiar_paredes_aleatorias(8) # Cambia más paredes
                         laberinto.randomizar_meta(agente.posicion) # Mueve la meta aleatoriamente
-                        # Reinicia parcialmente el agente para que recalcule desde su posición actual
-                        agente.ultimo_camino = None
+                        # El agente conserva su camino si los cambios no lo afectan
                         agente.estado = "Buscando"
                         tiempo_final = None # Resetea tiempo final si la meta cambió
                         contador_dinamico = 5 # Reinicia el contador
@@ -474,11 +644,10 @@ def main():
                             print(f"Cambiando algoritmo de {agente.algoritmo_actual} a {nuevo_algo}")
                             agente.cambiar_algoritmo(nuevo_algo) # Cambia el algoritmo en el agente
 
-                        # Si la meta cambió, fuerza al agente a recalcular
+                        # Si la meta cambió, el agente revisa su camino en el próximo paso
                         if cambios['meta_cambiada']:
                             print(f"Meta cambiada a {laberinto.meta}")
                             agente.estado = "Buscando"
-                            agente.ultimo_camino = None
                             tiempo_final = None # Resetea tiempo final
 
                         # El contador se reinicia dentro de decrementar_contador_dinamico
@@ -487,18 +656,52 @@ def main():
                     contador_dinamico = laberinto.contador_dinamico
 
 
+        medidor.fin("actualizacion", inicio)
+
         # --- Dibujado ---
-        ventana.fill(COLORES["fondo"]) # Limpia la pantalla en cada fotograma
-        dibujar_laberinto(ventana, laberinto, agente) # Dibuja el laberinto y el agente
-        # Dibuja el panel y obtiene las áreas de los botones actualizadas
-        botones = dibujar_panel(ventana, agente, laberinto, pasos, tiempo_inicio,
-                               agente.estado, modo_dinamico, contador_dinamico,
-                               velocidad, mostrar_arbol, tiempo_final,
-                               modo_dinamico_algoritmos)
-        if mostrar_arbol: # Dibuja el árbol solo si está activado
-            dibujar_arbol_busqueda(ventana, agente)
-
-        pygame.display.update() # Actualiza la pantalla para mostrar los cambios
+        # Solo se repinta lo que cambió y solo esas zonas se envían a la pantalla
+        inicio = medidor.inicio()
+        if redibujar_todo:
+            ventana.fill(COLORES["fondo"]) # Limpia la pantalla
+        # Dibuja el laberinto y el agente
+        zonas = dibujar_laberinto(ventana, laberinto, agente, capa, posicion_dibujada, redibujar_todo)
+        posicion_dibujada = agente.posicion
+        medidor.fin("dibujo_laberinto", inicio)
+
+        # El panel se redibuja solo si cambia algo de lo que muestra
+        inicio = medidor.inicio()
+        tiempos = lineas_tiempos(medidor, agente, laberinto) if mostrar_tiempos else None
+        nueva_clave_panel = (agente.algoritmo_actual, pasos, f"{tiempo_transcurrido(tiempo_inicio, tiempo_final):.1f}",
+                             agente.estado, modo_dinamico, contador_dinamico, velocidad,
+                             mostrar_arbol, modo_dinamico_algoritmos, tiempos)
+        if redibujar_todo or nueva_clave_panel != clave_panel:
+            # Dibuja el panel y obtiene las áreas de los botones actualizadas
+            botones = dibujar_panel(ventana, agente, laberinto, pasos, tiempo_inicio,
+                                   agente.estado, modo_dinamico, contador_dinamico,
+                                   velocidad, mostrar_arbol, tiempo_final,
+                                   modo_dinamico_algoritmos, tiempos)
+            zonas.append(pygame.Rect(0, 0, ANCHO_PANEL, ALTO_VENTANA))
+            clave_panel = nueva_clave_panel
+        medidor.fin("panel", inicio)
+
+        if mostrar_arbol: # Dibuja el árbol solo si está activado y cambió
+            inicio = medidor.inicio()
+            superficie_arbol = agente.obtener_superficie_arbol()
+            if (redibujar_todo or superficie_arbol is not superficie_arbol_dibujada or
+                    agente.ultima_busqueda is not busqueda_dibujada):
+                zonas.append(dibujar_arbol_busqueda(ventana, superficie_arbol, agente.ultima_busqueda))
+                superficie_arbol_dibujada = superficie_arbol
+                busqueda_dibujada = agente.ultima_busqueda
+            medidor.fin("arbol_interfaz", inicio)
+
+        inicio = medidor.inicio()
+        if redibujar_todo:
+            pygame.display.update() # Actualiza toda la pantalla
+            redibujar_todo = False
+        else:
+            pygame.display.update(zonas) # Actualiza solo las zonas que cambiaron
+        medidor.fin("pantalla", inicio)
+        medidor.fin("fotograma", inicio_fotograma)
         # Controla los FPS según la velocidad seleccionada
         reloj.tick(obtener_fps_por_velocidad(velocidad))
 
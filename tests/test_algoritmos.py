@@ -0,0 +1,74 @@
+from core.laberinto import Laberinto
+from core.algoritmos.busqueda import PlanificadorIncremental, TablasSalto, bfs, d_estrella_lite, jps
+
+PLANO = ["#######",
+         "#.....#",
+         "#.###.#",
+         "#.#...#",
+         "#.#.#.#",
+         "#.....#",
+         "#######"]
+
+
+def laberinto_desde(plano):
+    """Laberinto a partir de filas de texto ('#' pared, '.' camino)."""
+    laberinto = Laberinto(len(plano), len(plano[0]), generar=False)
+    laberinto.grid = [[1 if celda == "#" else 0 for celda in fila] for fila in plano]
+    laberinto.mostrar_mensajes = False
+    return laberinto
+
+
+def longitud_bfs(laberinto, inicio):
+    camino = bfs(laberinto, inicio, laberinto.meta)[0]
+    return len(camino) if camino else None
+
+
+def test_d_estrella_lite_sale_de_celda_convertida_en_pared():
+    laberinto = laberinto_desde(PLANO)
+    posicion = (3, 3)
+    laberinto.poner_pared(posicion)
+    camino = d_estrella_lite(laberinto, posicion, laberinto.meta)[0]
+    assert camino is not None and camino[0] == posicion and camino[-1] == laberinto.meta
+    assert len(camino) == longitud_bfs(laberinto, posicion)
+
+
+def test_d_estrella_lite_incremental_con_pared_en_el_agente():
+    laberinto = laberinto_desde(PLANO)
+    planificador = PlanificadorIncremental()
+    assert d_estrella_lite(laberinto, (1, 1), laberinto.meta, planificador)[0] is not None
+
+    # El agente avanza y su celda se vuelve pared antes de replanificar
+    posicion = (1, 3)
+    laberinto.poner_pared(posicion)
+    camino = d_estrella_lite(laberinto, posicion, laberinto.meta, planificador)[0]
+    assert camino is not None and len(camino) == longitud_bfs(laberinto, posicion)
+
+    # Al dejar la celda, vuelve a contar como pared para el planificador
+    siguiente = camino[1]
+    camino = d_estrella_lite(laberinto, siguiente, laberinto.meta, planificador)[0]
+    assert posicion not in camino
+    assert len(camino) == longitud_bfs(laberinto, siguiente)
+
+
+def test_jps_sale_de_celda_convertida_en_pared():
+    laberinto = laberinto_desde(PLANO)
+    tablas = TablasSalto()
+    assert jps(laberinto, (1, 1), laberinto.meta, tablas)[0] is not None
+    for posicion in [(1, 1), (1, 3), (3, 3), (4, 3), (5, 4)]:
+        laberinto.poner_pared(posicion)
+        camino = jps(laberinto, posicion, laberinto.meta, tablas)[0]
+        assert camino is not None and camino[0] == posicion and camino[-1] == laberinto.meta
+        assert len(camino) == longitud_bfs(laberinto, posicion)
+        assert all(laberinto.es_libre(celda) for celda in camino[1:])
+        laberinto.quitar_pared(posicion)
+
+
+def test_hay_camino_desde_celda_convertida_en_pared():
+    laberinto = laberinto_desde(PLANO)
+    laberinto.poner_pared((3, 3))
+    assert laberinto.hay_camino((3, 3), laberinto.meta)
+    # Encerrada entre paredes no tiene salida
+    laberinto.poner_pared((3, 4))
+    laberinto.poner_pared((4, 3))
+    assert not laberinto.hay_camino((3, 3), laberinto.meta)
+    assert not laberinto.hay_camino((0, 0), laberinto.meta)
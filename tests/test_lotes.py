@@ -0,0 +1,20 @@
+import random
+
+from core.laberinto import Laberinto
+from core.lotes import ejecutar_tarea, tareas_desde_laberintos
+
+
+def test_tarea_serializada_dinamica_es_reproducible():
+    random.seed(3)
+    laberinto = Laberinto(20, 20, 0.3)
+    tarea, = tareas_desde_laberintos([laberinto], ["A*"], semillas=(11,),
+                                     modos_dinamicos=("paredes",))
+
+    resultados = []
+    for _ in range(2):
+        random.seed()  # El estado previo de random no debe influir
+        metricas = ejecutar_tarea(tarea)
+        assert "error" not in metricas
+        resultados.append({campo: metricas[campo] for campo in
+                           ("exito", "pasos", "replanificaciones", "nodos_generados", "expansiones")})
+    assert resultados[0] == resultados[1]